@@ -0,0 +1,55 @@
+import logging
+import threading
+from typing import Dict, List, Optional
+from app import db
+from models import Athlete
+from response_cache import data_versions, ATHLETES
+
+logger = logging.getLogger(__name__)
+
+_athletes: Optional[Dict[int, Dict]] = None
+_version: Optional[int] = None
+_lock = threading.Lock()
+
+
+def _load_athletes() -> Dict[int, Dict]:
+    rows = db.session.query(
+        Athlete.id, Athlete.name, Athlete.is_active, Athlete.refresh_token.isnot(None)
+    ).all()
+    return {
+        athlete_id: {'id': athlete_id, 'name': name, 'is_active': bool(is_active),
+                     'has_refresh_token': bool(has_refresh_token)}
+        for athlete_id, name, is_active, has_refresh_token in rows
+    }
+
+
+def get_athletes() -> Dict[int, Dict]:
+    """Every athlete by id: name, is_active and has_refresh_token.
+
+    Loaded in one query and shared by the process. Athlete create, toggle
+    and delete bump the athletes data version, which reloads it here on the
+    next call, in every process. Costs one version query when unchanged.
+    """
+    global _athletes, _version
+    versions, _ = data_versions([ATHLETES])
+    version = versions[ATHLETES]
+
+    with _lock:
+        if _athletes is None or _version != version:
+            _athletes = _load_athletes()
+            _version = version
+            logger.debug(f"Loaded {len(_athletes)} athletes into the athlete cache (version {version})")
+        return _athletes
+
+
+def athlete_name(athlete_id: int, default: Optional[str] = None) -> Optional[str]:
+    """Name of one athlete, or default if it does not exist"""
+    athlete = get_athletes().get(athlete_id)
+    return athlete['name'] if athlete else default
+
+
+def active_athlete_ids() -> List[int]:
+    """Ids of active athletes, ordered by name"""
+    athletes = [athlete for athlete in get_athletes().values() if athlete['is_active']]
+    return [athlete['id'] for athlete in sorted(athletes, key=lambda athlete: athlete['name'] or '')]
+
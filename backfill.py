@@ -0,0 +1,301 @@
+import math
+import logging
+import threading
+from datetime import datetime, timedelta, date
+from typing import Dict, List, Optional
+from sqlalchemy import or_, and_
+from config import Config
+from app import db
+from models import Athlete, BackfillJob
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('pending', 'running', 'paused')
+RATE_LIMIT_WAIT_MESSAGE = 'Waiting for the next Strava rate limit window'
+
+
+def tracking_start_date() -> date:
+    """First day of the training season as configured"""
+    return datetime.strptime(Config.TRACKING_START_DATE, '%Y-%m-%d').date()
+
+
+def _as_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+class BackfillManager:
+    """Runs historical backfills in checkpointed chunks that fit the Strava budget.
+
+    Each job covers one athlete and date range and stores the next day to
+    fetch. Jobs sharing a chunk window are fetched together through the
+    scheduler's concurrent range sync. When the rate limiter runs dry the
+    jobs are paused with a resume time and picked up again by the next poll.
+    """
+
+    def __init__(self, task_scheduler):
+        self.task_scheduler = task_scheduler
+        self.rate_limiter = task_scheduler.strava_client.rate_limiter
+        self._run_lock = threading.Lock()
+
+    def create_jobs(self, start_date, end_date, athlete_ids: Optional[List[int]] = None) -> List[BackfillJob]:
+        """Queue one job per connected athlete, reusing an active job for the same range"""
+        start_day = _as_date(start_date)
+        end_day = _as_date(end_date)
+        if end_day < start_day:
+            raise ValueError("End date must not be before start date")
+
+        query = Athlete.query.filter(Athlete.is_active == True, Athlete.refresh_token.isnot(None))
+        if athlete_ids is not None:
+            query = query.filter(Athlete.id.in_(athlete_ids))
+        athletes = query.all()
+
+        existing = {
+            job.athlete_id: job for job in BackfillJob.query.filter(
+                BackfillJob.status.in_(ACTIVE_STATUSES),
+                BackfillJob.start_date == start_day,
+                BackfillJob.end_date == end_day
+            ).all()
+        }
+
+        jobs = []
+        try:
+            for athlete in athletes:
+                job = existing.get(athlete.id)
+                if not job:
+                    job = BackfillJob(
+                        athlete_id=athlete.id,
+                        start_date=start_day,
+                        end_date=end_day,
+                        cursor_date=start_day,
+                        status='pending',
+                        activities_saved=0,
+                        requests_used=0,
+                        attempts=0
+                    )
+                    db.session.add(job)
+                jobs.append(job)
+
+            db.session.commit()
+            logger.info(f"Queued backfill for {len(jobs)} athletes from {start_day} to {end_day}")
+            return jobs
+
+        except Exception as e:
+            logger.error(f"Failed to create backfill jobs: {e}")
+            db.session.rollback()
+            raise
+
+    def run_pending(self, max_chunks: Optional[int] = None) -> Dict:
+        """Process runnable jobs chunk by chunk until they finish, pause or max_chunks is reached"""
+        summary = {'chunks': 0, 'completed': 0, 'paused': 0, 'failed': 0}
+
+        # One runner per process; other processes are kept out by the claim
+        if not self._run_lock.acquire(blocking=False):
+            logger.info("Backfill already running in this process")
+            return summary
+
+        # Chunks wait for the next poll while another sync is writing
+        if not self.task_scheduler.begin_sync():
+            logger.info("Another sync is running, backfill will resume on the next poll")
+            self._run_lock.release()
+            return summary
+
+        try:
+            while max_chunks is None or summary['chunks'] < max_chunks:
+                jobs = self._claim_next_batch(summary)
+                if not jobs:
+                    break
+                self._run_chunk(jobs, summary)
+                summary['chunks'] += 1
+
+            if summary['chunks']:
+                logger.info(f"Backfill run finished: {summary}")
+            return summary
+
+        except Exception as e:
+            logger.error(f"Backfill run failed: {e}")
+            db.session.rollback()
+            return summary
+
+        finally:
+            self.task_scheduler.strava_client.flush_usage()
+            self.task_scheduler.end_sync()
+            self._run_lock.release()
+
+    def _runnable_filter(self):
+        now = datetime.now()
+        stale_cutoff = datetime.utcnow() - timedelta(minutes=Config.BACKFILL_STALE_MINUTES)
+        return or_(
+            and_(BackfillJob.status.in_(('pending', 'paused')),
+                 or_(BackfillJob.resume_after.is_(None), BackfillJob.resume_after <= now)),
+            and_(BackfillJob.status == 'running', BackfillJob.updated_at < stale_cutoff)
+        )
+
+    def _chunk_end(self, job: BackfillJob) -> date:
+        return min(job.end_date, job.cursor_date + timedelta(days=Config.BACKFILL_CHUNK_DAYS - 1))
+
+    def _claim_next_batch(self, summary: Dict) -> List[BackfillJob]:
+        """Claim the runnable jobs that share the oldest job's next chunk window"""
+        runnable = BackfillJob.query.filter(self._runnable_filter()).order_by(
+            BackfillJob.created_at, BackfillJob.id
+        ).all()
+        if not runnable:
+            return []
+
+        first = runnable[0]
+        batch = [job for job in runnable
+                 if job.cursor_date == first.cursor_date and self._chunk_end(job) == self._chunk_end(first)]
+        # A batch bigger than a full rate limit window would never fit and stay
+        # paused forever; the rest of the window's jobs go in the next batches
+        batch = batch[:self.rate_limiter.max_requests_per_wait(Config.BACKFILL_RESERVED_DAILY_REQUESTS)]
+
+        # Roughly one paginated request per athlete per chunk
+        wait_seconds = self.rate_limiter.seconds_until_available(
+            len(batch), daily_reserve=Config.BACKFILL_RESERVED_DAILY_REQUESTS
+        )
+        if wait_seconds > 0:
+            resume_after = datetime.now() + timedelta(seconds=math.ceil(wait_seconds))
+            for job in runnable:
+                job.status = 'paused'
+                job.resume_after = resume_after
+                job.error = RATE_LIMIT_WAIT_MESSAGE
+            db.session.commit()
+            summary['paused'] += len(runnable)
+            logger.info(f"Paused {len(runnable)} backfill jobs until {resume_after.strftime('%H:%M:%S')}")
+            return []
+
+        # Conditional update so a job is only ever claimed by one runner
+        claimed = []
+        for job in batch:
+            rows = BackfillJob.query.filter(
+                BackfillJob.id == job.id, self._runnable_filter()
+            ).update({'status': 'running', 'updated_at': datetime.utcnow()}, synchronize_session=False)
+            if rows:
+                claimed.append(job)
+        db.session.commit()
+
+        for job in claimed:
+            db.session.refresh(job)
+        return claimed
+
+    def _run_chunk(self, jobs: List[BackfillJob], summary: Dict):
+        """Fetch one chunk for the claimed jobs and checkpoint those that completed it"""
+        chunk_start = jobs[0].cursor_date
+        chunk_end = self._chunk_end(jobs[0])
+        athletes = [job.athlete for job in jobs]
+
+        logger.info(f"Backfilling {len(jobs)} athletes from {chunk_start} to {chunk_end}")
+        results = self.task_scheduler.sync_date_range(chunk_start, chunk_end, athletes)
+        results_by_athlete = {result['athlete_id']: result for result in results['athlete_results']}
+
+        now = datetime.now()
+        for job in jobs:
+            result = results_by_athlete.get(job.athlete_id)
+            error = results['error'] or (result['error'] if result else 'Athlete was not synced')
+            if result:
+                job.requests_used = (job.requests_used or 0) + result['requests']
+
+            if not error and result['complete']:
+                # Checkpoint only after every page of the chunk was fetched
+                job.activities_saved = (job.activities_saved or 0) + result['new_activities']
+                job.cursor_date = chunk_end + timedelta(days=1)
+                job.attempts = 0
+                job.error = None
+                job.resume_after = None
+                if job.cursor_date > job.end_date:
+                    job.status = 'completed'
+                    job.completed_at = now
+                    summary['completed'] += 1
+                else:
+                    job.status = 'pending'
+
+            elif not self.rate_limiter.has_capacity():
+                wait_seconds = self.rate_limiter.seconds_until_available(
+                    1, daily_reserve=Config.BACKFILL_RESERVED_DAILY_REQUESTS
+                )
+                job.status = 'paused'
+                job.resume_after = now + timedelta(seconds=math.ceil(wait_seconds))
+                job.error = RATE_LIMIT_WAIT_MESSAGE
+                summary['paused'] += 1
+
+            else:
+                job.attempts = (job.attempts or 0) + 1
+                job.error = error or 'Incomplete activity fetch'
+                if job.attempts >= Config.BACKFILL_MAX_ATTEMPTS:
+                    job.status = 'failed'
+                    summary['failed'] += 1
+                    logger.error(f"Backfill job {job.id} failed: {job.error}")
+                else:
+                    job.status = 'paused'
+                    job.resume_after = now + timedelta(minutes=Config.BACKFILL_POLL_MINUTES * job.attempts)
+                    summary['paused'] += 1
+
+        db.session.commit()
+
+    def job_progress(self, job: BackfillJob) -> Dict:
+        """Progress of one job in days, with the requests it still needs"""
+        total_days = (job.end_date - job.start_date).days + 1
+        done_days = min(total_days, max(0, (job.cursor_date - job.start_date).days))
+        remaining_chunks = math.ceil((total_days - done_days) / Config.BACKFILL_CHUNK_DAYS)
+
+        return {
+            'id': job.id,
+            'athlete_id': job.athlete_id,
+            'athlete_name': job.athlete.name if job.athlete else None,
+            'start_date': job.start_date.isoformat(),
+            'end_date': job.end_date.isoformat(),
+            'cursor_date': job.cursor_date.isoformat(),
+            'status': job.status,
+            'days_total': total_days,
+            'days_done': done_days,
+            'progress_percent': round(done_days / total_days * 100, 1),
+            'remaining_requests': remaining_chunks if job.status in ACTIVE_STATUSES else 0,
+            'activities_saved': job.activities_saved or 0,
+            'requests_used': job.requests_used or 0,
+            'attempts': job.attempts or 0,
+            'error': job.error,
+            'resume_after': job.resume_after.isoformat() if job.resume_after else None,
+            'created_at': job.created_at.isoformat() if job.created_at else None,
+            'completed_at': job.completed_at.isoformat() if job.completed_at else None
+        }
+
+    def get_status(self, job_ids: Optional[List[int]] = None) -> Dict:
+        """Progress of the given (or all active and recent) jobs with a queue-wide ETA.
+
+        Active jobs advance together, so the ETA is the time the rate limiter
+        needs to admit every request still owed to the queue.
+        """
+        if job_ids is not None:
+            jobs = BackfillJob.query.filter(BackfillJob.id.in_(job_ids)).order_by(BackfillJob.id).all()
+        else:
+            recent = datetime.utcnow() - timedelta(days=1)
+            jobs = BackfillJob.query.filter(
+                or_(BackfillJob.status.in_(ACTIVE_STATUSES), BackfillJob.updated_at >= recent)
+            ).order_by(BackfillJob.id).all()
+
+        progress = [self.job_progress(job) for job in jobs]
+
+        queued_requests = sum(
+            self.job_progress(job)['remaining_requests']
+            for job in BackfillJob.query.filter(BackfillJob.status.in_(ACTIVE_STATUSES)).all()
+        )
+        eta_seconds = self.rate_limiter.seconds_until_available(
+            queued_requests, daily_reserve=Config.BACKFILL_RESERVED_DAILY_REQUESTS
+        ) if queued_requests else 0
+
+        resume_times = [job.resume_after for job in jobs
+                        if job.status == 'paused' and job.resume_after and job.resume_after > datetime.now()]
+        if resume_times:
+            eta_seconds = max(eta_seconds, (min(resume_times) - datetime.now()).total_seconds())
+
+        days_total = sum(item['days_total'] for item in progress)
+        days_done = sum(item['days_done'] for item in progress)
+
+        return {
+            'jobs': progress,
+            'days_total': days_total,
+            'days_done': days_done,
+            'progress_percent': round(days_done / days_total * 100, 1) if days_total else 100.0,
+            'remaining_requests': sum(item['remaining_requests'] for item in progress),
+            'eta_seconds': int(math.ceil(eta_seconds)) if any(item['remaining_requests'] for item in progress) else 0,
+            'rate_limit_remaining': self.rate_limiter.remaining()
+        }
@@ -0,0 +1,95 @@
+"""Benchmark Strava sync throughput offline against strava_simulator.py.
+
+    python benchmark_sync.py
+
+Runs the full range sync (fetch, save, summarize) once per worker count
+against an in-process simulator and a throwaway SQLite database. Tune it
+with the BENCHMARK_* variables below; STRAVA_SIM_* variables also apply.
+"""
+import os
+import time
+import logging
+import tempfile
+from datetime import datetime, timedelta
+
+ATHLETES = int(os.getenv("BENCHMARK_ATHLETES", 200))
+WORKERS = [int(value) for value in os.getenv("BENCHMARK_WORKERS", "1,4,8,16").split(",")]
+DAYS = int(os.getenv("BENCHMARK_DAYS", 30))  # Length of the synced date range
+# Simulator windows; keep them high to measure concurrency, lower them to exercise pacing
+RATE_LIMIT_15MIN = int(os.getenv("BENCHMARK_RATE_LIMIT_15MIN", 100000))
+RATE_LIMIT_DAILY = int(os.getenv("BENCHMARK_RATE_LIMIT_DAILY", 1000000))
+
+
+def run_benchmark():
+    from strava_simulator import serve_in_thread
+
+    server = serve_in_thread(
+        athletes=ATHLETES,
+        rate_limit_15min=RATE_LIMIT_15MIN * 2,
+        rate_limit_daily=RATE_LIMIT_DAILY * 2,
+        read_rate_limit_15min=RATE_LIMIT_15MIN,
+        read_rate_limit_daily=RATE_LIMIT_DAILY
+    )
+    simulator = server.app.config['SIMULATOR']
+    base_url = f"http://127.0.0.1:{server.port}"
+
+    # Must be set before the app modules read Config
+    db_path = os.path.join(tempfile.mkdtemp(prefix='strava-benchmark-'), 'benchmark.db')
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    os.environ['STRAVA_API_BASE_URL'] = f"{base_url}/api/v3"
+    os.environ['STRAVA_TOKEN_URL'] = f"{base_url}/oauth/token"
+
+    from app import app, db
+    from models import Athlete, Activity, DailySummary
+    from scheduler import DailyTaskScheduler
+    from rate_limiter import StravaRateLimiter
+
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=DAYS - 1)
+
+    with app.app_context():
+        for athlete_id in range(1, ATHLETES + 1):
+            profile = simulator.data.athlete(athlete_id)
+            db.session.add(Athlete(
+                name=f"{profile['firstname']} {profile['lastname']}",
+                strava_athlete_id=athlete_id,
+                refresh_token=simulator.data.refresh_token(athlete_id),
+                is_active=True
+            ))
+        db.session.commit()
+
+        print(f"Syncing {ATHLETES} athletes over {DAYS} days against {base_url}")
+        print(f"{'workers':>8} {'seconds':>9} {'athletes/s':>11} {'requests':>9} {'429s':>6} {'5xx':>5} {'activities':>11}")
+
+        for workers in WORKERS:
+            # Start every run from the same state: no stored data, tokens or usage
+            Activity.query.delete()
+            DailySummary.query.delete()
+            Athlete.query.update({'access_token': None, 'token_expires_at': None,
+                                  'last_synced_activity_at': None, 'last_synced_activity_id': None})
+            db.session.commit()
+            simulator.reset()
+
+            task_scheduler = DailyTaskScheduler()
+            task_scheduler.sync_engine.max_workers = workers
+            task_scheduler.strava_client.rate_limiter = StravaRateLimiter(RATE_LIMIT_15MIN, RATE_LIMIT_DAILY)
+            task_scheduler.strava_client.rate_limiter._seeded = True  # Ignore usage rows from earlier runs
+
+            started = time.perf_counter()
+            results = task_scheduler._fetch_and_process_strava_range(start_date, end_date)
+            elapsed = time.perf_counter() - started
+
+            by_status = simulator.stats['by_status']
+            server_errors = sum(count for status, count in by_status.items() if status.startswith('5'))
+            print(f"{workers:>8} {elapsed:>9.2f} {results['successful_athletes'] / elapsed:>11.1f} "
+                  f"{simulator.stats['requests']:>9} {by_status.get('429', 0):>6} {server_errors:>5} "
+                  f"{Activity.query.count():>11}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    run_benchmark()
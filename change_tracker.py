@@ -0,0 +1,112 @@
+import logging
+from datetime import datetime, date
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import exists
+from app import db
+from models import Athlete, DailySummary, SummaryDirtyDay, day_start
+from db_helpers import upsert_rows
+from rollups import refresh_rollups
+from training_load import update_training_load
+from response_cache import bump_data_version, ACTIVITIES, PLANS, SUMMARIES
+
+logger = logging.getLogger(__name__)
+
+
+def _as_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def mark_dirty(pairs: Iterable[Tuple[int, date]], reason: str) -> int:
+    """Record (athlete_id, day) pairs whose summary is stale and refresh their rollups and training load.
+
+    Runs in the caller's transaction so the mark commits together with the
+    activity or plan change behind it. Re-marking a pair refreshes its
+    marked_at, which keeps it queued if a recompute is already under way.
+    """
+    now = datetime.utcnow()
+    keys = {(athlete_id, _as_date(day)) for athlete_id, day in pairs if athlete_id and day}
+    rows = [{'athlete_id': athlete_id, 'summary_date': day, 'reason': reason, 'marked_at': now}
+            for athlete_id, day in sorted(keys)]
+    # Rollups include future plans, so they are refreshed now rather than at recompute time
+    refresh_rollups(keys)
+    # Training load only follows actual activity, which plan edits leave unchanged
+    if reason != 'plan':
+        update_training_load(keys)
+    if keys:
+        bump_data_version(PLANS if reason == 'plan' else ACTIVITIES)
+    return upsert_rows(SummaryDirtyDay, rows, index_elements=['athlete_id', 'summary_date'],
+                       update_columns=['reason', 'marked_at'])
+
+
+def mark_unsummarized(day, athlete_ids: Optional[List[int]] = None) -> int:
+    """Mark active athletes that have no summary for day yet, so every athlete gets one"""
+    has_summary = exists().where(
+        DailySummary.athlete_id == Athlete.id,
+        DailySummary.summary_date == day_start(day)
+    )
+    query = db.session.query(Athlete.id).filter(Athlete.is_active == True, ~has_summary)
+    if athlete_ids is not None:
+        query = query.filter(Athlete.id.in_(athlete_ids))
+
+    return mark_dirty(((athlete_id, day) for athlete_id, in query.all()), 'daily')
+
+
+def recompute_dirty(data_processor=None, up_to: Optional[date] = None, limit: Optional[int] = None) -> int:
+    """Recompute the summaries of marked days up to today and clear their marks.
+
+    Future days stay marked until they arrive, so editing next month's plan
+    recomputes nothing now. Returns the number of summaries written.
+    """
+    if data_processor is None:
+        from data_processor import DataProcessor
+        data_processor = DataProcessor()
+
+    started = datetime.utcnow()
+    up_to = _as_date(up_to) or datetime.now().date()
+
+    try:
+        query = db.session.query(
+            SummaryDirtyDay.id, SummaryDirtyDay.athlete_id, SummaryDirtyDay.summary_date
+        ).filter(SummaryDirtyDay.summary_date <= up_to).order_by(
+            SummaryDirtyDay.summary_date, SummaryDirtyDay.athlete_id
+        )
+        if limit:
+            query = query.limit(limit)
+        dirty = query.all()
+    except Exception as e:
+        logger.error(f"Failed to load dirty summary days: {e}")
+        db.session.rollback()
+        return 0
+
+    if not dirty:
+        return 0
+
+    keys = {(entry.athlete_id, entry.summary_date) for entry in dirty}
+    days = [day for _, day in keys]
+    written = data_processor.process_daily_summaries(min(days), max(days), keys=keys)
+    if not written:
+        logger.error(f"Recompute of {len(keys)} dirty summary days failed, keeping them queued")
+        return 0
+
+    try:
+        # Rollups carry summary statuses, so refresh them with the new summaries
+        refresh_rollups(keys)
+        bump_data_version(SUMMARIES)
+
+        # Pairs re-marked while we were recomputing stay queued for the next pass
+        SummaryDirtyDay.query.filter(
+            SummaryDirtyDay.id.in_([entry.id for entry in dirty]),
+            SummaryDirtyDay.marked_at <= started
+        ).delete(synchronize_session=False)
+        db.session.commit()
+    except Exception as e:
+        logger.error(f"Failed to refresh rollups or clear dirty summary days: {e}")
+        db.session.rollback()
+
+    logger.info(f"Recomputed {written} summaries for {len(keys)} dirty athlete days")
+    return written
+
+
+def pending_count() -> int:
+    """Number of marked days still waiting for a recompute"""
+    return SummaryDirtyDay.query.count()
@@ -12,6 +12,10 @@ class Config:
     STRAVA_CLIENT_SECRET = os.getenv("STRAVA_CLIENT_SECRET")
     # Use the actual Replit URL for redirect
     STRAVA_REDIRECT_URI = os.getenv('STRAVA_REDIRECT_URI', 'https://25b83a14-7dfe-4d3d-a2fc-f0f0769b93de-00-1n2lwj7jincbm.pike.replit.dev/auth/strava/callback')
+    # Point these at strava_simulator.py to run without the live API
+    STRAVA_API_BASE_URL = os.getenv("STRAVA_API_BASE_URL", "https://www.strava.com/api/v3")
+    STRAVA_TOKEN_URL = os.getenv("STRAVA_TOKEN_URL", "https://www.strava.com/oauth/token")
+    STRAVA_AUTHORIZE_URL = os.getenv("STRAVA_AUTHORIZE_URL", "https://www.strava.com/oauth/authorize")
 
     # WhatsApp Business API Configuration
     WHATSAPP_API_URL = os.getenv("WHATSAPP_API_URL")
@@ -41,9 +45,61 @@ class Config:
     DEBUG = os.getenv("DEBUG", "False").lower() == "true"
     
     # Strava API Rate Limiting
-    STRAVA_RATE_LIMIT_15MIN = 100  # 100 requests per 15 minutes
-    STRAVA_RATE_LIMIT_DAILY = 1000  # 1000 requests per day
+    STRAVA_RATE_LIMIT_15MIN = 100  # 100 requests per 15 minutes (until Strava's headers report the real limit)
+    STRAVA_RATE_LIMIT_DAILY = 1000  # 1000 requests per day (until Strava's headers report the real limit)
     STRAVA_REQUEST_TRACKING = True  # Enable request tracking
+    STRAVA_USAGE_CHECKPOINT_REQUESTS = int(os.getenv("STRAVA_USAGE_CHECKPOINT_REQUESTS", 20))  # Persist usage every N requests
+    STRAVA_USAGE_CHECKPOINT_SECONDS = int(os.getenv("STRAVA_USAGE_CHECKPOINT_SECONDS", 60))  # ...or at least this often
+
+    # Strava HTTP connection pooling (shared keep-alive session per process)
+    STRAVA_HTTP_POOL_CONNECTIONS = int(os.getenv("STRAVA_HTTP_POOL_CONNECTIONS", 4))  # Distinct hosts kept pooled
+    STRAVA_HTTP_POOL_MAXSIZE = int(os.getenv("STRAVA_HTTP_POOL_MAXSIZE", 16))  # Keep-alive connections per host
+    STRAVA_HTTP_CONNECT_TIMEOUT = float(os.getenv("STRAVA_HTTP_CONNECT_TIMEOUT", 5))  # seconds
+    STRAVA_HTTP_READ_TIMEOUT = float(os.getenv("STRAVA_HTTP_READ_TIMEOUT", 30))  # seconds
+    STRAVA_HTTP_CONNECT_RETRIES = int(os.getenv("STRAVA_HTTP_CONNECT_RETRIES", 3))  # Retries on connection errors only
+    STRAVA_HTTP_RETRY_BACKOFF = float(os.getenv("STRAVA_HTTP_RETRY_BACKOFF", 0.5))  # Backoff factor between retries
+    STRAVA_HTTP_MAX_RETRIES = int(os.getenv("STRAVA_HTTP_MAX_RETRIES", 3))  # Retries on 429/5xx responses
+    STRAVA_HTTP_MAX_BACKOFF = float(os.getenv("STRAVA_HTTP_MAX_BACKOFF", 30))  # Longest inline wait before giving up (seconds)
+
+    # Strava token reuse
+    STRAVA_TOKEN_EXPIRY_MARGIN_SECONDS = int(os.getenv("STRAVA_TOKEN_EXPIRY_MARGIN_SECONDS", 300))  # Refresh when closer to expiry
+    STRAVA_TOKEN_PROACTIVE_REFRESH_MINUTES = int(os.getenv("STRAVA_TOKEN_PROACTIVE_REFRESH_MINUTES", 60))  # Batch-refresh tokens expiring within
+    STRAVA_TOKEN_REFRESH_INTERVAL_MINUTES = int(os.getenv("STRAVA_TOKEN_REFRESH_INTERVAL_MINUTES", 30))  # How often the batch runs
+
+    # Incremental sync cursor
+    STRAVA_SYNC_OVERLAP_HOURS = int(os.getenv("STRAVA_SYNC_OVERLAP_HOURS", 72))  # Re-fetch behind the cursor for late uploads
+    STRAVA_INITIAL_SYNC_DAYS = int(os.getenv("STRAVA_INITIAL_SYNC_DAYS", 2))  # Window for athletes without a cursor yet
+
+    # Concurrent sync (keep at or below STRAVA_HTTP_POOL_MAXSIZE)
+    STRAVA_SYNC_MAX_WORKERS = int(os.getenv("STRAVA_SYNC_MAX_WORKERS", 8))  # Athletes fetched in parallel
+
+    # Season tracking and resumable historical backfill
+    TRACKING_START_DATE = os.getenv("TRACKING_START_DATE", "2025-05-19")  # First day of the training season
+    BACKFILL_CHUNK_DAYS = int(os.getenv("BACKFILL_CHUNK_DAYS", 14))  # Days fetched per backfill checkpoint
+    BACKFILL_POLL_MINUTES = int(os.getenv("BACKFILL_POLL_MINUTES", 5))  # How often paused jobs are retried
+    BACKFILL_RESERVED_DAILY_REQUESTS = int(os.getenv("BACKFILL_RESERVED_DAILY_REQUESTS", 100))  # Daily budget kept for regular syncs
+    BACKFILL_MAX_ATTEMPTS = int(os.getenv("BACKFILL_MAX_ATTEMPTS", 5))  # Non rate-limit failures before a job fails
+    BACKFILL_STALE_MINUTES = int(os.getenv("BACKFILL_STALE_MINUTES", 30))  # Reclaim running jobs idle this long
+
+    # Background sync jobs queued by the sync endpoints
+    SYNC_JOB_WORKERS = int(os.getenv("SYNC_JOB_WORKERS", 1))  # Worker threads per process; keep 1 on SQLite (single writer)
+    SYNC_JOB_POLL_SECONDS = int(os.getenv("SYNC_JOB_POLL_SECONDS", 5))  # How often idle workers check the queue
+    SYNC_JOB_STALE_MINUTES = int(os.getenv("SYNC_JOB_STALE_MINUTES", 30))  # Reclaim running jobs idle this long
+
+    # Workout status classification (overridable per athlete in OptimalValues)
+    STATUS_DISTANCE_TOLERANCE_PERCENT = float(os.getenv("STATUS_DISTANCE_TOLERANCE_PERCENT", 10.0))  # Distance variance still On Track
+    STATUS_PACE_TOLERANCE_PERCENT = float(os.getenv("STATUS_PACE_TOLERANCE_PERCENT", 5.0))  # Pace variance still On Track
+
+    # Training load (EWMA acute/chronic load over the daily facts)
+    TRAINING_LOAD_METRIC = os.getenv("TRAINING_LOAD_METRIC", "distance")  # Daily load: distance (km) or time (moving minutes)
+    TRAINING_LOAD_ATL_DAYS = int(os.getenv("TRAINING_LOAD_ATL_DAYS", 7))  # Acute load (fatigue) window
+    TRAINING_LOAD_CTL_DAYS = int(os.getenv("TRAINING_LOAD_CTL_DAYS", 42))  # Chronic load (fitness) window
+
+    # Response cache for the dashboard pages and read APIs
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")  # memory (per process), sqlite (shared file) or none
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 256))  # Least recently used entries are evicted beyond this
+    RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 300))  # Upper bound on entry age, for time-relative content
+    RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", "instance/response_cache.db")  # File used by the sqlite backend
 
     @classmethod
     def validate_config(cls):
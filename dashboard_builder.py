@@ -1,8 +1,12 @@
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List
-from models import Athlete, DailySummary, PlannedWorkout
+from sqlalchemy import func
+from app import db
+from models import DailySummary, PlannedWorkout, AthleteWeekStats, day_start
 from data_processor import DataProcessor
+from rollups import week_start
+from athlete_cache import get_athletes
 
 logger = logging.getLogger(__name__)
 
@@ -44,17 +48,18 @@ class DashboardBuilder:
         try:
             # Get all daily summaries for the date
             daily_summaries = DailySummary.query.filter_by(
-                summary_date=target_date.date()
+                summary_date=day_start(target_date)
             ).all()
+            athletes = get_athletes()
             
             athlete_summaries = []
             for summary in daily_summaries:
-                athlete = Athlete.query.get(summary.athlete_id)
+                athlete = athletes.get(summary.athlete_id)
                 if not athlete:
                     continue
                 
                 athlete_summary = {
-                    'athlete_name': athlete.name,
+                    'athlete_name': athlete['name'],
                     'status': summary.status,
                     'planned_distance': self.data_processor.format_distance(summary.planned_distance_km or 0),
                     'actual_distance': self.data_processor.format_distance(summary.actual_distance_km or 0),
@@ -80,17 +85,18 @@ class DashboardBuilder:
         try:
             # Get all planned workouts for today
             planned_workouts = PlannedWorkout.query.filter_by(
-                workout_date=target_date.date()
+                workout_date=day_start(target_date)
             ).all()
+            athletes = get_athletes()
             
             todays_workouts = []
             for workout in planned_workouts:
-                athlete = Athlete.query.get(workout.athlete_id)
+                athlete = athletes.get(workout.athlete_id)
                 if not athlete:
                     continue
                 
                 workout_info = {
-                    'athlete_name': athlete.name,
+                    'athlete_name': athlete['name'],
                     'planned_distance': self.data_processor.format_distance(workout.planned_distance_km),
                     'planned_pace': self.data_processor.format_pace(workout.planned_pace_min_per_km),
                     'workout_type': workout.workout_type or 'Regular Run',
@@ -239,32 +245,33 @@ class DashboardBuilder:
                 'total_distances': []
             }
             
-            for week_offset in range(weeks):
-                week_end = end_date - timedelta(weeks=week_offset)
-                week_start = week_end - timedelta(days=6)
-                
-                # Get summaries for the week
-                weekly_summaries = DailySummary.query.filter(
-                    DailySummary.summary_date >= week_start.date(),
-                    DailySummary.summary_date <= week_end.date()
-                ).all()
-                
-                if weekly_summaries:
-                    # Calculate weekly metrics
-                    completed = len([s for s in weekly_summaries if s.status in ['On Track', 'Over-performed', 'Partially Completed']])
-                    total = len(weekly_summaries)
-                    completion_rate = (completed / total) * 100 if total > 0 else 0
-                    
-                    distance_variances = [s.distance_variance_percent for s in weekly_summaries if s.distance_variance_percent is not None]
-                    avg_distance_variance = sum(distance_variances) / len(distance_variances) if distance_variances else 0
-                    
-                    total_distance = sum(s.actual_distance_km for s in weekly_summaries if s.actual_distance_km)
-                    
-                    trends_data['weeks'].append(week_start.strftime('%m/%d'))
-                    trends_data['completion_rates'].append(round(completion_rate, 1))
-                    trends_data['avg_distance_variances'].append(round(avg_distance_variance, 2))
-                    trends_data['total_distances'].append(round(total_distance, 1))
-            
+            # ISO weeks from the AthleteWeekStats rollup, one grouped query for the whole range
+            last_week = week_start(end_date)
+            first_week = last_week - timedelta(weeks=weeks - 1)
+            weekly_stats = db.session.query(
+                AthleteWeekStats.week_start,
+                func.sum(AthleteWeekStats.summary_days),
+                func.sum(AthleteWeekStats.completed_days),
+                func.sum(AthleteWeekStats.distance_variance_total),
+                func.sum(AthleteWeekStats.actual_distance_km)
+            ).filter(
+                AthleteWeekStats.week_start >= first_week,
+                AthleteWeekStats.week_start <= last_week
+            ).group_by(AthleteWeekStats.week_start).order_by(AthleteWeekStats.week_start.desc()).all()
+
+            for week, total, completed, variance_total, total_distance in weekly_stats:
+                if not total:
+                    continue
+
+                # Calculate weekly metrics
+                completion_rate = (completed / total) * 100
+                avg_distance_variance = (variance_total or 0) / total
+
+                trends_data['weeks'].append(week.strftime('%m/%d'))
+                trends_data['completion_rates'].append(round(completion_rate, 1))
+                trends_data['avg_distance_variances'].append(round(avg_distance_variance, 2))
+                trends_data['total_distances'].append(round(total_distance or 0, 1))
+
             # Reverse to show chronological order
             for key in trends_data:
                 trends_data[key].reverse()
@@ -1,8 +1,12 @@
 import logging
 from datetime import datetime, timedelta, date
-from typing import List, Dict, Optional, Tuple
-from sqlalchemy import and_, func
-from models import Athlete, Activity, PlannedWorkout, DailySummary
+from typing import List, Dict, Optional, Set, Tuple
+from sqlalchemy import and_, func, select, union, update
+from models import Athlete, Activity, PlannedWorkout, DailySummary, day_start
+from db_helpers import upsert_rows, string_agg, delete_duplicates, duplicate_rows_filter
+from performance_classifier import classify_workouts, classify_variances, load_status_tolerances
+from config import Config
+from response_cache import bump_data_version, SUMMARIES
 from app import db
 
 logger = logging.getLogger(__name__)
@@ -61,8 +65,13 @@ class DataProcessor:
         return round(variance, 2)
 
     def determine_workout_status(self, distance_variance: float, pace_variance: float, 
-                               planned_distance: float, actual_distance: float) -> str:
-        """Determine the status of a workout based on performance metrics"""
+                               planned_distance: float, actual_distance: float,
+                               distance_tolerance: Optional[float] = None,
+                               pace_tolerance: Optional[float] = None) -> str:
+        """Determine the status of a workout based on performance metrics.
+
+        Vectorized equivalent: performance_classifier.classify_workouts.
+        """
 
         # If no actual activity recorded
         if not actual_distance or actual_distance == 0:
@@ -72,9 +81,11 @@ class DataProcessor:
         if not planned_distance or planned_distance == 0:
             return "Extra Activity"
 
-        # Define tolerance thresholds
-        distance_tolerance = 10.0  # 10% tolerance
-        pace_tolerance = 5.0       # 5% tolerance for pace
+        # Tolerance thresholds in percent, club-wide unless given per athlete
+        if distance_tolerance is None:
+            distance_tolerance = Config.STATUS_DISTANCE_TOLERANCE_PERCENT
+        if pace_tolerance is None:
+            pace_tolerance = Config.STATUS_PACE_TOLERANCE_PERCENT
 
         distance_within_tolerance = abs(distance_variance) <= distance_tolerance
         pace_within_tolerance = abs(pace_variance) <= pace_tolerance
@@ -95,11 +106,11 @@ class DataProcessor:
             target_date_only = target_date.date() if isinstance(target_date, datetime) else target_date
 
             # Get planned workout for the date - FIX: Use .first() to ensure single result
-            # Handle both date and datetime objects in workout_date
+            # workout_date is stored as midnight, so this is a seek on (athlete_id, workout_date)
             planned_workout = db.session.query(PlannedWorkout).filter(
                 and_(
                     PlannedWorkout.athlete_id == athlete_id,
-                    func.date(PlannedWorkout.workout_date) == target_date_only
+                    PlannedWorkout.workout_date == day_start(target_date_only)
                 )
             ).first()
 
@@ -109,12 +120,11 @@ class DataProcessor:
             else:
                 logger.debug(f"No planned workout found for athlete {athlete_id} on {target_date_only}")
 
-            # Get actual activities for the date - FIX: Use date-only comparison
-            # Convert activity start_date to date for comparison
+            # Get actual activities for the date via the (athlete_id, activity_date) index
             activities = db.session.query(Activity).filter(
                 and_(
                     Activity.athlete_id == athlete_id,
-                    func.date(Activity.start_date) == target_date_only
+                    Activity.activity_date == target_date_only
                 )
             ).distinct().all()
 
@@ -138,37 +148,20 @@ class DataProcessor:
             # Aggregate activities
             aggregated_activities = self.aggregate_daily_activities(activities)
 
-            # Extract values with proper null handling
-            planned_distance = planned_workout.planned_distance_km if planned_workout else 0
-            planned_pace = planned_workout.planned_pace_min_per_km if planned_workout else 0
-            actual_distance = aggregated_activities.get('total_distance_km', 0)
-            actual_pace = aggregated_activities.get('overall_pace_min_per_km', 0)
-
-            # Calculate variances
-            distance_variance = self.calculate_variance(planned_distance, actual_distance)
-            pace_variance = self.calculate_variance(planned_pace, actual_pace) if actual_pace else 0
+            planned = None
+            if planned_workout:
+                planned = {
+                    'planned_distance_km': planned_workout.planned_distance_km,
+                    'planned_pace_min_per_km': planned_workout.planned_pace_min_per_km,
+                    'workout_type': planned_workout.workout_type,
+                    'notes': planned_workout.notes
+                }
 
-            # Determine status
-            status = self.determine_workout_status(
-                distance_variance, pace_variance, planned_distance, actual_distance
+            tolerances = load_status_tolerances([athlete_id])[athlete_id]
+            performance_summary = self.build_performance_summary(
+                athlete_id, target_date_only, aggregated_activities, planned, tolerances
             )
-
-            # Prepare performance summary
-            performance_summary = {
-                'athlete_id': athlete_id,
-                'summary_date': target_date_only,
-                'planned_distance_km': round(planned_distance, 2) if planned_distance else 0,
-                'actual_distance_km': round(actual_distance, 2) if actual_distance else 0,
-                'planned_pace_min_per_km': round(planned_pace, 2) if planned_pace else 0,
-                'actual_pace_min_per_km': round(actual_pace, 2) if actual_pace else 0,
-                'distance_variance_percent': distance_variance,
-                'pace_variance_percent': pace_variance,
-                'status': status,
-                'activity_count': aggregated_activities.get('activity_count', 0),
-                'activity_names': aggregated_activities.get('activity_names', []),
-                'workout_type': planned_workout.workout_type if planned_workout else 'N/A',
-                'planned_notes': planned_workout.notes if planned_workout else ''
-            }
+            status = performance_summary['status']
 
             logger.info(f"Processed daily performance for athlete {athlete_id}: {status}")
             return performance_summary
@@ -177,6 +170,321 @@ class DataProcessor:
             logger.error(f"Failed to process athlete daily performance for athlete {athlete_id}: {e}")
             return None
 
+    def build_performance_summary(self, athlete_id: int, summary_date: date, aggregated_activities: Dict,
+                                  planned: Optional[Dict], tolerances: Optional[Tuple[float, float]] = None) -> Dict:
+        """Build a performance summary from a day's aggregated activities and planned workout"""
+        # Extract values with proper null handling
+        planned_distance = planned['planned_distance_km'] if planned else 0
+        planned_pace = planned['planned_pace_min_per_km'] if planned else 0
+        actual_distance = aggregated_activities.get('total_distance_km', 0)
+        actual_pace = aggregated_activities.get('overall_pace_min_per_km', 0)
+
+        # Calculate variances
+        distance_variance = self.calculate_variance(planned_distance, actual_distance)
+        pace_variance = self.calculate_variance(planned_pace, actual_pace) if actual_pace else 0
+
+        # Determine status
+        distance_tolerance, pace_tolerance = tolerances if tolerances else (None, None)
+        status = self.determine_workout_status(
+            distance_variance, pace_variance, planned_distance, actual_distance,
+            distance_tolerance, pace_tolerance
+        )
+
+        return self._summary_record(athlete_id, summary_date, aggregated_activities, planned,
+                                    distance_variance, pace_variance, status)
+
+    @staticmethod
+    def _summary_record(athlete_id: int, summary_date: date, aggregated_activities: Dict, planned: Optional[Dict],
+                        distance_variance: float, pace_variance: float, status: str) -> Dict:
+        planned_distance = planned['planned_distance_km'] if planned else 0
+        planned_pace = planned['planned_pace_min_per_km'] if planned else 0
+        actual_distance = aggregated_activities.get('total_distance_km', 0)
+        actual_pace = aggregated_activities.get('overall_pace_min_per_km', 0)
+
+        return {
+            'athlete_id': athlete_id,
+            'summary_date': summary_date,
+            'planned_distance_km': round(planned_distance, 2) if planned_distance else 0,
+            'actual_distance_km': round(actual_distance, 2) if actual_distance else 0,
+            'planned_pace_min_per_km': round(planned_pace, 2) if planned_pace else 0,
+            'actual_pace_min_per_km': round(actual_pace, 2) if actual_pace else 0,
+            'distance_variance_percent': distance_variance,
+            'pace_variance_percent': pace_variance,
+            'status': status,
+            'activity_count': aggregated_activities.get('activity_count', 0),
+            'activity_names': aggregated_activities.get('activity_names', []),
+            'workout_type': planned['workout_type'] if planned else 'N/A',
+            'planned_notes': planned['notes'] if planned else ''
+        }
+
+    def compute_daily_summaries(self, start_date, end_date, athlete_ids: Optional[List[int]] = None,
+                                keys: Optional[Set[Tuple[int, date]]] = None) -> List[Dict]:
+        """Compute performance summaries for many athletes and days with one grouped query.
+
+        Activities are aggregated per athlete and day and joined to that day's
+        planned workout. Every athlete/day in the range gets a summary (days
+        without data count as missed), or only the (athlete_id, date) pairs in
+        keys when given. athlete_ids defaults to all active athletes.
+        """
+        start_day = start_date.date() if isinstance(start_date, datetime) else start_date
+        end_day = end_date.date() if isinstance(end_date, datetime) else end_date
+        range_start = datetime.combine(start_day, datetime.min.time())
+        range_end = datetime.combine(end_day, datetime.min.time()) + timedelta(days=1)
+
+        if athlete_ids is None:
+            athlete_ids = sorted({athlete_id for athlete_id, _ in keys}) if keys else [
+                athlete.id for athlete in Athlete.query.filter_by(is_active=True).all()
+            ]
+        if not athlete_ids:
+            return []
+
+        activity_day = Activity.activity_date
+        activity_totals = select(
+            Activity.athlete_id.label('athlete_id'),
+            activity_day.label('day'),
+            func.sum(Activity.distance_km).label('total_distance'),
+            func.sum(Activity.moving_time_seconds).label('total_time'),
+            func.count(Activity.id).label('activity_count'),
+            string_agg(Activity.name).label('activity_names')
+        ).where(
+            Activity.athlete_id.in_(athlete_ids),
+            Activity.activity_date >= start_day,
+            Activity.activity_date <= end_day
+        ).group_by(Activity.athlete_id, activity_day).subquery()
+
+        # One planned workout per athlete and day (the oldest, as .first() did)
+        plan_day = func.date(PlannedWorkout.workout_date)
+        first_plan_ids = select(func.min(PlannedWorkout.id)).where(
+            PlannedWorkout.athlete_id.in_(athlete_ids),
+            PlannedWorkout.workout_date >= range_start,
+            PlannedWorkout.workout_date < range_end
+        ).group_by(PlannedWorkout.athlete_id, plan_day)
+        plans = select(
+            PlannedWorkout.athlete_id.label('athlete_id'),
+            plan_day.label('day'),
+            PlannedWorkout.planned_distance_km,
+            PlannedWorkout.planned_pace_min_per_km,
+            PlannedWorkout.workout_type,
+            PlannedWorkout.notes
+        ).where(PlannedWorkout.id.in_(first_plan_ids)).subquery()
+
+        day_keys = union(
+            select(activity_totals.c.athlete_id, activity_totals.c.day),
+            select(plans.c.athlete_id, plans.c.day)
+        ).subquery()
+
+        rows = db.session.execute(
+            select(
+                day_keys.c.athlete_id, day_keys.c.day,
+                activity_totals.c.total_distance, activity_totals.c.total_time,
+                activity_totals.c.activity_count, activity_totals.c.activity_names,
+                plans.c.planned_distance_km, plans.c.planned_pace_min_per_km,
+                plans.c.workout_type, plans.c.notes
+            ).select_from(
+                day_keys.outerjoin(activity_totals, and_(activity_totals.c.athlete_id == day_keys.c.athlete_id,
+                                                         activity_totals.c.day == day_keys.c.day))
+                .outerjoin(plans, and_(plans.c.athlete_id == day_keys.c.athlete_id,
+                                       plans.c.day == day_keys.c.day))
+            )
+        ).all()
+
+        day_data = {}
+        for row in rows:
+            row_day = date.fromisoformat(row.day) if isinstance(row.day, str) else row.day
+            day_data[(row.athlete_id, row_day)] = row
+
+        if keys is not None:
+            targets = sorted(key for key in keys if start_day <= key[1] <= end_day)
+        else:
+            days = [start_day + timedelta(days=offset) for offset in range((end_day - start_day).days + 1)]
+            targets = [(athlete_id, day) for athlete_id in athlete_ids for day in days]
+
+        totals = [self._aggregate_totals(day_data.get(key)) for key in targets]
+        plans_by_key = [self._planned_from_row(day_data.get(key)) for key in targets]
+
+        # Classify every athlete/day at once with each athlete's own tolerances
+        tolerances = load_status_tolerances(athlete_id for athlete_id, _ in targets)
+        classified = classify_workouts(
+            [plan['planned_distance_km'] if plan else 0 for plan in plans_by_key],
+            [total['total_distance_km'] for total in totals],
+            [plan['planned_pace_min_per_km'] if plan else 0 for plan in plans_by_key],
+            [total['overall_pace_min_per_km'] for total in totals],
+            distance_tolerance=[tolerances[athlete_id][0] for athlete_id, _ in targets],
+            pace_tolerance=[tolerances[athlete_id][1] for athlete_id, _ in targets]
+        )
+        distance_variances = classified['distance_variance_percent'].tolist()
+        pace_variances = classified['pace_variance_percent'].tolist()
+        statuses = classified['status'].tolist()
+
+        summaries = [
+            self._summary_record(athlete_id, day, totals[index], plans_by_key[index],
+                                 distance_variances[index], pace_variances[index], statuses[index])
+            for index, (athlete_id, day) in enumerate(targets)
+        ]
+
+        logger.info(f"Computed {len(summaries)} daily summaries from {start_day} to {end_day}")
+        return summaries
+
+    def _aggregate_totals(self, row) -> Dict:
+        """Shape grouped activity totals like aggregate_daily_activities does"""
+        total_distance = (row.total_distance or 0) if row else 0
+        total_time_seconds = (row.total_time or 0) if row else 0
+
+        overall_pace = 0
+        if total_distance > 0 and total_time_seconds > 0:
+            overall_pace = (total_time_seconds / 60) / total_distance
+
+        return {
+            'total_distance_km': round(total_distance, 2),
+            'total_time_seconds': total_time_seconds,
+            'overall_pace_min_per_km': round(overall_pace, 2) if overall_pace else 0,
+            'activity_count': (row.activity_count or 0) if row else 0,
+            'activity_names': [name for name in (row.activity_names or '').split(', ') if name] if row else []
+        }
+
+    @staticmethod
+    def _planned_from_row(row) -> Optional[Dict]:
+        if row is None or row.planned_distance_km is None:
+            return None
+        return {
+            'planned_distance_km': row.planned_distance_km,
+            'planned_pace_min_per_km': row.planned_pace_min_per_km,
+            'workout_type': row.workout_type,
+            'notes': row.notes
+        }
+
+    def save_daily_summaries(self, performance_summaries: List[Dict]) -> int:
+        """Write many daily summaries with one bulk upsert and a single commit"""
+        if not performance_summaries:
+            return 0
+
+        try:
+            now = datetime.utcnow()
+            rows = []
+            for summary in performance_summaries:
+                summary_date = summary['summary_date']
+                if isinstance(summary_date, datetime):
+                    summary_date = summary_date.date()
+
+                rows.append({
+                    'athlete_id': summary['athlete_id'],
+                    'summary_date': datetime.combine(summary_date, datetime.min.time()),
+                    'actual_distance_km': summary.get('actual_distance_km', 0),
+                    'planned_distance_km': summary.get('planned_distance_km', 0),
+                    'actual_pace_min_per_km': summary.get('actual_pace_min_per_km', 0),
+                    'planned_pace_min_per_km': summary.get('planned_pace_min_per_km', 0),
+                    'distance_variance_percent': summary.get('distance_variance_percent', 0),
+                    'pace_variance_percent': summary.get('pace_variance_percent', 0),
+                    'status': summary.get('status', 'Unknown'),
+                    'notes': f"Activities: {', '.join(summary.get('activity_names', []))}",
+                    'created_at': now
+                })
+
+            written = upsert_rows(
+                DailySummary, rows,
+                index_elements=['athlete_id', 'summary_date'],
+                update_columns=['actual_distance_km', 'planned_distance_km', 'actual_pace_min_per_km',
+                                'planned_pace_min_per_km', 'distance_variance_percent',
+                                'pace_variance_percent', 'status', 'notes']
+            )
+            bump_data_version(SUMMARIES)
+            db.session.commit()
+
+            self._update_last_sync_time()
+            logger.info(f"Saved {written} daily summaries")
+            return written
+
+        except Exception as e:
+            logger.error(f"Failed to save daily summaries: {e}")
+            db.session.rollback()
+            return 0
+
+    def process_daily_summaries(self, start_date, end_date, athlete_ids: Optional[List[int]] = None,
+                                keys: Optional[Set[Tuple[int, date]]] = None) -> int:
+        """Recompute and store daily summaries for a date range in a handful of statements"""
+        try:
+            summaries = self.compute_daily_summaries(start_date, end_date, athlete_ids, keys)
+        except Exception as e:
+            logger.error(f"Failed to compute daily summaries from {start_date} to {end_date}: {e}")
+            db.session.rollback()
+            return 0
+        return self.save_daily_summaries(summaries)
+
+    def stored_summaries_query(self, start_date, end_date, athlete_ids: Optional[List[int]] = None):
+        """Query for the columns of stored summaries needed to classify them again"""
+        query = db.session.query(
+            DailySummary.id, DailySummary.athlete_id, DailySummary.status,
+            DailySummary.distance_variance_percent, DailySummary.pace_variance_percent,
+            DailySummary.planned_distance_km, DailySummary.actual_distance_km
+        )
+        if start_date:
+            query = query.filter(DailySummary.summary_date >= datetime.combine(start_date, datetime.min.time()))
+        if end_date:
+            query = query.filter(DailySummary.summary_date < datetime.combine(end_date, datetime.min.time()) + timedelta(days=1))
+        if athlete_ids is not None:
+            query = query.filter(DailySummary.athlete_id.in_(athlete_ids))
+        return query
+
+    def _classify_stored(self, rows, distance_tolerance: Optional[float] = None,
+                         pace_tolerance: Optional[float] = None) -> List[str]:
+        """Statuses for stored rows using fixed tolerances, or each athlete's own when not given"""
+        tolerances = load_status_tolerances(row.athlete_id for row in rows)
+        return classify_variances(
+            [row.distance_variance_percent for row in rows],
+            [row.pace_variance_percent for row in rows],
+            [row.planned_distance_km for row in rows],
+            [row.actual_distance_km for row in rows],
+            distance_tolerance if distance_tolerance is not None else [tolerances[row.athlete_id][0] for row in rows],
+            pace_tolerance if pace_tolerance is not None else [tolerances[row.athlete_id][1] for row in rows]
+        ).tolist()
+
+    def reclassify_daily_summaries(self, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                                   athlete_ids: Optional[List[int]] = None) -> int:
+        """Re-derive stored statuses from stored variances after tolerances change.
+
+        Returns the number of summaries whose status changed.
+        """
+        try:
+            rows = self.stored_summaries_query(start_date, end_date, athlete_ids).all()
+            statuses = self._classify_stored(rows)
+
+            changes = [{'id': row.id, 'status': status}
+                       for row, status in zip(rows, statuses) if row.status != status]
+            if changes:
+                db.session.execute(update(DailySummary), changes)
+                bump_data_version(SUMMARIES)
+            db.session.commit()
+
+            logger.info(f"Reclassified {len(rows)} daily summaries, {len(changes)} changed status")
+            return len(changes)
+
+        except Exception as e:
+            logger.error(f"Failed to reclassify daily summaries: {e}")
+            db.session.rollback()
+            return 0
+
+    def preview_status_tolerances(self, distance_tolerance: Optional[float], pace_tolerance: Optional[float],
+                                  start_date: Optional[date] = None, end_date: Optional[date] = None,
+                                  athlete_ids: Optional[List[int]] = None) -> Dict:
+        """Status breakdown of stored summaries now versus under other tolerances, without saving"""
+        rows = self.stored_summaries_query(start_date, end_date, athlete_ids).all()
+        current = self._classify_stored(rows)
+        what_if = self._classify_stored(rows, distance_tolerance, pace_tolerance)
+
+        current_breakdown = {}
+        what_if_breakdown = {}
+        for status in current:
+            current_breakdown[status] = current_breakdown.get(status, 0) + 1
+        for status in what_if:
+            what_if_breakdown[status] = what_if_breakdown.get(status, 0) + 1
+
+        return {
+            'summaries': len(rows),
+            'changed': sum(1 for before, after in zip(current, what_if) if before != after),
+            'current': current_breakdown,
+            'what_if': what_if_breakdown
+        }
+
     def save_daily_summary(self, performance_summary: Dict) -> bool:
         """Save daily performance summary to database"""
         try:
@@ -251,7 +559,7 @@ class DataProcessor:
 
             # Get all daily summaries for the date - FIX: Use distinct to prevent duplicates
             daily_summaries = db.session.query(DailySummary).filter_by(
-                summary_date=target_date_only
+                summary_date=day_start(target_date_only)
             ).distinct().all()
 
             # FIX: Remove any potential duplicates by athlete_id
@@ -319,86 +627,76 @@ class DataProcessor:
                 'average_pace_variance': 0
             }
 
-    # FIX: Add method to clean up duplicate summaries
-    def cleanup_duplicate_workouts(self) -> int:
-        """Remove duplicate planned workouts, keeping the most recent one"""
-        try:
-            from sqlalchemy import func
-
-            # Find all duplicate groups
-            duplicates_query = db.session.query(
-                PlannedWorkout.athlete_id,
-                func.date(PlannedWorkout.workout_date).label('workout_date'),
-                func.count(PlannedWorkout.id).label('count')
-            ).group_by(
-                PlannedWorkout.athlete_id,
-                func.date(PlannedWorkout.workout_date)
-            ).having(func.count(PlannedWorkout.id) > 1).all()
-
-            total_removed = 0
-
-            for dup in duplicates_query:
-                # Get all records for this athlete/date combination
-                duplicate_records = db.session.query(PlannedWorkout).filter(
-                    PlannedWorkout.athlete_id == dup.athlete_id,
-                    func.date(PlannedWorkout.workout_date) == dup.workout_date
-                ).order_by(PlannedWorkout.id.desc()).all()
-
-                if len(duplicate_records) > 1:
-                    # Keep the first one (highest ID), delete the rest
-                    for record in duplicate_records[1:]:
-                        db.session.delete(record)
-                        total_removed += 1
-
-            if total_removed > 0:
-                db.session.commit()
-                logger.info(f"Removed {total_removed} duplicate planned workouts")
-
-            return total_removed
+    def _cleanup_duplicates(self, model, group_columns: List, day_column, label: str,
+                            dry_run: bool = False, criteria: Tuple = ()) -> int:
+        """Remove all but the newest row of each duplicate group with one statement.
 
-        except Exception as e:
-            logger.error(f"Failed to cleanup duplicate workouts: {e}")
-            db.session.rollback()
-            return 0
+        Days that lose rows are marked dirty, so their summaries, rollups and
+        training load are rebuilt from what remains. With dry_run nothing is
+        changed and the count of rows that would go is returned.
+        """
+        from change_tracker import mark_dirty, recompute_dirty
 
-    def cleanup_duplicate_summaries(self, target_date: datetime = None) -> int:
-        """Remove duplicate daily summaries for a given date or all dates"""
         try:
-            query = db.session.query(DailySummary)
-            if target_date:
-                target_date_only = target_date.date() if isinstance(target_date, datetime) else target_date
-                query = query.filter_by(summary_date=target_date_only)
-
-            all_summaries = query.all()
+            if dry_run:
+                would_remove = delete_duplicates(model, group_columns, *criteria, dry_run=True)
+                logger.info(f"Dry run: {would_remove} duplicate {label} would be removed")
+                return would_remove
+
+            # Only the duplicate rows' keys are read, never the whole table
+            affected = db.session.query(model.athlete_id, day_column).filter(
+                duplicate_rows_filter(model, group_columns, *criteria)
+            ).distinct().all()
 
-            # Group by athlete_id and summary_date
-            grouped_summaries = {}
-            for summary in all_summaries:
-                key = f"{summary.athlete_id}_{summary.summary_date}"
-                if key not in grouped_summaries:
-                    grouped_summaries[key] = []
-                grouped_summaries[key].append(summary)
-
-            duplicates_removed = 0
-            for key, summaries in grouped_summaries.items():
-                if len(summaries) > 1:
-                    # Keep the most recent one, delete others
-                    summaries.sort(key=lambda x: x.id, reverse=True)
-                    for duplicate in summaries[1:]:
-                        db.session.delete(duplicate)
-                        duplicates_removed += 1
-
-            if duplicates_removed > 0:
-                db.session.commit()
-                logger.info(f"Removed {duplicates_removed} duplicate daily summaries")
+            removed = delete_duplicates(model, group_columns, *criteria)
+            if removed:
+                mark_dirty(affected, 'cleanup')
+            db.session.commit()
 
-            return duplicates_removed
+            if removed:
+                logger.info(f"Removed {removed} duplicate {label}")
+                recompute_dirty(self)
+            return removed
 
         except Exception as e:
-            logger.error(f"Failed to cleanup duplicate summaries: {e}")
+            logger.error(f"Failed to cleanup duplicate {label}: {e}")
             db.session.rollback()
             return 0
 
+    def cleanup_duplicate_workouts(self, dry_run: bool = False) -> int:
+        """Remove duplicate planned workouts, keeping the most recent one per athlete and day"""
+        return self._cleanup_duplicates(
+            PlannedWorkout, [PlannedWorkout.athlete_id, func.date(PlannedWorkout.workout_date)],
+            PlannedWorkout.workout_date, 'planned workouts', dry_run
+        )
+
+    def cleanup_duplicate_summaries(self, target_date: datetime = None, dry_run: bool = False) -> int:
+        """Remove duplicate daily summaries for a given date or all dates, keeping the most recent one"""
+        criteria = ()
+        if target_date:
+            criteria = (DailySummary.summary_date >= day_start(target_date),
+                        DailySummary.summary_date < day_start(target_date) + timedelta(days=1))
+        return self._cleanup_duplicates(
+            DailySummary, [DailySummary.athlete_id, func.date(DailySummary.summary_date)],
+            DailySummary.summary_date, 'daily summaries', dry_run, criteria
+        )
+
+    def cleanup_duplicate_activities(self, dry_run: bool = False) -> int:
+        """Remove activities recorded twice (same athlete and start time), keeping the most recent one"""
+        return self._cleanup_duplicates(
+            Activity, [Activity.athlete_id, Activity.start_date],
+            Activity.activity_date, 'activities', dry_run
+        )
+
+    def cleanup_duplicates(self, dry_run: bool = False) -> Dict:
+        """Run every duplicate cleanup and report the rows removed (or that would be) per table"""
+        return {
+            'dry_run': dry_run,
+            'daily_summaries': self.cleanup_duplicate_summaries(dry_run=dry_run),
+            'planned_workouts': self.cleanup_duplicate_workouts(dry_run=dry_run),
+            'activities': self.cleanup_duplicate_activities(dry_run=dry_run)
+        }
+
     def format_pace(self, pace_min_per_km: float) -> str:
         """Format pace as MM:SS per km"""
         if not pace_min_per_km or pace_min_per_km <= 0:
@@ -513,6 +811,7 @@ class DataProcessor:
                             existing_summary.status = performance_summary.get('status', 'Unknown')
                             existing_summary.notes = f"Activities: {', '.join(performance_summary.get('activity_names', []))}"
 
+                bump_data_version(SUMMARIES)
                 db.session.commit()
                 logger.info(f"Successfully saved daily summary for athlete {athlete_id} - includes today's data")
                 return True
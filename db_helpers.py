@@ -0,0 +1,153 @@
+import logging
+from typing import Dict, List, Optional
+from sqlalchemy import insert, delete, select, and_, func, inspect
+from app import db
+
+logger = logging.getLogger(__name__)
+
+# Rows per multi-row INSERT; keeps SQLite well under its bound-parameter limit
+BULK_INSERT_BATCH_SIZE = 500
+
+
+def _dialect_insert(table):
+    """INSERT construct with ON CONFLICT support for the current database, or None"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert(table)
+
+
+# (database url, table, key columns) -> whether a unique key covers exactly those columns
+_unique_key_cache: Dict = {}
+
+
+def has_unique_key(model, columns: List[str]) -> bool:
+    """Whether the table in the database has a unique constraint or index on exactly columns.
+
+    ON CONFLICT needs one; tables created before a model declared its key may
+    lack it until their migration has run. Checked once per process.
+    """
+    bind = db.session.get_bind()
+    cache_key = (str(bind.url), model.__tablename__, tuple(columns))
+    if cache_key not in _unique_key_cache:
+        inspector = inspect(db.session.connection())
+        keys = [constraint['column_names'] for constraint in inspector.get_unique_constraints(model.__tablename__)]
+        keys += [index['column_names'] for index in inspector.get_indexes(model.__tablename__) if index['unique']]
+        _unique_key_cache[cache_key] = sorted(columns) in [sorted(key) for key in keys]
+        if not _unique_key_cache[cache_key]:
+            logger.warning(f"Table {model.__tablename__} has no unique key on {columns}; "
+                           f"upserts fall back to a lookup and update")
+    return _unique_key_cache[cache_key]
+
+
+def _upsert_by_lookup(model, rows: List[Dict], index_elements: List[str], update_columns: List[str]):
+    """Upsert without ON CONFLICT: one query loads the candidate rows, then updates and inserts go in one flush"""
+    candidates = db.session.query(model).filter(*[
+        getattr(model, column).in_({row[column] for row in rows}) for column in index_elements
+    ]).all()
+    existing = {tuple(getattr(record, column) for column in index_elements): record for record in candidates}
+
+    for row in rows:
+        key = tuple(row[column] for column in index_elements)
+        record = existing.get(key)
+        if record is not None:
+            for column in update_columns:
+                setattr(record, column, row[column])
+        else:
+            existing[key] = model(**row)
+            db.session.add(existing[key])
+    db.session.flush()
+
+
+def insert_ignore_duplicates(model, rows: List[Dict], index_elements: Optional[List[str]] = None) -> int:
+    """Insert rows with multi-row INSERT ... ON CONFLICT DO NOTHING in the current transaction.
+
+    Returns the number of rows actually inserted. Does not commit. Databases
+    without ON CONFLICT fall back to one savepoint per row.
+    """
+    if not rows:
+        return 0
+
+    table = model.__table__
+    inserted = 0
+
+    if _dialect_insert(table) is None:
+        for row in rows:
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert(table).values(**row))
+                inserted += 1
+            except Exception:
+                logger.debug(f"Skipped duplicate {model.__name__} row")
+        return inserted
+
+    for offset in range(0, len(rows), BULK_INSERT_BATCH_SIZE):
+        batch = rows[offset:offset + BULK_INSERT_BATCH_SIZE]
+        statement = _dialect_insert(table).values(batch).on_conflict_do_nothing(index_elements=index_elements)
+        result = db.session.execute(statement)
+        inserted += max(result.rowcount or 0, 0)
+
+    return inserted
+
+
+def upsert_rows(model, rows: List[Dict], index_elements: List[str], update_columns: List[str]) -> int:
+    """Insert rows or update update_columns on conflict with index_elements, in the current transaction.
+
+    Uses INSERT ... ON CONFLICT DO UPDATE on SQLite and PostgreSQL, and a
+    bulk lookup and update elsewhere or when the table has no unique key on
+    index_elements. Rows must share the same keys. Does not commit.
+    Returns rows written.
+    """
+    if not rows:
+        return 0
+
+    table = model.__table__
+
+    if _dialect_insert(table) is None or not has_unique_key(model, index_elements):
+        _upsert_by_lookup(model, rows, index_elements, update_columns)
+        return len(rows)
+
+    # One cached statement run as executemany; compiling a multi-row VALUES
+    # clause per batch costs far more than the database work for wide rows
+    statement = _dialect_insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: statement.excluded[column] for column in update_columns}
+    )
+    db.session.execute(statement, rows)
+
+    return len(rows)
+
+
+def duplicate_rows_filter(model, group_columns: List, *criteria):
+    """Condition matching every row except the newest (highest id) of each group_columns group"""
+    keep = select(func.max(model.id)).where(*criteria).group_by(*group_columns)
+    return and_(model.id.notin_(keep), *criteria)
+
+
+def delete_duplicates(model, group_columns: List, *criteria, dry_run: bool = False) -> int:
+    """Delete all but the newest row of each group with one DELETE ... NOT IN (SELECT MAX(id) ...).
+
+    Optional criteria limit both the groups and the deletion. With dry_run
+    the rows are only counted. Runs in the current transaction without
+    loading rows; does not commit. Returns the number of duplicate rows.
+    """
+    condition = duplicate_rows_filter(model, group_columns, *criteria)
+    if dry_run:
+        return db.session.query(func.count(model.id)).filter(condition).scalar() or 0
+
+    result = db.session.execute(
+        delete(model).where(condition).execution_options(synchronize_session=False)
+    )
+    return max(result.rowcount or 0, 0)
+
+
+def string_agg(column, separator: str = ', '):
+    """Concatenate grouped string values (group_concat on SQLite, string_agg elsewhere)"""
+    if db.session.get_bind().dialect.name == 'sqlite':
+        return func.group_concat(column, separator)
+    return func.string_agg(column, separator)
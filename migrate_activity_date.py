@@ -0,0 +1,86 @@
+from app import app, db
+from sqlalchemy import text, func
+from models import PlannedWorkout, day_start
+from db_helpers import delete_duplicates
+
+def migrate_activity_date():
+    """Add Activity.activity_date, normalize PlannedWorkout.workout_date to midnight and add the day indexes,
+    including the unique (athlete_id, workout_date) key"""
+    with app.app_context():
+        try:
+            inspector = db.inspect(db.engine)
+            columns = [col['name'] for col in inspector.get_columns('activity')]
+
+            if 'activity_date' not in columns:
+                with db.engine.connect() as conn:
+                    conn.execute(text('ALTER TABLE activity ADD COLUMN activity_date DATE'))
+                    conn.commit()
+                print("Added column: activity_date")
+            else:
+                print("Column activity_date already exists")
+
+            # start_date holds the athlete-local start time, so its date is the local day
+            with db.engine.connect() as conn:
+                result = conn.execute(text(
+                    'UPDATE activity SET activity_date = DATE(start_date) WHERE activity_date IS NULL'
+                ))
+                conn.commit()
+            print(f"Backfilled activity_date for {result.rowcount} activities")
+
+            # Planned workouts must sit at midnight for equality lookups. Normalizing
+            # can make two rows land on the same day, so duplicates go first,
+            # keeping the newest row per athlete and day
+            removed = delete_duplicates(
+                PlannedWorkout, [PlannedWorkout.athlete_id, func.date(PlannedWorkout.workout_date)]
+            )
+            db.session.commit()
+            print(f"Removed {removed} duplicate planned workouts")
+
+            normalized = 0
+            for workout in PlannedWorkout.query.all():
+                midnight = day_start(workout.workout_date)
+                if workout.workout_date != midnight:
+                    workout.workout_date = midnight
+                    normalized += 1
+            db.session.commit()
+            print(f"Normalized {normalized} planned workout dates")
+
+            # Tables created before the model declared it lack the unique key the plan upsert needs
+            inspector = db.inspect(db.engine)
+            key_columns = ['athlete_id', 'workout_date']
+            has_unique_key = any(
+                constraint['column_names'] == key_columns
+                for constraint in inspector.get_unique_constraints('planned_workout')
+            ) or any(
+                index['unique'] and index['column_names'] == key_columns
+                for index in inspector.get_indexes('planned_workout')
+            )
+            if not has_unique_key:
+                with db.engine.connect() as conn:
+                    conn.execute(text(
+                        'CREATE UNIQUE INDEX unique_athlete_workout_date ON planned_workout (athlete_id, workout_date)'
+                    ))
+                    conn.commit()
+                print("Added unique index: unique_athlete_workout_date")
+            else:
+                print("Unique (athlete_id, workout_date) key already exists")
+
+            indexes = {
+                'idx_activity_athlete_date': 'activity (athlete_id, activity_date)',
+                'idx_activity_date': 'activity (activity_date)',
+                'idx_planned_workout_date': 'planned_workout (workout_date)'
+            }
+            with db.engine.connect() as conn:
+                for name, definition in indexes.items():
+                    conn.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON {definition}'))
+                conn.commit()
+            print(f"Ensured indexes: {', '.join(indexes)}")
+
+            print("Migration completed successfully")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"Migration error: {e}")
+
+if __name__ == "__main__":
+    migrate_activity_date()
@@ -0,0 +1,32 @@
+from app import app, db
+from sqlalchemy import text
+from models import DailySummary
+
+def migrate_daily_summary_indexes():
+    """Create the DailySummary indexes declared on the model, replacing stale definitions"""
+    with app.app_context():
+        try:
+            inspector = db.inspect(db.engine)
+            existing = {index['name']: index['column_names'] for index in inspector.get_indexes('daily_summary')}
+
+            for index in DailySummary.__table__.indexes:
+                columns = [column.name for column in index.columns]
+                if existing.get(index.name) == columns:
+                    print(f"Index {index.name} already exists")
+                    continue
+
+                with db.engine.connect() as conn:
+                    if index.name in existing:
+                        conn.execute(text(f'DROP INDEX {index.name}'))
+                        print(f"Dropped outdated index: {index.name}")
+                    conn.execute(text(f'CREATE INDEX {index.name} ON daily_summary ({", ".join(columns)})'))
+                    conn.commit()
+                print(f"Created index: {index.name} ({', '.join(columns)})")
+
+            print("Migration completed successfully")
+
+        except Exception as e:
+            print(f"Migration error: {e}")
+
+if __name__ == "__main__":
+    migrate_daily_summary_indexes()
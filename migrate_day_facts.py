@@ -0,0 +1,28 @@
+from app import app, db
+from models import AthleteDayFact
+from rollups import rebuild_day_facts
+
+def migrate_day_facts():
+    """Create the athlete_day_fact table and fill one row per athlete per day from the tracking start"""
+    with app.app_context():
+        try:
+            inspector = db.inspect(db.engine)
+
+            if 'athlete_day_fact' not in inspector.get_table_names():
+                AthleteDayFact.__table__.create(db.engine)
+                print("Created table: athlete_day_fact")
+            else:
+                print("Table athlete_day_fact already exists")
+
+            # Safe to re-run: every day is recomputed from the base tables
+            written = rebuild_day_facts()
+            print(f"Rebuilt {written} athlete day facts")
+
+            print("Migration completed successfully")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"Migration error: {e}")
+
+if __name__ == "__main__":
+    migrate_day_facts()
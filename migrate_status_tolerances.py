@@ -0,0 +1,32 @@
+from app import app, db
+from sqlalchemy import text
+
+def migrate_status_tolerances():
+    """Add per-athlete workout status tolerances to the OptimalValues table"""
+    with app.app_context():
+        try:
+            inspector = db.inspect(db.engine)
+            columns = [col['name'] for col in inspector.get_columns('optimal_values')]
+
+            new_fields = {
+                'distance_tolerance_percent': 'FLOAT',
+                'pace_tolerance_percent': 'FLOAT'
+            }
+
+            for field, column_type in new_fields.items():
+                if field not in columns:
+                    with db.engine.connect() as conn:
+                        conn.execute(text(f'ALTER TABLE optimal_values ADD COLUMN {field} {column_type}'))
+                        conn.commit()
+                    print(f"Added column: {field}")
+                else:
+                    print(f"Column {field} already exists")
+
+            # Existing rows keep NULL so they follow the global row and Config defaults
+            print("Migration completed successfully")
+
+        except Exception as e:
+            print(f"Migration error: {e}")
+
+if __name__ == "__main__":
+    migrate_status_tolerances()
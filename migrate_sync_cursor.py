@@ -0,0 +1,49 @@
+from app import app, db
+from sqlalchemy import text
+
+def migrate_sync_cursor():
+    """Add the incremental sync cursor to the Athlete table and seed it from stored activities"""
+    with app.app_context():
+        try:
+            inspector = db.inspect(db.engine)
+            columns = [col['name'] for col in inspector.get_columns('athlete')]
+
+            new_fields = {
+                'last_synced_activity_at': 'TIMESTAMP',
+                'last_synced_activity_id': 'BIGINT'
+            }
+
+            for field, column_type in new_fields.items():
+                if field not in columns:
+                    with db.engine.connect() as conn:
+                        conn.execute(text(f'ALTER TABLE athlete ADD COLUMN {field} {column_type}'))
+                        conn.commit()
+                    print(f"Added column: {field}")
+                else:
+                    print(f"Column {field} already exists")
+
+            # Seed cursors from the newest activity already stored for each athlete
+            with db.engine.connect() as conn:
+                result = conn.execute(text('''
+                    UPDATE athlete
+                    SET last_synced_activity_at = (
+                            SELECT MAX(a.start_date) FROM activity a WHERE a.athlete_id = athlete.id
+                        ),
+                        last_synced_activity_id = (
+                            SELECT a.strava_activity_id FROM activity a
+                            WHERE a.athlete_id = athlete.id
+                            ORDER BY a.start_date DESC
+                            LIMIT 1
+                        )
+                    WHERE last_synced_activity_at IS NULL
+                '''))
+                conn.commit()
+            print(f"Seeded sync cursor for {result.rowcount} athletes")
+
+            print("Migration completed successfully")
+
+        except Exception as e:
+            print(f"Migration error: {e}")
+
+if __name__ == "__main__":
+    migrate_sync_cursor()
@@ -0,0 +1,28 @@
+from app import app, db
+from models import TrainingLoad
+from training_load import rebuild_training_load
+
+def migrate_training_load():
+    """Create the training_load table and compute every athlete's history (run migrate_day_facts.py first)"""
+    with app.app_context():
+        try:
+            inspector = db.inspect(db.engine)
+
+            if 'training_load' not in inspector.get_table_names():
+                TrainingLoad.__table__.create(db.engine)
+                print("Created table: training_load")
+            else:
+                print("Table training_load already exists")
+
+            # Safe to re-run: the full history is recomputed from the day facts
+            written = rebuild_training_load()
+            print(f"Rebuilt {written} training load days")
+
+            print("Migration completed successfully")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"Migration error: {e}")
+
+if __name__ == "__main__":
+    migrate_training_load()
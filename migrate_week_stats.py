@@ -0,0 +1,28 @@
+from app import app, db
+from models import AthleteWeekStats
+from rollups import rebuild_week_stats
+
+def migrate_week_stats():
+    """Create the athlete_week_stats table and fill it from existing activities, plans and summaries"""
+    with app.app_context():
+        try:
+            inspector = db.inspect(db.engine)
+
+            if 'athlete_week_stats' not in inspector.get_table_names():
+                AthleteWeekStats.__table__.create(db.engine)
+                print("Created table: athlete_week_stats")
+            else:
+                print("Table athlete_week_stats already exists")
+
+            # Safe to re-run: every week is recomputed from the base tables
+            written = rebuild_week_stats()
+            print(f"Rebuilt {written} athlete week rows")
+
+            print("Migration completed successfully")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"Migration error: {e}")
+
+if __name__ == "__main__":
+    migrate_week_stats()
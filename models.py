@@ -1,6 +1,21 @@
 from app import db
-from datetime import datetime
+from datetime import datetime, date
 from sqlalchemy import Text, Float, Integer, String, DateTime, Boolean, UniqueConstraint
+from sqlalchemy.orm import validates
+
+
+def day_start(value) -> datetime:
+    """Midnight of the given date or datetime, the stored form of date-only DateTime columns"""
+    if isinstance(value, datetime):
+        return datetime.combine(value.date(), datetime.min.time())
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time())
+    return value
+
+
+def _activity_date_default(context):
+    start_date = context.get_current_parameters().get('start_date')
+    return start_date.date() if isinstance(start_date, datetime) else None
 
 
 class Athlete(db.Model):
@@ -11,6 +26,9 @@ class Athlete(db.Model):
     refresh_token = db.Column(db.String(255), nullable=True)
     access_token = db.Column(db.String(255), nullable=True)
     token_expires_at = db.Column(db.DateTime, nullable=True)
+    # Incremental sync cursor: newest activity seen from Strava
+    last_synced_activity_at = db.Column(db.DateTime, nullable=True)
+    last_synced_activity_id = db.Column(db.BigInteger, nullable=True)
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -33,7 +51,8 @@ class Activity(db.Model):
                            nullable=False)
     name = db.Column(db.String(200), nullable=False)
     activity_type = db.Column(db.String(50), nullable=False)
-    start_date = db.Column(db.DateTime, nullable=False)
+    start_date = db.Column(db.DateTime, nullable=False)  # Athlete-local (Strava start_date_local)
+    activity_date = db.Column(db.Date, nullable=True, default=_activity_date_default)  # Local day of start_date
     distance_km = db.Column(db.Float, nullable=False)
     moving_time_seconds = db.Column(db.Integer, nullable=False)
     pace_min_per_km = db.Column(db.Float, nullable=True)
@@ -43,7 +62,14 @@ class Activity(db.Model):
     total_elevation_gain = db.Column(db.Float, nullable=True)  # meters
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     __table_args__ = (db.UniqueConstraint('strava_activity_id',
-                                          name='unique_strava_activity'), )
+                                          name='unique_strava_activity'),
+                      db.Index('idx_activity_athlete_date', 'athlete_id', 'activity_date'),
+                      db.Index('idx_activity_date', 'activity_date'))
+
+    @validates('start_date')
+    def _sync_activity_date(self, key, value):
+        self.activity_date = value.date() if isinstance(value, datetime) else value
+        return value
 
 
 class PlannedWorkout(db.Model):
@@ -59,8 +85,16 @@ class PlannedWorkout(db.Model):
     notes = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # workout_date is always stored as midnight so day lookups are plain equality
+    # seeks on the unique (athlete_id, workout_date) index; migrate_activity_date.py
+    # adds it to tables created before it was declared
     __table_args__ = (db.UniqueConstraint(
-        'athlete_id', 'workout_date', name='unique_athlete_workout_date'), )
+        'athlete_id', 'workout_date', name='unique_athlete_workout_date'),
+                      db.Index('idx_planned_workout_date', 'workout_date'))
+
+    @validates('workout_date')
+    def _normalize_workout_date(self, key, value):
+        return day_start(value)
 
 
 class DailySummary(db.Model):
@@ -81,17 +115,169 @@ class DailySummary(db.Model):
     notes = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-
-    # Add indexes for better query performance
+    # One summary per athlete per day; the unique index also serves athlete_id lookups.
+    # The date index covers the period-filtered dashboard reads without touching the table.
     __table_args__ = (
         UniqueConstraint('athlete_id', 'summary_date', name='uq_daily_summary_athlete_date'),
-        db.Index('idx_daily_summary_date', 'summary_date'),
-        db.Index('idx_daily_summary_athlete', 'athlete_id'),
-        db.Index('idx_daily_summary_status', 'status')
+        db.Index('idx_daily_summary_date', 'summary_date', 'athlete_id', 'status',
+                 'actual_distance_km', 'planned_distance_km'),
+        db.Index('idx_daily_summary_status', 'status', 'summary_date')
+    )
+
+class BackfillJob(db.Model):
+    """Model for a resumable historical Strava backfill of one athlete and date range"""
+    __tablename__ = 'backfill_job'
+
+    id = db.Column(db.Integer, primary_key=True)
+    athlete_id = db.Column(db.Integer,
+                           db.ForeignKey('athlete.id'),
+                           nullable=False)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)
+    cursor_date = db.Column(db.Date, nullable=False)  # Next day to fetch (checkpoint)
+    status = db.Column(db.String(20), nullable=False,
+                       default='pending')  # pending, running, paused, completed, failed
+    activities_saved = db.Column(db.Integer, default=0)
+    requests_used = db.Column(db.Integer, default=0)
+    attempts = db.Column(db.Integer, default=0)
+    error = db.Column(db.Text, nullable=True)
+    resume_after = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    athlete = db.relationship('Athlete', backref='backfill_jobs')
+
+    __table_args__ = (db.Index('idx_backfill_job_status', 'status'), )
+
+
+class SyncJob(db.Model):
+    """Model for a queued Strava sync requested from the web UI, run by a background worker"""
+    __tablename__ = 'sync_job'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(20), nullable=False)  # incremental, single_day, range
+    sync_type = db.Column(db.String(20), nullable=True)  # all, individual (range jobs)
+    athlete_id = db.Column(db.Integer, db.ForeignKey('athlete.id'), nullable=True)
+    start_date = db.Column(db.Date, nullable=True)
+    end_date = db.Column(db.Date, nullable=True)
+    status = db.Column(db.String(20), nullable=False,
+                       default='pending')  # pending, running, completed, failed
+    athletes_total = db.Column(db.Integer, default=0)
+    athletes_done = db.Column(db.Integer, default=0)
+    activities_saved = db.Column(db.Integer, default=0)
+    requests_used = db.Column(db.Integer, default=0)
+    progress = db.Column(db.Text, nullable=True)  # JSON list of per-athlete results with per-day counts
+    message = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    athlete = db.relationship('Athlete', backref='sync_jobs')
+
+    __table_args__ = (db.Index('idx_sync_job_status', 'status'), )
+
+
+class AthleteWeekStats(db.Model):
+    """Model for per-athlete ISO week totals, rolled up from activities, plans and summaries"""
+    __tablename__ = 'athlete_week_stats'
+
+    id = db.Column(db.Integer, primary_key=True)
+    athlete_id = db.Column(db.Integer, db.ForeignKey('athlete.id'), nullable=False)
+    week_start = db.Column(db.Date, nullable=False)  # Monday of the ISO week
+    actual_distance_km = db.Column(db.Float, default=0.0)
+    planned_distance_km = db.Column(db.Float, default=0.0)
+    run_count = db.Column(db.Integer, default=0)
+    moving_time_seconds = db.Column(db.Integer, default=0)
+    elevation_gain_m = db.Column(db.Float, default=0.0)
+    last_activity_date = db.Column(db.Date, nullable=True)
+    summary_days = db.Column(db.Integer, default=0)  # Days with a DailySummary
+    completed_days = db.Column(db.Integer, default=0)  # On Track, Over-performed or Partially Completed
+    distance_variance_total = db.Column(db.Float, default=0.0)  # Sum over summary days, for averages
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('athlete_id', 'week_start', name='uq_athlete_week_stats'),
+        db.Index('idx_athlete_week_stats_week', 'week_start')
     )
 
-    # This is the KEY change: Ensure only one summary per athlete per day
-    __table_args__ = (UniqueConstraint('athlete_id', 'summary_date', name='uq_daily_summary_athlete_date'),)
+
+class AthleteDayFact(db.Model):
+    """Model for one row per athlete per calendar day, zero days included, for time-series reads"""
+    __tablename__ = 'athlete_day_fact'
+
+    id = db.Column(db.Integer, primary_key=True)
+    athlete_id = db.Column(db.Integer, db.ForeignKey('athlete.id'), nullable=False)
+    fact_date = db.Column(db.Date, nullable=False)
+    distance_km = db.Column(db.Float, default=0.0)
+    moving_time_seconds = db.Column(db.Integer, default=0)
+    run_count = db.Column(db.Integer, default=0)
+    average_heartrate = db.Column(db.Float, nullable=True)  # Weighted by moving time
+    pace_min_per_km = db.Column(db.Float, nullable=True)  # Total moving time over total distance
+    elevation_gain_m = db.Column(db.Float, default=0.0)
+    planned_distance_km = db.Column(db.Float, nullable=True)
+    planned_pace_min_per_km = db.Column(db.Float, nullable=True)
+    # Copied from the DailySummary; status is NULL on days without one
+    distance_variance_percent = db.Column(db.Float, nullable=True)
+    pace_variance_percent = db.Column(db.Float, nullable=True)
+    status = db.Column(db.String(50), nullable=True)
+    notes = db.Column(db.Text, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # The unique index serves per-athlete ranges, the date index all-athlete ranges
+    __table_args__ = (
+        UniqueConstraint('athlete_id', 'fact_date', name='uq_athlete_day_fact'),
+        db.Index('idx_athlete_day_fact_date', 'fact_date', 'athlete_id')
+    )
+
+
+class TrainingLoad(db.Model):
+    """Model for per-athlete daily training load: EWMA acute and chronic load, balance and ratio"""
+    __tablename__ = 'training_load'
+
+    id = db.Column(db.Integer, primary_key=True)
+    athlete_id = db.Column(db.Integer, db.ForeignKey('athlete.id'), nullable=False)
+    load_date = db.Column(db.Date, nullable=False)
+    daily_load = db.Column(db.Float, default=0.0)  # km or moving minutes, per TRAINING_LOAD_METRIC
+    acute_load = db.Column(db.Float, default=0.0)  # ATL (fatigue)
+    chronic_load = db.Column(db.Float, default=0.0)  # CTL (fitness)
+    training_stress_balance = db.Column(db.Float, default=0.0)  # TSB (form): chronic minus acute
+    acute_chronic_ratio = db.Column(db.Float, nullable=True)  # ACWR; NULL while chronic load is zero
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('athlete_id', 'load_date', name='uq_training_load_athlete_date'),
+        db.Index('idx_training_load_date', 'load_date')
+    )
+
+
+class SummaryDirtyDay(db.Model):
+    """Model for athlete days whose DailySummary is stale and must be recomputed"""
+    __tablename__ = 'summary_dirty_day'
+
+    id = db.Column(db.Integer, primary_key=True)
+    athlete_id = db.Column(db.Integer, db.ForeignKey('athlete.id'), nullable=False)
+    summary_date = db.Column(db.Date, nullable=False)
+    reason = db.Column(db.String(50), nullable=True)  # activity, plan, range sync, daily
+    marked_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('athlete_id', 'summary_date', name='uq_summary_dirty_day'),
+        db.Index('idx_summary_dirty_day_date', 'summary_date')
+    )
+
+
+class DataVersion(db.Model):
+    """Version counter per data tag; writers bump it to invalidate cached responses"""
+    __tablename__ = 'data_version'
+
+    id = db.Column(db.Integer, primary_key=True)
+    tag = db.Column(db.String(50), nullable=False, unique=True)  # activities, plans, summaries, athletes, settings, sync
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 
 class SystemLog(db.Model):
     """Model for storing system execution logs"""
@@ -124,13 +310,16 @@ class OptimalValues(db.Model):
     __tablename__ = 'optimal_values'
 
     id = db.Column(db.Integer, primary_key=True)
-    athlete_id = db.Column(db.Integer, db.ForeignKey('athletes.id'), nullable=True)  # None for global defaults
+    athlete_id = db.Column(db.Integer, db.ForeignKey('athlete.id'), nullable=True)  # None for global defaults
     optimal_distance_km = db.Column(db.Float, default=10.0)
     optimal_pace_min_per_km = db.Column(db.Float, default=5.5)
     optimal_heart_rate_bpm = db.Column(db.Integer, default=150)
     max_heart_rate_bpm = db.Column(db.Integer, default=180)
     optimal_elevation_gain_m = db.Column(db.Float, default=100.0)
     weekly_distance_target_km = db.Column(db.Float, default=50.0)
+    # Workout status tolerances in percent; NULL falls back to the global row, then Config
+    distance_tolerance_percent = db.Column(db.Float, nullable=True)
+    pace_tolerance_percent = db.Column(db.Float, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -0,0 +1,132 @@
+import logging
+from typing import Dict, Iterable, Optional, Tuple, Union
+import numpy as np
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+STATUS_MISSED = "Missed Workout"
+STATUS_EXTRA = "Extra Activity"
+STATUS_ON_TRACK = "On Track"
+STATUS_UNDER = "Under-performed"
+STATUS_OVER = "Over-performed"
+STATUS_PARTIAL = "Partially Completed"
+
+ArrayLike = Union[Iterable[Optional[float]], np.ndarray]
+Tolerance = Union[float, ArrayLike]
+
+
+def _as_array(values: ArrayLike) -> np.ndarray:
+    """Float array with missing values (None/NaN) treated as 0, like the scalar code's falsy checks"""
+    return np.nan_to_num(np.asarray(values, dtype=float), nan=0.0)
+
+
+def calculate_variances(planned: ArrayLike, actual: ArrayLike) -> np.ndarray:
+    """Percentage variance of actual against planned, 0 where nothing was planned"""
+    planned = _as_array(planned)
+    actual = _as_array(actual)
+
+    variance = np.zeros_like(planned)
+    has_plan = planned != 0
+    np.divide((actual - planned) * 100, planned, out=variance, where=has_plan)
+    return np.round(variance, 2)
+
+
+def classify_workouts(planned_distance: ArrayLike, actual_distance: ArrayLike,
+                      planned_pace: ArrayLike, actual_pace: ArrayLike,
+                      distance_tolerance: Tolerance = None, pace_tolerance: Tolerance = None) -> Dict[str, np.ndarray]:
+    """Vectorized DataProcessor.calculate_variance + determine_workout_status.
+
+    Takes equal-length columns and returns the distance and pace variance
+    arrays and a status array. Tolerances (in percent) may be scalars or
+    per-row arrays and default to the configured club-wide values.
+    """
+    actual_pace = _as_array(actual_pace)
+
+    distance_variance = calculate_variances(planned_distance, actual_distance)
+    # Pace variance only counts when a pace was actually recorded
+    pace_variance = np.where(actual_pace != 0, calculate_variances(planned_pace, actual_pace), 0.0)
+
+    status = classify_variances(distance_variance, pace_variance, planned_distance, actual_distance,
+                                distance_tolerance, pace_tolerance)
+
+    return {
+        'distance_variance_percent': distance_variance,
+        'pace_variance_percent': pace_variance,
+        'status': status
+    }
+
+
+def classify_variances(distance_variance: ArrayLike, pace_variance: ArrayLike,
+                       planned_distance: ArrayLike, actual_distance: ArrayLike,
+                       distance_tolerance: Tolerance = None, pace_tolerance: Tolerance = None) -> np.ndarray:
+    """Statuses for already-computed variances, e.g. stored summaries under what-if tolerances"""
+    distance_variance = _as_array(distance_variance)
+    pace_variance = _as_array(pace_variance)
+    planned_distance = _as_array(planned_distance)
+    actual_distance = _as_array(actual_distance)
+
+    if distance_tolerance is None:
+        distance_tolerance = Config.STATUS_DISTANCE_TOLERANCE_PERCENT
+    if pace_tolerance is None:
+        pace_tolerance = Config.STATUS_PACE_TOLERANCE_PERCENT
+    distance_tolerance = _as_array(distance_tolerance)
+    pace_tolerance = _as_array(pace_tolerance)
+
+    # Same precedence as the scalar if/elif chain in DataProcessor.determine_workout_status
+    conditions = [
+        actual_distance == 0,
+        planned_distance == 0,
+        (np.abs(distance_variance) <= distance_tolerance) & (np.abs(pace_variance) <= pace_tolerance),
+        (distance_variance < -distance_tolerance) | (pace_variance > pace_tolerance),
+        (distance_variance > distance_tolerance) | (pace_variance < -pace_tolerance),
+    ]
+    choices = [STATUS_MISSED, STATUS_EXTRA, STATUS_ON_TRACK, STATUS_UNDER, STATUS_OVER]
+    return np.select(conditions, choices, default=STATUS_PARTIAL).astype(object)
+
+
+def load_status_tolerances(athlete_ids: Iterable[int]) -> Dict[int, Tuple[float, float]]:
+    """(distance, pace) tolerance per athlete from OptimalValues.
+
+    An athlete's own row wins, then the global row (athlete_id NULL), then
+    the configured defaults; each tolerance falls back independently.
+    """
+    from models import OptimalValues
+    from app import db
+
+    athlete_ids = list(set(athlete_ids))
+    defaults = (Config.STATUS_DISTANCE_TOLERANCE_PERCENT, Config.STATUS_PACE_TOLERANCE_PERCENT)
+    if not athlete_ids:
+        return {}
+
+    try:
+        rows = db.session.query(
+            OptimalValues.athlete_id,
+            OptimalValues.distance_tolerance_percent,
+            OptimalValues.pace_tolerance_percent
+        ).filter(
+            (OptimalValues.athlete_id.in_(athlete_ids)) | (OptimalValues.athlete_id.is_(None))
+        ).order_by(OptimalValues.id).all()
+    except Exception as e:
+        logger.error(f"Failed to load status tolerances, using defaults: {e}")
+        db.session.rollback()
+        return {athlete_id: defaults for athlete_id in athlete_ids}
+
+    by_athlete = {}
+    for row in rows:
+        by_athlete.setdefault(row.athlete_id, row)
+
+    global_row = by_athlete.get(None)
+    global_distance = global_row.distance_tolerance_percent if global_row else None
+    global_pace = global_row.pace_tolerance_percent if global_row else None
+
+    tolerances = {}
+    for athlete_id in athlete_ids:
+        row = by_athlete.get(athlete_id)
+        distance = row.distance_tolerance_percent if row else None
+        pace = row.pace_tolerance_percent if row else None
+        tolerances[athlete_id] = (
+            distance if distance is not None else global_distance if global_distance is not None else defaults[0],
+            pace if pace is not None else global_pace if global_pace is not None else defaults[1]
+        )
+    return tolerances
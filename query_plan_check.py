@@ -0,0 +1,184 @@
+"""Check that the hot dashboard queries still use indexes.
+
+    python query_plan_check.py
+
+Runs EXPLAIN QUERY PLAN (SQLite) or EXPLAIN (PostgreSQL) for every query in
+hot_queries() against the configured database and exits with status 1 when
+any of them falls back to a full table scan. The queries mirror the reads in
+routes.py, data_processor.py and dashboard_builder.py; keep them in step when
+those change. The same report is served at /debug/query-plans.
+"""
+import sys
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+from sqlalchemy import event, select, func, distinct, case, and_
+from app import app, db
+from models import Athlete, Activity, PlannedWorkout, DailySummary, AthleteWeekStats, AthleteDayFact, TrainingLoad, day_start
+from data_processor import DataProcessor
+from rollups import day_facts_query
+
+logger = logging.getLogger(__name__)
+
+# Small dimension tables that may be scanned to drive a join
+SCAN_ALLOWED_TABLES = {'athlete'}
+
+
+def hot_queries() -> Dict[str, object]:
+    """Statements to check, keyed by the code path that runs them"""
+    today = datetime.now().date()
+    week_start = today - timedelta(days=today.weekday())
+    week_end = week_start + timedelta(days=6)
+    ten_days_ago = datetime.now() - timedelta(days=10)
+    athlete_id = 1
+
+    return {
+        'routes.index weekly tiles': select(
+            func.sum(AthleteWeekStats.actual_distance_km), func.sum(AthleteWeekStats.planned_distance_km)
+        ).where(AthleteWeekStats.week_start == week_start, AthleteWeekStats.athlete_id.in_([athlete_id])),
+        'routes.get_leader_dashboard_data': select(
+            Athlete.id, Athlete.name,
+            func.sum(case((AthleteWeekStats.week_start == week_start, AthleteWeekStats.actual_distance_km), else_=0)),
+            func.max(AthleteWeekStats.last_activity_date)
+        ).outerjoin(AthleteWeekStats, and_(
+            AthleteWeekStats.athlete_id == Athlete.id,
+            AthleteWeekStats.week_start >= week_start - timedelta(days=7),
+            AthleteWeekStats.week_start <= week_start
+        )).where(Athlete.is_active == True).group_by(Athlete.id, Athlete.name),
+        'routes._training_summary_rows': day_facts_query(ten_days_ago, today).filter(
+            AthleteDayFact.status.isnot(None)
+        ).order_by(AthleteDayFact.fact_date.desc(), Athlete.name).statement,
+        'routes._training_summary_rows athlete week': day_facts_query(week_start, week_end, [athlete_id]).filter(
+            AthleteDayFact.status.isnot(None)
+        ).order_by(AthleteDayFact.fact_date.desc(), Athlete.name).statement,
+        'routes.api_athlete_performance_charts': day_facts_query(
+            today - timedelta(days=89), today, [athlete_id]
+        ).statement,
+        'routes.api_training_load': select(TrainingLoad, Athlete.name).join(
+            Athlete, Athlete.id == TrainingLoad.athlete_id
+        ).where(TrainingLoad.load_date >= today - timedelta(days=41), Athlete.is_active == True),
+        'training_load.update_training_load facts': select(AthleteDayFact.fact_date, AthleteDayFact.distance_km).where(
+            AthleteDayFact.athlete_id == athlete_id, AthleteDayFact.fact_date >= week_start,
+            AthleteDayFact.fact_date <= today
+        ),
+        'data_processor.process_athlete_daily_performance planned': select(PlannedWorkout).where(
+            PlannedWorkout.athlete_id == athlete_id, PlannedWorkout.workout_date == day_start(today)
+        ),
+        'data_processor.process_athlete_daily_performance activities': select(Activity).where(
+            Activity.athlete_id == athlete_id, Activity.activity_date == today
+        ),
+        'data_processor.calculate_team_summary': select(DailySummary).where(
+            DailySummary.summary_date == day_start(today)
+        ),
+        'data_processor.stored_summaries_query': DataProcessor().stored_summaries_query(
+            week_start, week_end
+        ).statement,
+        'dashboard_builder._get_athlete_summaries': select(DailySummary).where(
+            DailySummary.summary_date == day_start(today)
+        ),
+        'dashboard_builder._get_todays_workouts': select(PlannedWorkout).where(
+            PlannedWorkout.workout_date == day_start(today)
+        ),
+        'dashboard_builder.get_weekly_trends': select(
+            AthleteWeekStats.week_start, func.sum(AthleteWeekStats.summary_days)
+        ).where(
+            AthleteWeekStats.week_start >= week_start - timedelta(weeks=3),
+            AthleteWeekStats.week_start <= week_start
+        ).group_by(AthleteWeekStats.week_start),
+    }
+
+
+def _capture_sql(connection, statement):
+    """SQL and driver parameters the statement executes with"""
+    captured = {}
+
+    def capture(conn, cursor, sql, parameters, context, executemany):
+        captured.setdefault('sql', sql)
+        captured.setdefault('parameters', parameters)
+
+    event.listen(connection, 'before_cursor_execute', capture)
+    try:
+        connection.execute(statement).close()
+    finally:
+        event.remove(connection, 'before_cursor_execute', capture)
+    return captured['sql'], captured['parameters']
+
+
+def _sqlite_full_scans(connection, sql, parameters) -> Tuple[List[str], List[str]]:
+    rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}', parameters).all()
+    plan = [row[3] for row in rows]
+    tables = set(db.metadata.tables)
+
+    scans = []
+    for detail in plan:
+        words = detail.split()
+        # "SCAN activity" is a full scan; "SCAN activity USING COVERING INDEX ..." is not
+        if len(words) > 1 and words[0] == 'SCAN' and words[1] in tables and 'USING' not in words:
+            if words[1] not in SCAN_ALLOWED_TABLES:
+                scans.append(words[1])
+    return plan, scans
+
+
+def _postgres_full_scans(connection, sql, parameters) -> Tuple[List[str], List[str]]:
+    # Rule out sequential scans the planner only picks because test tables are small
+    connection.exec_driver_sql('SET LOCAL enable_seqscan = off')
+    raw_plan = connection.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {sql}', parameters).scalar()
+    if isinstance(raw_plan, str):
+        raw_plan = json.loads(raw_plan)
+
+    plan = []
+    scans = []
+    nodes = [raw_plan[0]['Plan']]
+    while nodes:
+        node = nodes.pop()
+        relation = node.get('Relation Name')
+        plan.append(f"{node['Node Type']} {relation or ''}".strip())
+        if node['Node Type'] == 'Seq Scan' and relation not in SCAN_ALLOWED_TABLES:
+            scans.append(relation)
+        nodes.extend(node.get('Plans', []))
+    return plan, scans
+
+
+def check_query_plans() -> List[Dict]:
+    """Explain every hot query and report the tables it scans in full"""
+    results = []
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+
+    for name, statement in hot_queries().items():
+        try:
+            sql, parameters = _capture_sql(connection, statement)
+            if dialect == 'postgresql':
+                plan, scans = _postgres_full_scans(connection, sql, parameters)
+            else:
+                plan, scans = _sqlite_full_scans(connection, sql, parameters)
+            results.append({'query': name, 'ok': not scans, 'full_scans': scans, 'plan': plan})
+        except Exception as e:
+            logger.error(f"Failed to explain {name}: {e}")
+            results.append({'query': name, 'ok': False, 'full_scans': [], 'plan': [], 'error': str(e)})
+
+    # EXPLAIN only reads, but the planner setting above must not leak
+    db.session.rollback()
+    return results
+
+
+def main() -> int:
+    with app.app_context():
+        results = check_query_plans()
+
+    for result in results:
+        print(f"{'ok  ' if result['ok'] else 'FAIL'} {result['query']}")
+        if not result['ok']:
+            for line in result['plan']:
+                print(f"       {line}")
+            if result.get('error'):
+                print(f"       error: {result['error']}")
+
+    failures = [result for result in results if not result['ok']]
+    print(f"{len(results) - len(failures)}/{len(results)} queries use indexes")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,364 @@
+import math
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+SHORT_WINDOW_SECONDS = 15 * 60
+DAILY_WINDOW_SECONDS = 24 * 60 * 60
+
+
+class TokenBucket:
+    """Token bucket that refills continuously up to its capacity over one window"""
+
+    def __init__(self, capacity: int, window_seconds: int):
+        self.capacity = capacity
+        self.window_seconds = window_seconds
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.reset_at: Optional[float] = None
+
+    def _refill(self, now: float):
+        if self.reset_at is not None:
+            # Synced to a server-side fixed window: nothing refills until it resets
+            if now >= self.reset_at:
+                self.tokens = float(self.capacity)
+                self.reset_at = None
+            self.updated_at = now
+            return
+
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            refill_rate = self.capacity / self.window_seconds
+            self.tokens = min(float(self.capacity), self.tokens + elapsed * refill_rate)
+            self.updated_at = now
+
+    def available(self, now: float) -> float:
+        """Return the number of tokens currently available"""
+        self._refill(now)
+        return self.tokens
+
+    def consume(self, now: float, count: int = 1) -> bool:
+        """Take tokens from the bucket if enough are available"""
+        self._refill(now)
+        if self.tokens >= count:
+            self.tokens -= count
+            return True
+        return False
+
+    def drain(self, used: int):
+        """Remove tokens already spent elsewhere (e.g. before a restart)"""
+        self.tokens = max(0.0, self.tokens - used)
+
+    def sync(self, now: float, limit: int, used: int, reset_in: float):
+        """Adopt the server's view of this window: its limit, usage and reset time"""
+        self.capacity = limit
+        self.tokens = float(max(0, limit - used))
+        self.updated_at = now
+        self.reset_at = now + reset_in
+
+    def seconds_until(self, now: float, count: float) -> float:
+        """Time until count tokens are available (0 if they already are)"""
+        self._refill(now)
+        deficit = count - self.tokens
+        if deficit <= 0:
+            return 0.0
+        if self.reset_at is not None:
+            wait = self.reset_at - now
+            # Beyond one reset the bucket keeps refilling a full window at a time
+            extra = deficit - (self.capacity - self.tokens)
+            if extra > 0:
+                wait += math.ceil(extra / self.capacity) * self.window_seconds
+            return wait
+        return deficit * self.window_seconds / self.capacity
+
+
+class StravaRateLimiter:
+    """Thread-safe, process-local limiter for the Strava 15-minute and daily windows.
+
+    Requests are admitted from in-memory token buckets. Usage is written to
+    StravaApiUsage only on checkpoints (every few requests/seconds and at the
+    end of a run) instead of on every request.
+    """
+
+    def __init__(self, limit_15min: int = None, limit_daily: int = None):
+        self._lock = threading.Lock()
+        self.short_bucket = TokenBucket(limit_15min or Config.STRAVA_RATE_LIMIT_15MIN, SHORT_WINDOW_SECONDS)
+        self.daily_bucket = TokenBucket(limit_daily or Config.STRAVA_RATE_LIMIT_DAILY, DAILY_WINDOW_SECONDS)
+        self.usage_date = datetime.now().date()
+        self.requests_daily = 0
+        self.last_request_time: Optional[datetime] = None
+        self._unsaved_requests = 0
+        self._last_checkpoint = time.monotonic()
+        self._seeded = False
+        self._in_flight = 0
+        self.server_limits = None
+        self.server_usage = None
+        self.server_updated_at: Optional[datetime] = None
+
+    def has_capacity(self) -> bool:
+        """Check whether a request could be admitted right now without consuming a token"""
+        with self._lock:
+            self._seed_from_usage()
+            now = time.monotonic()
+            return self.short_bucket.available(now) >= 1 and self.daily_bucket.available(now) >= 1
+
+    def try_acquire(self) -> bool:
+        """Reserve one request slot in both windows, or return False if either is exhausted"""
+        with self._lock:
+            self._seed_from_usage()
+            now = time.monotonic()
+
+            if self.short_bucket.available(now) < 1:
+                logger.warning("Strava 15-minute rate limit would be exceeded")
+                return False
+            if self.daily_bucket.available(now) < 1:
+                logger.warning("Strava daily rate limit would be exceeded")
+                return False
+
+            self.short_bucket.consume(now)
+            self.daily_bucket.consume(now)
+            self._in_flight += 1
+            return True
+
+    def release(self):
+        """Forget an acquired slot whose request never produced a response"""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    def remaining(self) -> dict:
+        """Return the whole requests currently available in each window"""
+        with self._lock:
+            self._seed_from_usage()
+            now = time.monotonic()
+            return {
+                'short': int(self.short_bucket.available(now)),
+                'daily': int(self.daily_bucket.available(now))
+            }
+
+    def seconds_until_available(self, requests: int = 1, daily_reserve: int = 0) -> float:
+        """Estimate how long until the given number of requests fits in both windows.
+
+        daily_reserve keeps that many daily requests untouched, e.g. for the
+        regular sync. Large request counts span several windows, so this
+        doubles as an ETA.
+        """
+        with self._lock:
+            self._seed_from_usage()
+            now = time.monotonic()
+            return max(self.short_bucket.seconds_until(now, requests),
+                       self.daily_bucket.seconds_until(now, requests + daily_reserve))
+
+    def max_requests_per_wait(self, daily_reserve: int = 0) -> int:
+        """Largest request count seconds_until_available can ever report as fitting.
+
+        That is one full 15-minute window, within the daily limit less
+        daily_reserve; bigger batches never fit and must be split.
+        """
+        with self._lock:
+            return max(1, min(self.short_bucket.capacity, self.daily_bucket.capacity - daily_reserve))
+
+    def update_from_headers(self, headers) -> bool:
+        """Sync both windows to Strava's X-RateLimit-Limit/Usage response headers.
+
+        The read-specific headers are preferred when present since every
+        throttled call is a read. Returns False if the headers are missing.
+        """
+        limits = _parse_header_pair(headers.get('X-ReadRateLimit-Limit') or headers.get('X-RateLimit-Limit'))
+        usage = _parse_header_pair(headers.get('X-ReadRateLimit-Usage') or headers.get('X-RateLimit-Usage'))
+        if not limits or not usage:
+            return False
+
+        with self._lock:
+            self._seeded = True  # Server numbers supersede anything stored locally
+            now = time.monotonic()
+            # Other requests already admitted but not yet answered are not in the
+            # server's usage yet (this response itself is still counted in flight)
+            pending = max(0, self._in_flight - 1)
+            self.short_bucket.sync(now, limits[0], usage[0] + pending, _seconds_to_short_reset())
+            self.daily_bucket.sync(now, limits[1], usage[1] + pending, _seconds_to_daily_reset())
+            self.server_limits = limits
+            self.server_usage = usage
+            self.server_updated_at = datetime.now()
+        return True
+
+    def mark_throttled(self):
+        """Treat the short window as exhausted after a 429 that carried no usable headers"""
+        with self._lock:
+            now = time.monotonic()
+            self.short_bucket.sync(now, self.short_bucket.capacity, self.short_bucket.capacity,
+                                   _seconds_to_short_reset())
+        logger.warning("Strava returned 429; pausing until the next 15-minute window")
+
+    def snapshot(self) -> dict:
+        """Live view of the Strava budget for monitoring endpoints"""
+        with self._lock:
+            self._seed_from_usage()
+            now = time.monotonic()
+            windows = {}
+            for name, bucket in (('15min', self.short_bucket), ('daily', self.daily_bucket)):
+                remaining = int(bucket.available(now))
+                windows[name] = {
+                    'limit': bucket.capacity,
+                    'remaining': remaining,
+                    'used': bucket.capacity - remaining,
+                    'resets_in_seconds': int(bucket.reset_at - now) if bucket.reset_at is not None else None
+                }
+            return {
+                'source': 'headers' if self.server_updated_at else 'local',
+                'server_updated_at': self.server_updated_at.isoformat() if self.server_updated_at else None,
+                'requests_today': self.requests_daily,
+                'windows': windows
+            }
+
+    def record_request(self):
+        """Record a completed request and checkpoint usage if one is due"""
+        with self._lock:
+            self._roll_over_day()
+            self._in_flight = max(0, self._in_flight - 1)
+            self.requests_daily += 1
+            self._unsaved_requests += 1
+            self.last_request_time = datetime.now()
+
+            due = (self._unsaved_requests >= Config.STRAVA_USAGE_CHECKPOINT_REQUESTS or
+                   time.monotonic() - self._last_checkpoint >= Config.STRAVA_USAGE_CHECKPOINT_SECONDS)
+
+        if due:
+            self.checkpoint()
+
+    def checkpoint(self, force: bool = False) -> bool:
+        """Persist unsaved request counts to StravaApiUsage.
+
+        Counts are added to the stored row rather than overwriting it, so
+        several processes checkpointing into the same day stay consistent.
+        """
+        from flask import has_app_context
+
+        if not has_app_context():
+            # Worker threads without an app context leave it to the next checkpoint
+            return False
+
+        with self._lock:
+            unsaved = self._unsaved_requests
+            if unsaved == 0 and not force:
+                return True
+            usage_date = self.usage_date
+            last_request_time = self.last_request_time
+            self._unsaved_requests = 0
+            self._last_checkpoint = time.monotonic()
+
+        if unsaved == 0:
+            return True
+
+        if not self._write_usage(usage_date, unsaved, last_request_time):
+            with self._lock:
+                self._unsaved_requests += unsaved
+            return False
+
+        logger.debug(f"Checkpointed {unsaved} Strava requests for {usage_date}")
+        return True
+
+    def _write_usage(self, usage_date, count: int, last_request_time: Optional[datetime]) -> bool:
+        """Add request counts to the StravaApiUsage row using a dedicated session"""
+        from sqlalchemy.orm import Session
+        from models import StravaApiUsage
+        from app import db
+
+        try:
+            # A separate session keeps the caller's pending work out of this commit
+            with Session(db.engine) as session:
+                usage = session.query(StravaApiUsage).filter_by(date=usage_date).first()
+                if not usage:
+                    usage = StravaApiUsage(date=usage_date, requests_15min=0, requests_daily=0)
+                    session.add(usage)
+
+                now = datetime.now()
+                if usage.last_request_time and usage.last_request_time > now - timedelta(minutes=15):
+                    usage.requests_15min = (usage.requests_15min or 0) + count
+                else:
+                    usage.requests_15min = count
+
+                usage.requests_daily = (usage.requests_daily or 0) + count
+                usage.last_request_time = last_request_time or now
+                usage.updated_at = now
+                session.commit()
+            return True
+
+        except Exception as e:
+            logger.error(f"Error checkpointing Strava API usage: {e}")
+            return False
+
+    def _seed_from_usage(self):
+        """Drain the buckets by the usage already stored for today (once per process)"""
+        if self._seeded:
+            return
+
+        from flask import has_app_context
+        if not has_app_context():
+            return
+
+        from models import StravaApiUsage
+        from app import db
+
+        self._seeded = True
+        try:
+            usage = db.session.query(StravaApiUsage).filter_by(date=self.usage_date).first()
+            if not usage:
+                return
+
+            self.daily_bucket.drain(usage.requests_daily or 0)
+            if usage.last_request_time and usage.last_request_time > datetime.now() - timedelta(minutes=15):
+                self.short_bucket.drain(usage.requests_15min or 0)
+
+            logger.info(f"Seeded Strava rate limiter from stored usage: {usage.requests_daily} requests today")
+
+        except Exception as e:
+            logger.error(f"Error loading stored Strava API usage: {e}")
+
+    def _roll_over_day(self):
+        """Start a new daily counter when the date changes"""
+        today = datetime.now().date()
+        if today != self.usage_date:
+            # Leftover unsaved requests belong to the new day's row from here on
+            self.usage_date = today
+            self.requests_daily = 0
+
+
+def _parse_header_pair(value: Optional[str]):
+    """Parse a Strava '15-minute,daily' header value into two ints"""
+    if not value:
+        return None
+    try:
+        short, daily = (int(part.strip()) for part in value.split(',')[:2])
+        return short, daily
+    except ValueError:
+        logger.warning(f"Unexpected Strava rate limit header: {value}")
+        return None
+
+
+def _seconds_to_short_reset() -> float:
+    """Strava's 15-minute windows reset on the quarter hour"""
+    return SHORT_WINDOW_SECONDS - (time.time() % SHORT_WINDOW_SECONDS)
+
+
+def _seconds_to_daily_reset() -> float:
+    """Strava's daily window resets at midnight UTC"""
+    return DAILY_WINDOW_SECONDS - (time.time() % DAILY_WINDOW_SECONDS)
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> StravaRateLimiter:
+    """Get the process-wide Strava rate limiter"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = StravaRateLimiter()
+    return _rate_limiter
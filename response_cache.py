@@ -0,0 +1,281 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, time as dt_time, timezone
+from functools import wraps
+from typing import Dict, Iterable, Optional, Tuple
+from flask import Response, get_flashed_messages, make_response, request, session
+from app import db
+from models import DataVersion
+from db_helpers import insert_ignore_duplicates
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Data tags: each cached view lists the tags it reads, each writer bumps the tags it changes
+ACTIVITIES = 'activities'
+PLANS = 'plans'
+SUMMARIES = 'summaries'
+ATHLETES = 'athletes'
+SETTINGS = 'settings'
+SYNC = 'sync'
+TRAINING_DATA = (ACTIVITIES, PLANS, SUMMARIES, ATHLETES)
+
+# Query args that only defeat browser caches and never change the response
+IGNORED_ARGS = {'_'}
+
+# A cached response: (status code, mimetype, body)
+CachedResponse = Tuple[int, str, bytes]
+
+
+class MemoryCache:
+    """In-process LRU cache with a TTL; one per worker process"""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: CachedResponse):
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SqliteCache:
+    """Cache in a local SQLite file, shared by every worker process on the host"""
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    status INTEGER NOT NULL,
+                    mimetype TEXT,
+                    body BLOB NOT NULL,
+                    expires_at REAL NOT NULL,
+                    used_at REAL NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT status, mimetype, body FROM response_cache WHERE key = ? AND expires_at > ?",
+                (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE response_cache SET used_at = ? WHERE key = ?", (now, key))
+        return row[0], row[1], bytes(row[2])
+
+    def set(self, key: str, value: CachedResponse):
+        now = time.time()
+        status, mimetype, body = value
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, status, mimetype, body, expires_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, status, mimetype, body, now + self.ttl_seconds, now)
+            )
+            conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "DELETE FROM response_cache WHERE key NOT IN "
+                "(SELECT key FROM response_cache ORDER BY used_at DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM response_cache")
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_cache():
+    """The configured cache backend, or None when caching is disabled"""
+    global _backend
+    backend_name = (Config.RESPONSE_CACHE_BACKEND or 'none').lower()
+    if backend_name == 'none':
+        return None
+
+    with _backend_lock:
+        if _backend is None:
+            if backend_name == 'sqlite':
+                _backend = SqliteCache(Config.RESPONSE_CACHE_PATH, Config.RESPONSE_CACHE_MAX_ENTRIES,
+                                       Config.RESPONSE_CACHE_TTL_SECONDS)
+            else:
+                _backend = MemoryCache(Config.RESPONSE_CACHE_MAX_ENTRIES, Config.RESPONSE_CACHE_TTL_SECONDS)
+        return _backend
+
+
+def data_versions(tags: Iterable[str]) -> Tuple[Dict[str, int], datetime]:
+    """Current version of each tag (0 if never bumped) and when any of them last changed, in UTC.
+
+    A new local day counts as a change, since the pages are relative to today.
+    """
+    tags = sorted(set(tags))
+    rows = db.session.query(DataVersion.tag, DataVersion.version, DataVersion.updated_at).filter(
+        DataVersion.tag.in_(tags)
+    ).all()
+    versions = {tag: 0 for tag in tags}
+    last_modified = datetime.combine(datetime.now().date(), dt_time.min).astimezone(timezone.utc)
+    for tag, version, updated_at in rows:
+        versions[tag] = version
+        if updated_at:
+            last_modified = max(last_modified, updated_at.replace(tzinfo=timezone.utc))
+    return versions, last_modified.replace(microsecond=0)
+
+
+def bump_data_version(*tags: str):
+    """Invalidate every cached response that reads any of tags.
+
+    Runs in the caller's transaction, so readers see the new version only
+    together with the change behind it. Does not commit.
+    """
+    if not tags:
+        return
+    insert_ignore_duplicates(DataVersion, [{'tag': tag, 'version': 0} for tag in set(tags)], ['tag'])
+    DataVersion.query.filter(DataVersion.tag.in_(set(tags))).update(
+        {DataVersion.version: DataVersion.version + 1, DataVersion.updated_at: datetime.utcnow()},
+        synchronize_session=False
+    )
+
+
+def cache_key(versions: Dict[str, int]) -> str:
+    """Endpoint, view args, normalized query args, today's date and the tag versions, hashed"""
+    args = sorted(
+        (name, value.strip()) for name, value in request.args.items(multi=True)
+        if name not in IGNORED_ARGS and value.strip()
+    )
+    parts = [
+        request.endpoint,
+        sorted((request.view_args or {}).items()),
+        args,
+        # Pages are relative to today, so yesterday's entries never match
+        datetime.now().date().isoformat(),
+        sorted(versions.items())
+    ]
+    return hashlib.sha1(json.dumps(parts, default=str).encode()).hexdigest()
+
+
+def _not_modified(etag: str, last_modified: datetime) -> bool:
+    # If-None-Match wins over If-Modified-Since when both are sent
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def _with_validators(response: Response, etag: str, last_modified: datetime) -> Response:
+    response.set_etag(etag, weak=True)
+    response.last_modified = last_modified
+    # Browsers may keep the body but must revalidate before reusing it
+    response.cache_control.no_cache = True
+    return response
+
+
+def _cacheable(response: Response) -> bool:
+    if response.status_code != 200 or response.direct_passthrough:
+        return False
+    if response.is_json:
+        payload = response.get_json(silent=True)
+        if isinstance(payload, dict) and (payload.get('success') is False or 'error' in payload):
+            return False
+    return True
+
+
+def _versioned_view(tags: Tuple[str, ...], store: bool):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET' or '_flashes' in session:
+                return view(*args, **kwargs)
+
+            cache = get_cache() if store else None
+            try:
+                versions, last_modified = data_versions(tags)
+                key = cache_key(versions)
+                if _not_modified(key, last_modified):
+                    return _with_validators(Response(status=304), key, last_modified)
+                cached = cache.get(key) if cache is not None else None
+            except Exception as e:
+                logger.error(f"Response cache lookup failed for {request.endpoint}: {e}")
+                db.session.rollback()
+                return view(*args, **kwargs)
+
+            if cached is not None:
+                status, mimetype, body = cached
+                return _with_validators(Response(body, status=status, mimetype=mimetype), key, last_modified)
+
+            response = make_response(view(*args, **kwargs))
+            # Flashed messages belong to this request only
+            if not _cacheable(response) or '_flashes' in session or get_flashed_messages():
+                return response
+
+            if cache is not None:
+                try:
+                    cache.set(key, (response.status_code, response.mimetype, response.get_data()))
+                except Exception as e:
+                    logger.error(f"Failed to store cached response for {request.endpoint}: {e}")
+            return _with_validators(response, key, last_modified)
+
+        return wrapper
+    return decorator
+
+
+def cached_response(*tags: str):
+    """Serve a GET view from the response cache until one of tags is bumped or the entry expires.
+
+    Also answers conditional requests: the ETag and Last-Modified come from
+    the tag versions, so a client that already has the current response
+    gets a 304 without the view running. Requests with pending flash
+    messages, and responses that flashed or failed, are never cached.
+    """
+    return _versioned_view(tags, store=True)
+
+
+def conditional_response(*tags: str):
+    """ETag / Last-Modified validation from the tag versions, without storing responses.
+
+    For views that are cheap to build but polled often: an unchanged
+    response costs one version query and a 304.
+    """
+    return _versioned_view(tags, store=False)
@@ -0,0 +1,299 @@
+import logging
+from datetime import datetime, date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func, case
+from app import db
+from models import Athlete, Activity, PlannedWorkout, DailySummary, AthleteWeekStats, AthleteDayFact, day_start
+from db_helpers import upsert_rows
+
+logger = logging.getLogger(__name__)
+
+COMPLETED_STATUSES = ('On Track', 'Over-performed', 'Partially Completed')
+STAT_COLUMNS = ['actual_distance_km', 'planned_distance_km', 'run_count', 'moving_time_seconds',
+                'elevation_gain_m', 'last_activity_date', 'summary_days', 'completed_days',
+                'distance_variance_total', 'updated_at']
+FACT_COLUMNS = ['distance_km', 'moving_time_seconds', 'run_count', 'average_heartrate', 'pace_min_per_km',
+                'elevation_gain_m', 'planned_distance_km', 'planned_pace_min_per_km',
+                'distance_variance_percent', 'pace_variance_percent', 'status', 'notes', 'updated_at']
+
+
+def week_start(value) -> date:
+    """Monday of the ISO week containing value"""
+    day = value.date() if isinstance(value, datetime) else value
+    return day - timedelta(days=day.weekday())
+
+
+def _as_day(value) -> date:
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value.date() if isinstance(value, datetime) else value
+
+
+def refresh_week_stats(pairs: Iterable[Tuple[int, date]]) -> int:
+    """Rebuild the AthleteWeekStats rows for the weeks containing the given (athlete_id, day) pairs.
+
+    Reads the touched weeks back from the base tables grouped by day, folds
+    them into weeks and upserts the rows in the caller's transaction.
+    Returns the number of week rows written.
+    """
+    weeks = {(athlete_id, week_start(day)) for athlete_id, day in pairs if athlete_id and day}
+    if not weeks:
+        return 0
+
+    athlete_ids = sorted({athlete_id for athlete_id, _ in weeks})
+    first_day = min(week for _, week in weeks)
+    last_day = max(week for _, week in weeks) + timedelta(days=6)
+
+    now = datetime.utcnow()
+    stats = {key: {'athlete_id': key[0], 'week_start': key[1], 'actual_distance_km': 0.0,
+                   'planned_distance_km': 0.0, 'run_count': 0, 'moving_time_seconds': 0,
+                   'elevation_gain_m': 0.0, 'last_activity_date': None, 'summary_days': 0,
+                   'completed_days': 0, 'distance_variance_total': 0.0, 'updated_at': now}
+             for key in weeks}
+
+    activity_days = db.session.query(
+        Activity.athlete_id, Activity.activity_date,
+        func.sum(Activity.distance_km), func.count(Activity.id),
+        func.sum(Activity.moving_time_seconds), func.sum(Activity.total_elevation_gain)
+    ).filter(
+        Activity.athlete_id.in_(athlete_ids),
+        Activity.activity_date >= first_day,
+        Activity.activity_date <= last_day
+    ).group_by(Activity.athlete_id, Activity.activity_date).all()
+
+    for athlete_id, day, distance, count, moving_time, elevation in activity_days:
+        day = _as_day(day)
+        row = stats.get((athlete_id, week_start(day)))
+        if row is None:
+            continue
+        row['actual_distance_km'] += distance or 0
+        row['run_count'] += count or 0
+        row['moving_time_seconds'] += moving_time or 0
+        row['elevation_gain_m'] += elevation or 0
+        if row['last_activity_date'] is None or day > row['last_activity_date']:
+            row['last_activity_date'] = day
+
+    planned = db.session.query(
+        PlannedWorkout.athlete_id, PlannedWorkout.workout_date, PlannedWorkout.planned_distance_km
+    ).filter(
+        PlannedWorkout.athlete_id.in_(athlete_ids),
+        PlannedWorkout.workout_date >= day_start(first_day),
+        PlannedWorkout.workout_date <= day_start(last_day)
+    ).all()
+
+    for athlete_id, workout_date, distance in planned:
+        row = stats.get((athlete_id, week_start(_as_day(workout_date))))
+        if row is not None:
+            row['planned_distance_km'] += distance or 0
+
+    summaries = db.session.query(
+        DailySummary.athlete_id, DailySummary.summary_date, DailySummary.status,
+        DailySummary.distance_variance_percent
+    ).filter(
+        DailySummary.athlete_id.in_(athlete_ids),
+        DailySummary.summary_date >= day_start(first_day),
+        DailySummary.summary_date <= day_start(last_day)
+    ).all()
+
+    for athlete_id, summary_date, status, distance_variance in summaries:
+        row = stats.get((athlete_id, week_start(_as_day(summary_date))))
+        if row is None:
+            continue
+        row['summary_days'] += 1
+        row['completed_days'] += 1 if status in COMPLETED_STATUSES else 0
+        row['distance_variance_total'] += distance_variance or 0
+
+    for row in stats.values():
+        row['actual_distance_km'] = round(row['actual_distance_km'], 3)
+        row['planned_distance_km'] = round(row['planned_distance_km'], 3)
+        row['elevation_gain_m'] = round(row['elevation_gain_m'], 1)
+
+    return upsert_rows(AthleteWeekStats, list(stats.values()),
+                       index_elements=['athlete_id', 'week_start'], update_columns=STAT_COLUMNS)
+
+
+def refresh_day_facts(pairs: Iterable[Tuple[int, date]]) -> int:
+    """Rewrite the AthleteDayFact rows for the given (athlete_id, day) pairs from the base tables.
+
+    Pairs without activities, a plan or a summary get a zero row, which
+    keeps the table dense. Runs in the caller's transaction and returns
+    the number of rows written.
+    """
+    keys = {(athlete_id, _as_day(day)) for athlete_id, day in pairs if athlete_id and day}
+    if not keys:
+        return 0
+
+    athlete_ids = sorted({athlete_id for athlete_id, _ in keys})
+    first_day = min(day for _, day in keys)
+    last_day = max(day for _, day in keys)
+
+    now = datetime.utcnow()
+    facts = {key: {'athlete_id': key[0], 'fact_date': key[1], 'distance_km': 0.0, 'moving_time_seconds': 0,
+                   'run_count': 0, 'average_heartrate': None, 'pace_min_per_km': None, 'elevation_gain_m': 0.0,
+                   'planned_distance_km': None, 'planned_pace_min_per_km': None,
+                   'distance_variance_percent': None, 'pace_variance_percent': None,
+                   'status': None, 'notes': None, 'updated_at': now}
+             for key in keys}
+
+    has_heartrate = Activity.average_heartrate.isnot(None)
+    activity_days = db.session.query(
+        Activity.athlete_id, Activity.activity_date,
+        func.sum(Activity.distance_km), func.sum(Activity.moving_time_seconds),
+        func.count(Activity.id), func.sum(Activity.total_elevation_gain),
+        func.sum(case((has_heartrate, Activity.average_heartrate * Activity.moving_time_seconds), else_=0)),
+        func.sum(case((has_heartrate, Activity.moving_time_seconds), else_=0))
+    ).filter(
+        Activity.athlete_id.in_(athlete_ids),
+        Activity.activity_date >= first_day,
+        Activity.activity_date <= last_day
+    ).group_by(Activity.athlete_id, Activity.activity_date).all()
+
+    for athlete_id, day, distance, moving_time, count, elevation, heartrate_time, heartrate_seconds in activity_days:
+        fact = facts.get((athlete_id, _as_day(day)))
+        if fact is None:
+            continue
+        fact['distance_km'] = round(distance or 0, 3)
+        fact['moving_time_seconds'] = moving_time or 0
+        fact['run_count'] = count or 0
+        fact['elevation_gain_m'] = round(elevation or 0, 1)
+        if heartrate_seconds:
+            fact['average_heartrate'] = round(heartrate_time / heartrate_seconds, 1)
+        if distance:
+            fact['pace_min_per_km'] = round((moving_time or 0) / 60 / distance, 2)
+
+    planned = db.session.query(
+        PlannedWorkout.athlete_id, PlannedWorkout.workout_date,
+        PlannedWorkout.planned_distance_km, PlannedWorkout.planned_pace_min_per_km
+    ).filter(
+        PlannedWorkout.athlete_id.in_(athlete_ids),
+        PlannedWorkout.workout_date >= day_start(first_day),
+        PlannedWorkout.workout_date <= day_start(last_day)
+    ).all()
+
+    for athlete_id, workout_date, distance, pace in planned:
+        fact = facts.get((athlete_id, _as_day(workout_date)))
+        if fact is not None:
+            fact['planned_distance_km'] = distance
+            fact['planned_pace_min_per_km'] = pace
+
+    # On summarized days the summary's plan wins, since its status was classified against it
+    summaries = db.session.query(
+        DailySummary.athlete_id, DailySummary.summary_date, DailySummary.planned_distance_km,
+        DailySummary.planned_pace_min_per_km, DailySummary.distance_variance_percent,
+        DailySummary.pace_variance_percent, DailySummary.status, DailySummary.notes
+    ).filter(
+        DailySummary.athlete_id.in_(athlete_ids),
+        DailySummary.summary_date >= day_start(first_day),
+        DailySummary.summary_date <= day_start(last_day)
+    ).all()
+
+    for (athlete_id, summary_date, planned_distance, planned_pace,
+         distance_variance, pace_variance, status, notes) in summaries:
+        fact = facts.get((athlete_id, _as_day(summary_date)))
+        if fact is not None:
+            if planned_distance is not None:
+                fact['planned_distance_km'] = planned_distance
+                fact['planned_pace_min_per_km'] = planned_pace
+            fact['distance_variance_percent'] = distance_variance
+            fact['pace_variance_percent'] = pace_variance
+            fact['status'] = status
+            fact['notes'] = notes
+
+    return upsert_rows(AthleteDayFact, list(facts.values()),
+                       index_elements=['athlete_id', 'fact_date'], update_columns=FACT_COLUMNS)
+
+
+def refresh_rollups(pairs: Iterable[Tuple[int, date]]) -> None:
+    """Refresh the week rollups and day facts covering the given (athlete_id, day) pairs"""
+    keys = {(athlete_id, _as_day(day)) for athlete_id, day in pairs if athlete_id and day}
+    refresh_week_stats(keys)
+    refresh_day_facts(keys)
+
+
+def rebuild_day_facts(athlete_ids: Optional[List[int]] = None) -> int:
+    """Write a fact row for every athlete and day from the tracking start, plus any earlier data days; commits"""
+    from backfill import tracking_start_date
+
+    try:
+        query = db.session.query(Athlete.id)
+        if athlete_ids is not None:
+            query = query.filter(Athlete.id.in_(athlete_ids))
+        athlete_ids = [athlete_id for athlete_id, in query.all()]
+        if not athlete_ids:
+            return 0
+
+        pairs = set()
+        sources = [(Activity, Activity.activity_date), (PlannedWorkout, PlannedWorkout.workout_date),
+                   (DailySummary, DailySummary.summary_date)]
+        for model, day_column in sources:
+            rows = db.session.query(model.athlete_id, day_column).filter(
+                model.athlete_id.in_(athlete_ids)
+            ).distinct().all()
+            pairs.update((athlete_id, _as_day(day)) for athlete_id, day in rows if day)
+
+        first_day = tracking_start_date()
+        last_day = max([datetime.now().date()] + [day for _, day in pairs])
+        for offset in range((last_day - first_day).days + 1):
+            day = first_day + timedelta(days=offset)
+            pairs.update((athlete_id, day) for athlete_id in athlete_ids)
+
+        written = refresh_day_facts(pairs)
+        db.session.commit()
+        logger.info(f"Rebuilt {written} athlete day facts")
+        return written
+
+    except Exception as e:
+        logger.error(f"Failed to rebuild day facts: {e}")
+        db.session.rollback()
+        return 0
+
+
+def day_facts_query(start, end, athlete_ids: Optional[List[int]] = None):
+    """(AthleteDayFact, athlete name) rows of active athletes between start and end inclusive"""
+    query = db.session.query(AthleteDayFact, Athlete.name).join(
+        Athlete, Athlete.id == AthleteDayFact.athlete_id
+    ).filter(
+        AthleteDayFact.fact_date >= _as_day(start),
+        AthleteDayFact.fact_date <= _as_day(end),
+        Athlete.is_active == True
+    )
+    if athlete_ids is not None:
+        query = query.filter(AthleteDayFact.athlete_id.in_(athlete_ids))
+    return query
+
+
+def rebuild_week_stats(athlete_ids: Optional[List[int]] = None) -> int:
+    """Rebuild every week that has activities, plans or summaries; commits"""
+    try:
+        sources = [(Activity, Activity.activity_date), (PlannedWorkout, PlannedWorkout.workout_date),
+                   (DailySummary, DailySummary.summary_date)]
+        pairs = set()
+        for model, day_column in sources:
+            query = db.session.query(model.athlete_id, day_column).distinct()
+            if athlete_ids is not None:
+                query = query.filter(model.athlete_id.in_(athlete_ids))
+            pairs.update((athlete_id, week_start(_as_day(day))) for athlete_id, day in query.all() if day)
+
+        written = refresh_week_stats(pairs)
+        db.session.commit()
+        logger.info(f"Rebuilt {written} athlete week rows")
+        return written
+
+    except Exception as e:
+        logger.error(f"Failed to rebuild week stats: {e}")
+        db.session.rollback()
+        return 0
+
+
+def get_week_totals(week: date, athlete_ids: Optional[List[int]] = None) -> Dict:
+    """Team totals for one ISO week"""
+    query = db.session.query(
+        func.coalesce(func.sum(AthleteWeekStats.actual_distance_km), 0),
+        func.coalesce(func.sum(AthleteWeekStats.planned_distance_km), 0),
+        func.coalesce(func.sum(AthleteWeekStats.run_count), 0)
+    ).filter(AthleteWeekStats.week_start == week)
+    if athlete_ids is not None:
+        query = query.filter(AthleteWeekStats.athlete_id.in_(athlete_ids))
+    actual, planned, runs = query.one()
+
+    return {'actual_distance_km': actual, 'planned_distance_km': planned, 'run_count': runs}
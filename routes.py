@@ -2,12 +2,16 @@ from flask import render_template, request, redirect, url_for, flash, jsonify
 from datetime import datetime, timedelta, date
 from sqlalchemy import and_, func, distinct
 from app import app, db
-from models import Athlete, Activity, PlannedWorkout, DailySummary, SystemLog
+from models import Athlete, Activity, PlannedWorkout, DailySummary, SystemLog, day_start
 from strava_client import StravaClient
 from excel_reader import ExcelReader
 from dashboard_builder import DashboardBuilder
-from scheduler import run_manual_task
+from scheduler import queue_sync_job, get_sync_job_status
+from sync_jobs import log_sync_operation
 from config import Config
+from response_cache import (cached_response, conditional_response, bump_data_version, TRAINING_DATA, ACTIVITIES,
+                            PLANS, SUMMARIES, ATHLETES, SETTINGS, SYNC)
+from athlete_cache import active_athlete_ids
 import logging
 import os
 
@@ -15,25 +19,20 @@ logger = logging.getLogger(__name__)
 
 
 @app.route('/')
+@cached_response(*TRAINING_DATA, SYNC)
 def index():
     """Simplified home page with 4 tiles, athlete management, and summary table"""
     try:
         # Get the 4 main tiles data
-        total_athletes = db.session.query(func.count(distinct(Athlete.id))).filter_by(is_active=True).scalar() or 0
-
-        # Weekly stats (last 7 days) - only count activities from active athletes
-        week_ago = datetime.now() - timedelta(days=7)
-        weekly_activities = db.session.query(func.count(distinct(Activity.id))).join(Athlete).filter(
-            Activity.start_date >= week_ago,
-            Activity.start_date <= datetime.now(),
-            Athlete.is_active == True
-        ).scalar() or 0
+        active_ids = active_athlete_ids()
+        total_athletes = len(active_ids)
 
         # Monthly stats (last 30 days) - only count activities from active athletes  
         month_ago = datetime.now() - timedelta(days=30)
         
         # Get unique activities per day to avoid counting duplicates
         monthly_activities_raw = db.session.query(Activity).join(Athlete).filter(
+            Activity.activity_date >= month_ago.date(),
             Activity.start_date >= month_ago,
             Activity.start_date <= datetime.now(),
             Athlete.is_active == True
@@ -49,40 +48,12 @@ def index():
         
         monthly_activities = len(unique_monthly_activities)
 
-        # Total planned vs actual distance this week - use consistent data source
-        # First, get planned workouts for the week
-        planned_workouts = db.session.query(PlannedWorkout).join(Athlete).filter(
-            PlannedWorkout.workout_date >= week_ago.date(),
-            PlannedWorkout.workout_date <= datetime.now().date(),
-            Athlete.is_active == True
-        ).all()
-
-        # Remove duplicates by athlete_id and date
-        unique_planned = {}
-        for workout in planned_workouts:
-            key = f"{workout.athlete_id}_{workout.workout_date}"
-            if key not in unique_planned:
-                unique_planned[key] = workout
-
-        weekly_planned = sum(w.planned_distance_km or 0 for w in unique_planned.values())
-
-        # Get actual activities for the week
-        actual_activities = db.session.query(Activity).join(Athlete).filter(
-            func.date(Activity.start_date) >= week_ago.date(),
-            func.date(Activity.start_date) <= datetime.now().date(),
-            Athlete.is_active == True
-        ).all()
-
-        # Remove duplicates and sum actual distance
-        unique_activities = {}
-        for activity in actual_activities:
-            activity_date = activity.start_date.date()
-            key = f"{activity.athlete_id}_{activity_date}"
-            if key not in unique_activities:
-                unique_activities[key] = 0
-            unique_activities[key] += activity.distance_km or 0
-
-        weekly_actual = sum(unique_activities.values())
+        # This week's tiles (Monday to Sunday) come from the AthleteWeekStats rollup
+        from rollups import week_start, get_week_totals
+        week_totals = get_week_totals(week_start(datetime.now()), active_ids)
+        weekly_activities = week_totals['run_count']
+        weekly_planned = week_totals['planned_distance_km']
+        weekly_actual = week_totals['actual_distance_km']
 
         # Get all athletes for management
         all_athletes = db.session.query(Athlete).order_by(Athlete.name).all()
@@ -146,101 +117,74 @@ def get_last_strava_sync_time():
         logger.error(f"Error getting last sync time: {e}")
         return "Unknown"
 
-def get_leader_dashboard_data():
-    """Get leader dashboard data with athlete-wise consolidated actual runs and current/previous week data"""
+# Columns /api/leaderboard can sort by
+LEADERBOARD_SORT_KEYS = ('total_actual_km', 'current_week_actual', 'current_week_planned', 'prev_week_actual',
+                         'prev_week_planned', 'week_change', 'week_change_percent', 'completion_rate',
+                         'latest_activity_date', 'athlete_name')
+
+
+def get_leader_dashboard_data(sort_by='total_actual_km', descending=True, limit=None):
+    """Get leader dashboard data with athlete-wise consolidated actual runs and current/previous week data.
+
+    One statement over the AthleteWeekStats rollup: each window is a
+    conditional SUM per athlete, and sorting and limiting happen in SQL, so
+    the cost depends on athletes and weeks tracked rather than on the number
+    of stored activities.
+    """
     try:
-        # Get all active athletes
-        athletes = db.session.query(Athlete).filter_by(is_active=True).all()
+        from sqlalchemy import case
+        from rollups import week_start
+        from backfill import tracking_start_date
+        from models import AthleteWeekStats
 
-        # Calculate date ranges using proper week boundaries
+        # Calculate date ranges using proper week boundaries (Monday to Sunday)
         today = datetime.now().date()
-        
-        # Calculate current week (Monday to Sunday)
-        days_since_monday = today.weekday()  # 0 = Monday, 6 = Sunday
-        current_week_start = today - timedelta(days=days_since_monday)
-        current_week_end = current_week_start + timedelta(days=6)
-        
-        # Calculate previous week
+        current_week_start = week_start(today)
         prev_week_start = current_week_start - timedelta(days=7)
-        prev_week_end = current_week_start - timedelta(days=1)
-        
-        start_tracking_date = datetime(2025, 5, 19).date()  # Base tracking date
+        season_week_start = week_start(tracking_start_date())
+
+        def window_sum(column, condition):
+            return func.coalesce(func.sum(case((condition, column), else_=0)), 0)
+
+        total_actual = window_sum(AthleteWeekStats.actual_distance_km, AthleteWeekStats.week_start >= season_week_start)
+        current_actual = window_sum(AthleteWeekStats.actual_distance_km, AthleteWeekStats.week_start == current_week_start)
+        current_planned = window_sum(AthleteWeekStats.planned_distance_km, AthleteWeekStats.week_start == current_week_start)
+        prev_actual = window_sum(AthleteWeekStats.actual_distance_km, AthleteWeekStats.week_start == prev_week_start)
+        prev_planned = window_sum(AthleteWeekStats.planned_distance_km, AthleteWeekStats.week_start == prev_week_start)
+        latest_activity = func.max(AthleteWeekStats.last_activity_date)
+
+        columns = {
+            'total_actual_km': total_actual,
+            'current_week_actual': current_actual,
+            'current_week_planned': current_planned,
+            'prev_week_actual': prev_actual,
+            'prev_week_planned': prev_planned,
+            'week_change': current_actual - prev_actual,
+            'week_change_percent': case((prev_actual > 0, (current_actual - prev_actual) * 100.0 / prev_actual), else_=0),
+            'completion_rate': case((current_planned > 0, current_actual * 100.0 / current_planned), else_=0),
+            'latest_activity_date': latest_activity,
+            'athlete_name': Athlete.name
+        }
+        sort_column = columns[sort_by]
+
+        # Athletes without any rollup weeks still get a row of zeros
+        query = db.session.query(
+            Athlete.id, Athlete.name, total_actual, current_actual, current_planned,
+            prev_actual, prev_planned, latest_activity
+        ).outerjoin(AthleteWeekStats, and_(
+            AthleteWeekStats.athlete_id == Athlete.id,
+            AthleteWeekStats.week_start >= min(season_week_start, prev_week_start),
+            AthleteWeekStats.week_start <= current_week_start
+        )).filter(Athlete.is_active == True).group_by(Athlete.id, Athlete.name).order_by(
+            sort_column.desc() if descending else sort_column.asc(), Athlete.name
+        )
+        if limit:
+            query = query.limit(limit)
 
         leader_data = []
 
-        for athlete in athletes:
-            # Get total actual distance since start of tracking
-            total_activities = db.session.query(Activity).filter(
-                Activity.athlete_id == athlete.id,
-                func.date(Activity.start_date) >= start_tracking_date,
-                func.date(Activity.start_date) <= today
-            ).all()
-
-            # Remove duplicates and calculate total
-            unique_activities = {}
-            for activity in total_activities:
-                activity_date = activity.start_date.date()
-                key = f"{activity.athlete_id}_{activity_date}"
-                if key not in unique_activities:
-                    unique_activities[key] = 0
-                unique_activities[key] += activity.distance_km or 0
-
-            total_actual_km = sum(unique_activities.values())
-
-            # Get current week data
-            current_week_activities = db.session.query(Activity).filter(
-                Activity.athlete_id == athlete.id,
-                func.date(Activity.start_date) >= current_week_start,
-                func.date(Activity.start_date) <= current_week_end
-            ).all()
-
-            # Calculate current week total
-            current_week_unique = {}
-            for activity in current_week_activities:
-                activity_date = activity.start_date.date()
-                key = f"{activity.athlete_id}_{activity_date}"
-                if key not in current_week_unique:
-                    current_week_unique[key] = 0
-                current_week_unique[key] += activity.distance_km or 0
-
-            current_week_actual = sum(current_week_unique.values())
-
-            # Get current week planned
-            current_week_planned_workouts = db.session.query(PlannedWorkout).filter(
-                PlannedWorkout.athlete_id == athlete.id,
-                PlannedWorkout.workout_date >= current_week_start,
-                PlannedWorkout.workout_date <= current_week_end
-            ).all()
-
-            current_week_planned = sum(w.planned_distance_km or 0 for w in current_week_planned_workouts)
-
-            # Get previous week data
-            prev_week_activities = db.session.query(Activity).filter(
-                Activity.athlete_id == athlete.id,
-                func.date(Activity.start_date) >= prev_week_start,
-                func.date(Activity.start_date) <= prev_week_end
-            ).all()
-
-            # Calculate previous week total
-            prev_week_unique = {}
-            for activity in prev_week_activities:
-                activity_date = activity.start_date.date()
-                key = f"{activity.athlete_id}_{activity_date}"
-                if key not in prev_week_unique:
-                    prev_week_unique[key] = 0
-                prev_week_unique[key] += activity.distance_km or 0
-
-            prev_week_actual = sum(prev_week_unique.values())
-
-            # Get previous week planned
-            prev_week_planned_workouts = db.session.query(PlannedWorkout).filter(
-                PlannedWorkout.athlete_id == athlete.id,
-                PlannedWorkout.workout_date >= prev_week_start,
-                PlannedWorkout.workout_date <= prev_week_end
-            ).all()
-
-            prev_week_planned = sum(w.planned_distance_km or 0 for w in prev_week_planned_workouts)
-
+        for (athlete_id, athlete_name, total_actual_km, current_week_actual, current_week_planned,
+             prev_week_actual, prev_week_planned, latest_activity_date) in query.all():
             # Calculate completion rate for current week
             completion_rate = (current_week_actual / current_week_planned * 100) if current_week_planned > 0 else 0
 
@@ -248,13 +192,9 @@ def get_leader_dashboard_data():
             week_change = current_week_actual - prev_week_actual
             week_change_percent = (week_change / prev_week_actual * 100) if prev_week_actual > 0 else 0
 
-            # Get latest activity date
-            latest_activity = db.session.query(Activity).filter_by(athlete_id=athlete.id).order_by(Activity.start_date.desc()).first()
-            latest_activity_date = latest_activity.start_date.date() if latest_activity else None
-
             athlete_data = {
-                'athlete_id': athlete.id,
-                'athlete_name': athlete.name,
+                'athlete_id': athlete_id,
+                'athlete_name': athlete_name,
                 'total_actual_km': round(total_actual_km, 1),
                 'current_week_actual': round(current_week_actual, 1),
                 'current_week_planned': round(current_week_planned, 1),
@@ -269,15 +209,44 @@ def get_leader_dashboard_data():
 
             leader_data.append(athlete_data)
 
-        # Sort by total actual distance (descending)
-        leader_data.sort(key=lambda x: x['total_actual_km'], reverse=True)
-
         return leader_data
 
     except Exception as e:
         logger.error(f"Error getting leader dashboard data: {e}")
+        db.session.rollback()
         return []
 
+def _training_summary_rows(start_date, end_date, athlete_id=None):
+    """One row per active athlete per summarized day, newest first, from the day facts"""
+    from rollups import day_facts_query
+    from models import AthleteDayFact
+
+    facts = day_facts_query(start_date, end_date, [athlete_id] if athlete_id else None).filter(
+        AthleteDayFact.status.isnot(None)
+    ).order_by(AthleteDayFact.fact_date.desc(), Athlete.name).all()
+
+    result_data = []
+    for fact, athlete_name in facts:
+        # Calculate completion rate for individual athlete
+        completion_rate = 0
+        if fact.planned_distance_km and fact.planned_distance_km > 0:
+            completion_rate = ((fact.distance_km or 0) / fact.planned_distance_km * 100)
+
+        result_data.append({
+            'date': day_start(fact.fact_date),
+            'period_label': fact.fact_date.strftime('%d %b %Y'),
+            'athlete_id': fact.athlete_id,
+            'athlete_name': athlete_name,
+            'planned_distance': fact.planned_distance_km or 0,
+            'actual_distance': fact.distance_km or 0,
+            'completion_rate': round(completion_rate, 1),
+            'status': fact.status or 'Unknown',
+            'notes': fact.notes or ''
+        })
+
+    return result_data
+
+
 def get_individual_training_summary_data():
     """Get individual athlete training summary data showing separate rows for each athlete"""
     try:
@@ -285,41 +254,7 @@ def get_individual_training_summary_data():
         end_date = datetime.now()
         start_date = end_date - timedelta(days=10)
         
-        # Get all daily summaries for the date range
-        summaries = db.session.query(DailySummary).join(Athlete).filter(
-            DailySummary.summary_date >= start_date.date(),
-            DailySummary.summary_date <= end_date.date(),
-            Athlete.is_active == True
-        ).order_by(DailySummary.summary_date.desc(), Athlete.name).all()
-        
-        # Create individual rows for each athlete-date combination
-        result_data = []
-        
-        for summary in summaries:
-            athlete = Athlete.query.get(summary.athlete_id)
-            if not athlete or not athlete.is_active:
-                continue
-                
-            # Calculate completion rate for individual athlete
-            completion_rate = 0
-            if summary.planned_distance_km and summary.planned_distance_km > 0:
-                completion_rate = (summary.actual_distance_km / summary.planned_distance_km * 100)
-            
-            athlete_row = {
-                'date': summary.summary_date,
-                'period_label': summary.summary_date.strftime('%d %b %Y'),
-                'athlete_id': athlete.id,
-                'athlete_name': athlete.name,
-                'planned_distance': summary.planned_distance_km or 0,
-                'actual_distance': summary.actual_distance_km or 0,
-                'completion_rate': round(completion_rate, 1),
-                'status': summary.status or 'Unknown',
-                'notes': summary.notes or ''
-            }
-            
-            result_data.append(athlete_row)
-        
-        return result_data
+        return _training_summary_rows(start_date, end_date)
         
     except Exception as e:
         logger.error(f"Error getting individual training summary data: {e}")
@@ -327,6 +262,7 @@ def get_individual_training_summary_data():
 
 
 @app.route('/dashboard')
+@cached_response(*TRAINING_DATA, SETTINGS)
 def dashboard():
     """Enhanced dashboard with comprehensive filtering and manual update capabilities"""
     try:
@@ -385,9 +321,19 @@ def dashboard():
         dashboard_builder = DashboardBuilder()
         weekly_trends = dashboard_builder.get_weekly_trends(target_date)
 
+        # Latest fatigue/fitness per athlete
+        from training_load import get_latest_training_load
+        training_load = get_latest_training_load([athlete_filter] if athlete_filter else None)
+
         return render_template('dashboard.html',
                                dashboard_data=dashboard_data,
                                weekly_trends=weekly_trends,
+                               training_load=training_load,
+                               training_load_config={
+                                   'metric': Config.TRAINING_LOAD_METRIC,
+                                   'atl_days': Config.TRAINING_LOAD_ATL_DAYS,
+                                   'ctl_days': Config.TRAINING_LOAD_CTL_DAYS
+                               },
                                target_date=target_date,
                                all_athletes=all_athletes,
                                filters={
@@ -436,54 +382,38 @@ def get_enhanced_dashboard_data(target_date, athlete_filter=None, period_filter=
             start_date = base_date + timedelta(weeks=week_offset)
             end_date = start_date + timedelta(days=6)
 
-        # Build query with filters - join with Athlete to ensure active athletes only
-        query = db.session.query(DailySummary).join(Athlete).filter(
-            DailySummary.summary_date >= start_date.date(),
-            DailySummary.summary_date <= end_date.date(),
-            Athlete.is_active == True
-        )
-
-        if athlete_filter:
-            query = query.filter(DailySummary.athlete_id == athlete_filter)
-
-        summaries = query.order_by(DailySummary.summary_date.desc()).all()
-
-        # Remove duplicates by creating unique key
-        unique_summaries = {}
-        for summary in summaries:
-            key = f"{summary.athlete_id}_{summary.summary_date}"
-            if key not in unique_summaries:
-                unique_summaries[key] = summary
-
-        summaries = list(unique_summaries.values())
+        # Summarized days of active athletes from the day facts, athlete names joined in
+        from rollups import day_facts_query
+        from models import AthleteDayFact
+        facts = day_facts_query(start_date, end_date, [athlete_filter] if athlete_filter else None).filter(
+            AthleteDayFact.status.isnot(None)
+        ).order_by(AthleteDayFact.fact_date.desc()).all()
 
         # Process summaries with athlete information
         enhanced_summaries = []
         total_planned = 0
         total_actual = 0
 
-        for summary in summaries:
-            athlete = Athlete.query.get(summary.athlete_id)
-            if not athlete:
-                continue
-
+        for fact, athlete_name in facts:
             # Apply activity filter if needed (for future enhancement)
             summary_data = {
-                'athlete_id': summary.athlete_id,
-                'athlete_name': athlete.name,
-                'date': summary.summary_date,
-                'planned_distance': summary.planned_distance_km or 0,
-                'actual_distance': summary.actual_distance_km or 0,
-                'planned_pace': summary.planned_pace_min_per_km or 0,
-                'actual_pace': summary.actual_pace_min_per_km or 0,
-                'distance_variance': summary.distance_variance_percent or 0,
-                'pace_variance': summary.pace_variance_percent or 0,
-                'status': summary.status,
-                'notes': summary.notes
+                'athlete_id': fact.athlete_id,
+                'athlete_name': athlete_name,
+                'date': day_start(fact.fact_date),
+                'planned_distance': fact.planned_distance_km or 0,
+                'actual_distance': fact.distance_km or 0,
+                'planned_pace': fact.planned_pace_min_per_km or 0,
+                'actual_pace': fact.pace_min_per_km or 0,
+                'distance_variance': fact.distance_variance_percent or 0,
+                'pace_variance': fact.pace_variance_percent or 0,
+                'status': fact.status,
+                'notes': fact.notes
             }
             enhanced_summaries.append(summary_data)
-            total_planned += summary.planned_distance_km or 0
-            total_actual += summary.actual_distance_km or 0        # Calculate aggregate statistics
+            total_planned += fact.planned_distance_km or 0
+            total_actual += fact.distance_km or 0
+
+        # Calculate aggregate statistics
         variance = ((total_actual - total_planned) / total_planned * 100) if total_planned > 0 else 0
         completion_rate = len([s for s in enhanced_summaries if s['status'] in ['On Track', 'Over-performed']]) / len(enhanced_summaries) * 100 if enhanced_summaries else 0
 
@@ -602,7 +532,7 @@ def training_plan():
         # Get recent planned workouts (last 7 days) without duplicates
         week_ago = datetime.now() - timedelta(days=7)
         recent_workouts = db.session.query(PlannedWorkout).join(Athlete).filter(
-            PlannedWorkout.workout_date >= week_ago.date(),
+            PlannedWorkout.workout_date >= day_start(week_ago),
             Athlete.is_active == True
         ).order_by(
             PlannedWorkout.workout_date.desc(),
@@ -612,7 +542,7 @@ def training_plan():
         # Get upcoming workouts without duplicates
         today = datetime.now().date()
         upcoming_workouts = db.session.query(PlannedWorkout).join(Athlete).filter(
-            PlannedWorkout.workout_date >= today,
+            PlannedWorkout.workout_date >= day_start(today),
             Athlete.is_active == True
         ).order_by(
             PlannedWorkout.workout_date,
@@ -663,16 +593,10 @@ def upload_training_plan():
             if validation_results.get('file_exists',
                                       False) and validation_results.get(
                                           'required_columns', False):
-                # Trigger manual task to process the new file
-                success = run_manual_task()
-
-                if success:
-                    flash('Training plan uploaded and processed successfully!',
-                          'success')
-                else:
-                    flash(
-                        'Training plan uploaded but processing had some issues. Check the logs for details.',
-                        'warning')
+                # Queue the sync job that imports the new file and refreshes activities
+                job_id = queue_sync_job('incremental')
+                flash(f'Training plan uploaded; it is being processed in the background (sync job {job_id}).',
+                      'success')
             else:
                 flash(
                     'Uploaded file format is invalid. Please check the required columns and data format.',
@@ -688,6 +612,7 @@ def upload_training_plan():
 
 
 @app.route('/api/athlete-progress-data')
+@cached_response(ACTIVITIES, ATHLETES)
 def api_athlete_progress_data():
     """API endpoint for enhanced athlete progress data"""
     try:
@@ -758,7 +683,7 @@ def api_athlete_progress_data():
 
 @app.route('/api/manual-run', methods=['POST'])
 def api_manual_run():
-    """API endpoint to manually trigger daily tasks"""
+    """API endpoint to queue the daily tasks as a background sync job"""
     try:
         # Get target date from request with better error handling
         target_date_str = None
@@ -774,23 +699,18 @@ def api_manual_run():
         if target_date_str and sync_type == 'single':
             try:
                 target_date = datetime.strptime(target_date_str, '%Y-%m-%d')
-                success = run_manual_task(target_date)
-                message = f"Manual task execution completed for {target_date.strftime('%Y-%m-%d')}"
             except ValueError as ve:
                 error_msg = f"Invalid date format: {target_date_str}. Use YYYY-MM-DD format."
                 logger.error(error_msg)
                 return jsonify({"success": False, "message": error_msg}), 400
+            job_id = queue_sync_job('single_day', start_date=target_date, end_date=target_date)
+            message = f"Manual task execution queued for {target_date.strftime('%Y-%m-%d')}"
         else:
-            # Default: sync from May 19, 2025 to current date
-            success = run_manual_task()  # This will trigger date range sync
-            start_date = datetime(2025, 5, 19)
-            end_date = datetime.now()
-            message = f"Date range sync completed from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}"
+            # Default: incremental sync since each athlete's sync cursor
+            job_id = queue_sync_job('incremental')
+            message = "Sync of new activities queued"
 
-        if success:
-            return jsonify({"success": True, "message": message})
-        else:
-            return jsonify({"success": False, "message": f"Sync failed: {message}"}), 500
+        return _sync_job_queued(job_id, message)
 
     except Exception as e:
         error_msg = f"Error during manual execution: {str(e)}"
@@ -798,6 +718,16 @@ def api_manual_run():
         return jsonify({"success": False, "message": error_msg}), 500
 
 
+def _sync_job_queued(job_id, message):
+    """202 response pointing the client at the queued job's progress"""
+    return jsonify({
+        "success": True,
+        "message": message,
+        "job_id": job_id,
+        "status_url": url_for('api_job_status', job_id=job_id)
+    }), 202
+
+
 @app.route('/auth/strava')
 def strava_auth():
     """Initiate Strava OAuth flow"""
@@ -865,20 +795,19 @@ def strava_callback():
         athlete.token_expires_at = datetime.fromtimestamp(
             token_data['expires_at'])
 
+        bump_data_version(ATHLETES)
         db.session.commit()
 
-        # FIX: Trigger immediate sync for new/updated athlete
+        # Load the athlete's season history as a resumable background backfill
         try:
-            current_date = datetime.now().replace(hour=0,
-                                                  minute=0,
-                                                  second=0,
-                                                  microsecond=0)
-            run_manual_task(current_date)
+            from scheduler import start_backfill
+
+            job_ids = start_backfill(athlete_ids=[athlete.id])
             logger.info(
-                f"Auto-synced activities for newly connected athlete: {athlete.name}"
+                f"Queued season backfill {job_ids} for newly connected athlete: {athlete.name}"
             )
         except Exception as sync_error:
-            logger.warning(f"Auto-sync failed for new athlete: {sync_error}")
+            logger.warning(f"Backfill could not be queued for new athlete: {sync_error}")
 
         flash(f"Successfully connected Strava account for {athlete.name}",
               "success")
@@ -897,6 +826,7 @@ def toggle_athlete(athlete_id):
     try:
         athlete = Athlete.query.get_or_404(athlete_id)
         athlete.is_active = not athlete.is_active
+        bump_data_version(ATHLETES)
         db.session.commit()
 
         status = "activated" if athlete.is_active else "deactivated"
@@ -911,6 +841,7 @@ def toggle_athlete(athlete_id):
 
 
 @app.route('/api/dashboard-data/<date>')
+@cached_response(*TRAINING_DATA)
 def api_dashboard_data(date):
     """API endpoint to get dashboard data for AJAX requests"""
     try:
@@ -927,6 +858,7 @@ def api_dashboard_data(date):
 
 
 @app.route('/api/system-logs')
+@conditional_response(SYNC)
 def api_system_logs():
     """API endpoint to get recent system logs"""
     try:
@@ -965,18 +897,28 @@ def api_system_logs():
 def remove_inactive_athletes():
     """Remove athletes who are not connected to Strava (no refresh token)"""
     try:
+        from models import (BackfillJob, SyncJob, AthleteWeekStats, AthleteDayFact, TrainingLoad,
+                            SummaryDirtyDay, OptimalValues)
+
         athletes_without_strava = db.session.query(Athlete).filter(
             Athlete.refresh_token.is_(None)
         ).all()
+        athlete_ids = [athlete.id for athlete in athletes_without_strava]
+
+        # Remove every row that references the athletes first; plans alone are
+        # enough for mark_dirty to have written rollups, facts and dirty days
+        if athlete_ids:
+            for model in (PlannedWorkout, DailySummary, Activity, AthleteWeekStats, AthleteDayFact, TrainingLoad,
+                          SummaryDirtyDay, BackfillJob, SyncJob, OptimalValues):
+                db.session.query(model).filter(model.athlete_id.in_(athlete_ids)).delete(synchronize_session=False)
 
         removed_count = 0
         for athlete in athletes_without_strava:
-            # Remove associated planned workouts and daily summaries first
-            db.session.query(PlannedWorkout).filter_by(athlete_id=athlete.id).delete()
-            db.session.query(DailySummary).filter_by(athlete_id=athlete.id).delete()
             db.session.delete(athlete)
             removed_count += 1
 
+        if removed_count:
+            bump_data_version(*TRAINING_DATA)
         db.session.commit()
         logger.info(f"Removed {removed_count} inactive athletes")
 
@@ -992,19 +934,19 @@ def remove_inactive_athletes():
 
 
 @app.route('/api/training-plan-data')
+@conditional_response(PLANS, ATHLETES)
 def api_training_plan_data():
     """Get training plan data for editing"""
     try:
-        workouts = db.session.query(PlannedWorkout).join(Athlete).filter(
+        workouts = db.session.query(PlannedWorkout, Athlete.name).join(Athlete).filter(
             Athlete.is_active == True
         ).order_by(PlannedWorkout.workout_date.desc()).limit(100).all()
 
         workout_data = []
-        for workout in workouts:
-            athlete = Athlete.query.get(workout.athlete_id)
+        for workout, athlete_name in workouts:
             workout_data.append({
                 'id': workout.id,
-                'athlete_name': athlete.name if athlete else 'Unknown',
+                'athlete_name': athlete_name or 'Unknown',
                 'date': workout.workout_date.isoformat() if workout.workout_date else '',
                 'distance_km': workout.planned_distance_km or 0,
                 'pace_min_per_km': workout.planned_pace_min_per_km or 0,
@@ -1019,6 +961,7 @@ def api_training_plan_data():
         return jsonify({'success': False, 'message': str(e)})
 
 @app.route('/api/athletes-list')
+@conditional_response(ATHLETES)
 def api_athletes_list():
     """Get list of athletes for dropdowns"""
     try:
@@ -1038,6 +981,8 @@ def api_save_training_plan():
 
         saved_count = 0
         updated_count = 0
+        changed_days = []
+        created_athletes = False
 
         for workout_data in workouts:
             athlete = db.session.query(Athlete).filter_by(name=workout_data['athlete_name']).first()
@@ -1046,13 +991,14 @@ def api_save_training_plan():
                 athlete = Athlete(name=workout_data['athlete_name'], is_active=True)
                 db.session.add(athlete)
                 db.session.flush()
+                created_athletes = True
 
             workout_date = datetime.strptime(workout_data['date'], '%Y-%m-%d').date()
 
             # Check if workout already exists
             existing_workout = db.session.query(PlannedWorkout).filter_by(
                 athlete_id=athlete.id,
-                workout_date=workout_date
+                workout_date=day_start(workout_date)
             ).first()
 
             if existing_workout:
@@ -1074,8 +1020,15 @@ def api_save_training_plan():
                 )
                 db.session.add(new_workout)
                 saved_count += 1
+            changed_days.append((athlete.id, workout_date))
 
+        # Past and current days get their summaries fixed now; future ones when they arrive
+        from change_tracker import mark_dirty, recompute_dirty
+        mark_dirty(changed_days, 'plan')
+        if created_athletes:
+            bump_data_version(ATHLETES)
         db.session.commit()
+        recompute_dirty()
 
         return jsonify({
             'success': True, 
@@ -1089,20 +1042,10 @@ def api_save_training_plan():
 
 @app.route('/api/sync-current', methods=['POST'])
 def sync_current():
-    """API endpoint to sync all activities from May 19th to current date"""
+    """API endpoint to queue a sync of all activities since each athlete's sync cursor"""
     try:
-        # Sync full date range from May 19, 2025 to current date
-        success = run_manual_task()  # This will trigger date range sync
-
-        start_date = datetime(2025, 5, 19)
-        end_date = datetime.now()
-
-        if success:
-            message = f"Successfully synced all activities from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}"
-            return jsonify({"success": True, "message": message})
-        else:
-            message = f"Sync failed for date range {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}"
-            return jsonify({"success": False, "message": message})
+        job_id = queue_sync_job('incremental')
+        return _sync_job_queued(job_id, "Sync of new activities queued")
 
     except Exception as e:
         error_msg = f"Error during sync: {e}"
@@ -1127,59 +1070,38 @@ def api_sync_activities():
         # Validate date range
         days_diff = (end_date - start_date).days + 1
 
-        if sync_type == 'individual':
-            if not athlete_id:
-                return jsonify({"success": False, "message": "Athlete ID required for individual sync"})
-            if days_diff > 7:
-                return jsonify({"success": False, "message": "Individual sync limited to 7 days"})
-        elif sync_type == 'all':
-            if days_diff > 2:
-                return jsonify({"success": False, "message": "All athletes sync limited to 2 days"})
+        if sync_type == 'individual' and not athlete_id:
+            return jsonify({"success": False, "message": "Athlete ID required for individual sync"})
 
-        # Perform sync
-        from scheduler import sync_athlete_activities, process_daily_performance
+        # Longer ranges would exhaust the Strava budget in one request, so they
+        # run as a resumable background backfill instead
+        max_days = 7 if sync_type == 'individual' else 2
+        if days_diff > max_days:
+            from scheduler import start_backfill
 
-        sync_results = []
+            job_ids = start_backfill(start_date, end_date,
+                                     athlete_ids=[int(athlete_id)] if sync_type == 'individual' else None)
+            log_sync_operation(sync_type, start_date_str, end_date_str, athlete_id, True,
+                               [f"Queued backfill jobs: {job_ids}"])
+            return jsonify({
+                "success": True,
+                "message": f"Range of {days_diff} days queued as a background backfill; "
+                           f"follow progress at /api/backfill",
+                "backfill_job_ids": job_ids
+            })
 
         if sync_type == 'individual':
-            athlete = Athlete.query.get(athlete_id)
-            if not athlete:
+            from athlete_cache import get_athletes
+            athlete_id = int(athlete_id)
+            if athlete_id not in get_athletes():
                 return jsonify({"success": False, "message": "Athlete not found"})
+        else:
+            athlete_id = None
 
-            # Sync activities for the date range
-            current_date = start_date
-            while current_date <= end_date:
-                try:
-                    activities_count = sync_athlete_activities(athlete, current_date)
-                    process_daily_performance(athlete.id, current_date)
-                    sync_results.append(f"{athlete.name} - {current_date.strftime('%Y-%m-%d')}: {activities_count} activities")
-                except Exception as e:
-                    sync_results.append(f"{athlete.name} - {current_date.strftime('%Y-%m-%d')}: Error - {str(e)}")
-                current_date += timedelta(days=1)
-
-        else:  # all athletes
-            athletes = db.session.query(Athlete).filter_by(is_active=True).all()
-            current_date = start_date
-            while current_date <= end_date:
-                day_total = 0
-                for athlete in athletes:
-                    try:
-                        activities_count = sync_athlete_activities(athlete, current_date)
-                        process_daily_performance(athlete.id, current_date)
-                        day_total += activities_count
-                    except Exception as e:
-                        logger.error(f"Error syncing {athlete.name} for {current_date}: {e}")
-                sync_results.append(f"All athletes - {current_date.strftime('%Y-%m-%d')}: {day_total} total activities")
-                current_date += timedelta(days=1)
-
-        # Log sync operation
-        log_sync_operation(sync_type, start_date_str, end_date_str, athlete_id, True, sync_results)
-
-        return jsonify({
-            "success": True, 
-            "message": f"Sync completed successfully for {sync_type} from {start_date_str} to {end_date_str}",
-            "details": sync_results
-        })
+        # One paginated fetch per athlete covers the whole window; a worker runs it and logs the result
+        job_id = queue_sync_job('range', sync_type=sync_type, athlete_id=athlete_id,
+                                start_date=start_date, end_date=end_date)
+        return _sync_job_queued(job_id, f"Sync queued for {sync_type} from {start_date_str} to {end_date_str}")
 
     except Exception as e:
         error_msg = f"Sync failed: {str(e)}"
@@ -1198,6 +1120,80 @@ def api_sync_activities():
         return jsonify({"success": False, "message": error_msg})
 
 
+@app.route('/api/jobs/<int:job_id>')
+def api_job_status(job_id):
+    """API endpoint reporting a sync job's per-athlete, per-day progress, API calls used and errors"""
+    try:
+        status = get_sync_job_status(job_id)
+        if status is None:
+            return jsonify({'success': False, 'message': f'Sync job {job_id} not found'}), 404
+
+        # success follows the job, so clients can treat a finished job like the old synchronous reply
+        return jsonify({'success': status['status'] != 'failed', **status})
+
+    except Exception as e:
+        logger.error(f"Error getting sync job {job_id}: {e}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+@app.route('/api/backfill', methods=['GET', 'POST'])
+def api_backfill():
+    """API endpoint to queue a historical backfill or report backfill progress and ETA"""
+    from scheduler import start_backfill, get_backfill_status
+
+    try:
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            start_date = datetime.strptime(data['start_date'], '%Y-%m-%d') if data.get('start_date') else None
+            end_date = datetime.strptime(data['end_date'], '%Y-%m-%d') if data.get('end_date') else None
+            athlete_ids = [int(data['athlete_id'])] if data.get('athlete_id') else None
+
+            job_ids = start_backfill(start_date, end_date, athlete_ids)
+            if not job_ids:
+                return jsonify({"success": False, "message": "No connected athletes to backfill"}), 400
+
+            return jsonify({
+                "success": True,
+                "message": f"Backfill queued for {len(job_ids)} athletes",
+                "backfill": get_backfill_status(job_ids)
+            })
+
+        return jsonify({"success": True, "backfill": get_backfill_status()})
+
+    except ValueError as e:
+        return jsonify({"success": False, "message": f"Invalid backfill request: {e}"}), 400
+    except Exception as e:
+        logger.error(f"Error handling backfill request: {e}")
+        return jsonify({"success": False, "message": str(e)}), 500
+
+
+@app.route('/api/backfill/<int:job_id>')
+def api_backfill_job(job_id):
+    """API endpoint for the progress and ETA of one backfill job"""
+    from scheduler import get_backfill_status
+
+    try:
+        status = get_backfill_status([job_id])
+        if not status['jobs']:
+            return jsonify({"success": False, "message": "Backfill job not found"}), 404
+        return jsonify({"success": True, "job": status['jobs'][0], "eta_seconds": status['eta_seconds'],
+                        "rate_limit_remaining": status['rate_limit_remaining']})
+
+    except Exception as e:
+        logger.error(f"Error getting backfill job {job_id}: {e}")
+        return jsonify({"success": False, "message": str(e)}), 500
+
+
+@app.route('/api/strava/rate-limit')
+def api_strava_rate_limit():
+    """API endpoint exposing the live Strava rate limit budget"""
+    try:
+        return jsonify({"success": True, "rate_limit": StravaClient().get_rate_limit_status()})
+    except Exception as e:
+        logger.error(f"Error getting Strava rate limit status: {e}")
+        return jsonify({"success": False, "message": str(e)}), 500
+
+
 @app.route('/api/whatsapp-config', methods=['POST'])
 def api_whatsapp_config():
     """API endpoint to save WhatsApp configuration"""
@@ -1258,6 +1254,7 @@ def api_test_whatsapp():
 
 
 @app.route('/api/sync-history')
+@conditional_response(SYNC)
 def api_sync_history():
     """API endpoint to get sync history"""
     try:
@@ -1286,6 +1283,7 @@ def api_sync_history():
 
 
 @app.route('/api/optimal-values', methods=['GET', 'POST'])
+@conditional_response(SETTINGS, ATHLETES)
 def api_optimal_values():
     """API endpoint for optimal values configuration"""
     try:
@@ -1299,6 +1297,10 @@ def api_optimal_values():
                 # Return default values
                 optimal = OptimalValues()
 
+            # Tolerances left empty inherit from the global row and then Config
+            from performance_classifier import load_status_tolerances
+            distance_tolerance, pace_tolerance = load_status_tolerances([athlete_id])[athlete_id]
+
             return jsonify({
                 'success': True,
                 'values': {
@@ -1307,7 +1309,11 @@ def api_optimal_values():
                     'optimal_heart_rate_bpm': optimal.optimal_heart_rate_bpm,
                     'max_heart_rate_bpm': optimal.max_heart_rate_bpm,
                     'optimal_elevation_gain_m': optimal.optimal_elevation_gain_m,
-                    'weekly_distance_target_km': optimal.weekly_distance_target_km
+                    'weekly_distance_target_km': optimal.weekly_distance_target_km,
+                    'distance_tolerance_percent': optimal.distance_tolerance_percent,
+                    'pace_tolerance_percent': optimal.pace_tolerance_percent,
+                    'effective_distance_tolerance_percent': distance_tolerance,
+                    'effective_pace_tolerance_percent': pace_tolerance
                 }
             })
 
@@ -1328,10 +1334,29 @@ def api_optimal_values():
             optimal.max_heart_rate_bpm = data.get('max_heart_rate_bpm', 180)
             optimal.optimal_elevation_gain_m = data.get('optimal_elevation_gain_m', 100.0)
             optimal.weekly_distance_target_km = data.get('weekly_distance_target_km', 50.0)
+
+            # Empty tolerances inherit; changed ones re-derive the stored statuses
+            tolerances_changed = False
+            for field in ('distance_tolerance_percent', 'pace_tolerance_percent'):
+                if field in data:
+                    value = float(data[field]) if data[field] not in (None, '') else None
+                    if value is not None and value < 0:
+                        return jsonify({'success': False, 'message': f'{field} must not be negative'}), 400
+                    tolerances_changed = tolerances_changed or value != getattr(optimal, field)
+                    setattr(optimal, field, value)
             optimal.updated_at = datetime.now()
 
+            bump_data_version(SETTINGS)
             db.session.commit()
 
+            if tolerances_changed:
+                from data_processor import DataProcessor
+                changed = DataProcessor().reclassify_daily_summaries(
+                    athlete_ids=[athlete_id] if athlete_id is not None else None
+                )
+                return jsonify({'success': True,
+                                'message': f'Configuration saved successfully, {changed} workout statuses updated'})
+
             return jsonify({'success': True, 'message': 'Configuration saved successfully'})
 
     except Exception as e:
@@ -1340,6 +1365,43 @@ def api_optimal_values():
         return jsonify({'success': False, 'message': str(e)})
 
 
+@app.route('/api/status-what-if')
+@conditional_response(SETTINGS, SUMMARIES, ATHLETES)
+def api_status_what_if():
+    """API endpoint comparing stored workout statuses with statuses under other tolerances"""
+    try:
+        distance_tolerance = request.args.get('distance_tolerance', type=float)
+        pace_tolerance = request.args.get('pace_tolerance', type=float)
+        athlete_id = request.args.get('athlete_id', type=int)
+        start_date_str = request.args.get('start_date')
+        end_date_str = request.args.get('end_date')
+
+        from backfill import tracking_start_date
+        start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str else tracking_start_date()
+        end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else datetime.now().date()
+
+        from data_processor import DataProcessor
+        comparison = DataProcessor().preview_status_tolerances(
+            distance_tolerance, pace_tolerance, start_date, end_date,
+            [athlete_id] if athlete_id else None
+        )
+
+        return jsonify({
+            'success': True,
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'distance_tolerance_percent': distance_tolerance,
+            'pace_tolerance_percent': pace_tolerance,
+            **comparison
+        })
+
+    except ValueError as e:
+        return jsonify({'success': False, 'message': f'Invalid what-if request: {e}'}), 400
+    except Exception as e:
+        logger.error(f"Error running status what-if: {e}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
 @app.route('/api/apply-global-defaults', methods=['POST'])
 def api_apply_global_defaults():
     """Apply global optimal values to all existing athletes"""
@@ -1375,6 +1437,7 @@ def api_apply_global_defaults():
                 db.session.add(athlete_optimal)
                 updated_count += 1
 
+        bump_data_version(SETTINGS)
         db.session.commit()
 
         return jsonify({
@@ -1388,6 +1451,7 @@ def api_apply_global_defaults():
         return jsonify({'success': False, 'message': str(e)})
 
 @app.route('/api/athlete-performance-charts')
+@cached_response(ACTIVITIES, ATHLETES, SETTINGS)
 def api_athlete_performance_charts():
     """API endpoint for athlete performance chart data"""
     try:
@@ -1401,13 +1465,10 @@ def api_athlete_performance_charts():
         # Calculate date range based on timeframe
         end_date = datetime.now()
         if timeframe == '30days':
-            start_date = end_date - timedelta(days=30)
             days_range = 30
         elif timeframe == '90days':
-            start_date = end_date - timedelta(days=90)
             days_range = 90
         else:  # 7days default
-            start_date = end_date - timedelta(days=7)
             days_range = 7
 
         # Filter athletes based on selection
@@ -1436,62 +1497,31 @@ def api_athlete_performance_charts():
         }
 
         # Generate date labels based on timeframe
-        dates = []
-        for i in range(days_range):
-            date = (end_date - timedelta(days=days_range-1-i)).date()
-            dates.append(date.strftime('%m/%d'))
+        first_day = (end_date - timedelta(days=days_range - 1)).date()
+        chart_days = [first_day + timedelta(days=i) for i in range(days_range)]
+        dates = [day.strftime('%m/%d') for day in chart_days]
 
         chart_data['distance']['labels'] = dates
         chart_data['heartRate']['labels'] = dates
         chart_data['pace']['labels'] = dates
         chart_data['elevation']['labels'] = dates
 
-        for athlete in athletes:
-            # Get optimal values for athlete
-            optimal = db.session.query(OptimalValues).filter_by(athlete_id=athlete.id).first()
-            if not optimal:
-                optimal = db.session.query(OptimalValues).filter_by(athlete_id=None).first()
-            if not optimal:
-                continue
+        # Athletes are charted when they or the global defaults have optimal values
+        optimal_owners = {owner_id for owner_id, in db.session.query(OptimalValues.athlete_id).all()}
+        charted = [athlete for athlete in athletes if athlete.id in optimal_owners or None in optimal_owners]
 
-            # Get recent activities
-            activities = db.session.query(Activity).filter(
-                Activity.athlete_id == athlete.id,
-                Activity.start_date >= start_date
-            ).order_by(Activity.start_date).all()
-
-            # Group by day and calculate averages
-            daily_data = {}
-            for activity in activities:
-                day = activity.start_date.date()
-                if day not in daily_data:
-                    daily_data[day] = {'distance': 0, 'heart_rate': [], 'pace': [], 'elevation': 0}
-
-                daily_data[day]['distance'] += activity.distance_km or 0
-                if activity.average_heartrate:
-                    daily_data[day]['heart_rate'].append(activity.average_heartrate)
-                if activity.pace_min_per_km:
-                    daily_data[day]['pace'].append(activity.pace_min_per_km)
-                daily_data[day]['elevation'] += activity.total_elevation_gain or 0
-
-            # Prepare data arrays for the timeframe
-            distance_data = []
-            hr_data = []
-            pace_data = []
-            elevation_data = []
-
-            for i in range(days_range):
-                date = (end_date - timedelta(days=days_range-1-i)).date()
-                if date in daily_data:
-                    distance_data.append(daily_data[date]['distance'])
-                    hr_data.append(sum(daily_data[date]['heart_rate']) / len(daily_data[date]['heart_rate']) if daily_data[date]['heart_rate'] else 0)
-                    pace_data.append(sum(daily_data[date]['pace']) / len(daily_data[date]['pace']) if daily_data[date]['pace'] else 0)
-                    elevation_data.append(daily_data[date]['elevation'])
-                else:
-                    distance_data.append(0)
-                    hr_data.append(0)
-                    pace_data.append(0)
-                    elevation_data.append(0)
+        # One indexed range read over the dense day facts; missing rows chart as zero
+        from rollups import day_facts_query
+        facts = {(fact.athlete_id, fact.fact_date): fact for fact, _ in day_facts_query(
+            first_day, end_date, [athlete.id for athlete in charted]
+        ).all()}
+
+        for athlete in charted:
+            athlete_facts = [facts.get((athlete.id, day)) for day in chart_days]
+            distance_data = [(fact.distance_km or 0) if fact else 0 for fact in athlete_facts]
+            hr_data = [(fact.average_heartrate or 0) if fact else 0 for fact in athlete_facts]
+            pace_data = [(fact.pace_min_per_km or 0) if fact else 0 for fact in athlete_facts]
+            elevation_data = [(fact.elevation_gain_m or 0) if fact else 0 for fact in athlete_facts]
 
             # Add athlete data
             chart_data['distance']['datasets'].append({
@@ -1535,6 +1565,7 @@ def api_athlete_performance_charts():
                 weekly_distance_target_km=50.0
             )
             db.session.add(optimal_global)
+            bump_data_version(SETTINGS)
             db.session.commit()
 
         if optimal_global:
@@ -1575,34 +1606,80 @@ def api_athlete_performance_charts():
         return jsonify({'success': False, 'message': str(e)})
 
 
-def log_sync_operation(sync_type, start_date, end_date, athlete_id, success, details):
-    """Log sync operation to system logs"""
+@app.route('/api/training-load')
+@conditional_response(ACTIVITIES, ATHLETES)
+def api_training_load():
+    """API endpoint for per-athlete ATL/CTL/TSB/ACWR series and latest values"""
     try:
-        athlete_name = "All Athletes"
-        if athlete_id:
-            athlete = Athlete.query.get(athlete_id)
-            athlete_name = athlete.name if athlete else f"Athlete {athlete_id}"
-
-        log_type = "SYNC_SUCCESS" if success else "SYNC_FAILED"
-        message = f"Sync {sync_type} - {athlete_name} ({start_date} to {end_date})"
-        details_str = "; ".join(details) if details else ""
-
-        system_log = SystemLog(
-            log_date=datetime.now(),
-            log_type=log_type,
-            message=message,
-            details=details_str
+        from models import TrainingLoad
+        from training_load import get_latest_training_load, training_load_dict
+
+        athlete_id = request.args.get('athlete_id', type=int)
+        days = min(max(request.args.get('days', 42, type=int), 1), 365)
+        athlete_ids = [athlete_id] if athlete_id else None
+
+        start_date = datetime.now().date() - timedelta(days=days - 1)
+        query = db.session.query(TrainingLoad, Athlete.name).join(
+            Athlete, Athlete.id == TrainingLoad.athlete_id
+        ).filter(
+            TrainingLoad.load_date >= start_date,
+            Athlete.is_active == True
         )
+        if athlete_ids:
+            query = query.filter(TrainingLoad.athlete_id.in_(athlete_ids))
 
-        db.session.add(system_log)
-        db.session.commit()
+        series = {}
+        for row, athlete_name in query.order_by(TrainingLoad.athlete_id, TrainingLoad.load_date).all():
+            series.setdefault(row.athlete_id, []).append(training_load_dict(row, athlete_name))
+
+        return jsonify({
+            'success': True,
+            'metric': Config.TRAINING_LOAD_METRIC,
+            'atl_days': Config.TRAINING_LOAD_ATL_DAYS,
+            'ctl_days': Config.TRAINING_LOAD_CTL_DAYS,
+            'latest': get_latest_training_load(athlete_ids),
+            'series': {str(key): values for key, values in series.items()}
+        })
 
     except Exception as e:
-        logger.error(f"Failed to log sync operation: {e}")
-        db.session.rollback()
+        logger.error(f"Error getting training load: {e}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+@app.route('/api/leaderboard')
+@cached_response(*TRAINING_DATA)
+def api_leaderboard():
+    """API endpoint for the leader board, with sort, order and limit parameters"""
+    try:
+        sort_by = request.args.get('sort', 'total_actual_km')
+        order = request.args.get('order', 'asc' if sort_by == 'athlete_name' else 'desc').lower()
+        limit = request.args.get('limit', type=int)
+
+        if sort_by not in LEADERBOARD_SORT_KEYS:
+            return jsonify({'success': False,
+                            'message': f"sort must be one of: {', '.join(LEADERBOARD_SORT_KEYS)}"}), 400
+        if order not in ('asc', 'desc'):
+            return jsonify({'success': False, 'message': 'order must be asc or desc'}), 400
+        if limit is not None and limit < 1:
+            return jsonify({'success': False, 'message': 'limit must be a positive integer'}), 400
+
+        leaderboard = get_leader_dashboard_data(sort_by, order == 'desc', limit)
+
+        return jsonify({
+            'success': True,
+            'sort': sort_by,
+            'order': order,
+            'limit': limit,
+            'leaderboard': leaderboard
+        })
+
+    except Exception as e:
+        logger.error(f"Error getting leaderboard: {e}")
+        return jsonify({'success': False, 'message': str(e)}), 500
 
 
 @app.route('/api/training-summary/<period>')
+@cached_response(*TRAINING_DATA)
 def api_training_summary(period):
     """API endpoint for training summary with period filtering"""
     try:
@@ -1616,11 +1693,7 @@ def api_training_summary(period):
             week_start = today - timedelta(days=days_since_monday)
             week_end = week_start + timedelta(days=6)
             
-            query = db.session.query(DailySummary).join(Athlete).filter(
-                DailySummary.summary_date >= week_start,
-                DailySummary.summary_date <= week_end,
-                Athlete.is_active == True
-            )
+            start_date, end_date = week_start, week_end
             
         elif period == 'month':
             # Get current month data
@@ -1629,54 +1702,16 @@ def api_training_summary(period):
             next_month = month_start.replace(month=month_start.month + 1) if month_start.month < 12 else month_start.replace(year=month_start.year + 1, month=1)
             month_end = next_month - timedelta(days=1)
             
-            query = db.session.query(DailySummary).join(Athlete).filter(
-                DailySummary.summary_date >= month_start,
-                DailySummary.summary_date <= month_end,
-                Athlete.is_active == True
-            )
+            start_date, end_date = month_start, month_end
             
         else:  # 10days (default)
             end_date = datetime.now()
             start_date = end_date - timedelta(days=10)
-            
-            query = db.session.query(DailySummary).join(Athlete).filter(
-                DailySummary.summary_date >= start_date.date(),
-                DailySummary.summary_date <= end_date.date(),
-                Athlete.is_active == True
-            )
         
-        # Apply athlete filter if specified
-        if athlete_id:
-            query = query.filter(DailySummary.athlete_id == athlete_id)
-            
-        summaries = query.order_by(DailySummary.summary_date.desc(), Athlete.name).all()
-
         # Create individual rows for each athlete-date combination
-        result_data = []
-        
-        for summary in summaries:
-            athlete = Athlete.query.get(summary.athlete_id)
-            if not athlete or not athlete.is_active:
-                continue
-                
-            # Calculate completion rate for individual athlete
-            completion_rate = 0
-            if summary.planned_distance_km and summary.planned_distance_km > 0:
-                completion_rate = (summary.actual_distance_km / summary.planned_distance_km * 100)
-            
-            athlete_row = {
-                'date': summary.summary_date.isoformat(),
-                'period_label': summary.summary_date.strftime('%d %b %Y'),
-                'athlete_id': athlete.id,
-                'athlete_name': athlete.name,
-                'planned_distance': summary.planned_distance_km or 0,
-                'actual_distance': summary.actual_distance_km or 0,
-                'completion_rate': round(completion_rate, 1),
-                'status': summary.status or 'Unknown',
-                'notes': summary.notes or ''
-            }
-            
-            result_data.append(athlete_row)
+        result_data = _training_summary_rows(start_date, end_date, athlete_id)
+        for athlete_row in result_data:
+            athlete_row['date'] = athlete_row['date'].isoformat()
 
         return jsonify({
             'success': True,
@@ -1699,7 +1734,7 @@ def debug_km_mismatch(athlete_id, date):
         planned_workout = db.session.query(PlannedWorkout).filter(
             and_(
                 PlannedWorkout.athlete_id == athlete_id,
-                func.date(PlannedWorkout.workout_date) == target_date
+                PlannedWorkout.workout_date == day_start(target_date)
             )
         ).first()
 
@@ -1707,7 +1742,7 @@ def debug_km_mismatch(athlete_id, date):
         activities = db.session.query(Activity).filter(
             and_(
                 Activity.athlete_id == athlete_id,
-                func.date(Activity.start_date) == target_date
+                Activity.activity_date == target_date
             )
         ).all()
 
@@ -1792,7 +1827,7 @@ def debug_comprehensive(athlete_id, date):
         planned_workout = db.session.query(PlannedWorkout).filter(
             and_(
                 PlannedWorkout.athlete_id == athlete_id,
-                func.date(PlannedWorkout.workout_date) == target_date
+                PlannedWorkout.workout_date == day_start(target_date)
             )
         ).first()
 
@@ -1802,8 +1837,7 @@ def debug_comprehensive(athlete_id, date):
         activities = db.session.query(Activity).filter(
             and_(
                 Activity.athlete_id == athlete_id,
-                Activity.start_date >= start_of_day,
-                Activity.start_date < end_of_day
+                Activity.activity_date == target_date
             )
         ).all()
 
@@ -1926,6 +1960,37 @@ def debug_athletes():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/debug/query-plans')
+def debug_query_plans():
+    """Debug route showing whether the hot dashboard queries use indexes"""
+    try:
+        from query_plan_check import check_query_plans
+        results = check_query_plans()
+        return jsonify({
+            'ok': all(result['ok'] for result in results),
+            'queries': results
+        })
+    except Exception as e:
+        logger.error(f"Error checking query plans: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/debug/cleanup-duplicates', methods=['GET', 'POST'])
+def debug_cleanup_duplicates():
+    """Debug route counting duplicate summaries, workouts and activities; POST removes them, keeping the newest.
+
+    /debug/clean-duplicates (app.py) still removes only Strava-id duplicate activities.
+    """
+    try:
+        from data_processor import DataProcessor
+        dry_run = request.method == 'GET' or request.args.get('dry_run', 'false').lower() == 'true'
+        counts = DataProcessor().cleanup_duplicates(dry_run=dry_run)
+        return jsonify({'success': True, **counts})
+    except Exception as e:
+        logger.error(f"Error cleaning duplicates: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors"""
@@ -2,17 +2,23 @@ import schedule
 import time
 import logging
 from datetime import datetime, timedelta, date
-from threading import Thread
-from typing import Optional
-from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from threading import Thread, RLock
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import and_, or_
 
 from config import Config
 from strava_client import StravaClient
+from sync_engine import StravaSyncEngine
+from backfill import BackfillManager, tracking_start_date
+from sync_jobs import SyncJobManager
 from excel_reader import ExcelReader
 from data_processor import DataProcessor
 from dashboard_builder import DashboardBuilder
 from notifier import NotificationManager
-from models import Athlete, Activity, PlannedWorkout, SystemLog
+from models import Athlete, Activity, PlannedWorkout, SystemLog, day_start
+from db_helpers import insert_ignore_duplicates, upsert_rows
+from change_tracker import mark_dirty, mark_unsummarized, recompute_dirty, pending_count
+from response_cache import bump_data_version, ATHLETES, SYNC
 from app import app, db
 
 logger = logging.getLogger(__name__)
@@ -22,20 +28,49 @@ class DailyTaskScheduler:
 
     def __init__(self):
         self.strava_client = StravaClient()
+        self.sync_engine = StravaSyncEngine(self.strava_client)
+        self.token_manager = self.sync_engine.token_manager
+        self.backfill_manager = BackfillManager(self)
+        self.sync_job_manager = SyncJobManager(self)
         self.excel_reader = ExcelReader(Config.TRAINING_PLAN_FILE)
         self.data_processor = DataProcessor()
         self.dashboard_builder = DashboardBuilder()
         self.notification_manager = NotificationManager()
-        self.is_running = False  # Prevent concurrent executions
+        self.is_running = False  # Set while any sync holds the sync lock
+        self._sync_lock = RLock()
+        self._sync_depth = 0
+
+    def begin_sync(self, wait_seconds: float = 0) -> bool:
+        """Take the process-wide sync lock; False if another sync holds it after wait_seconds.
+
+        Syncs advance the same cursors and mark the same dirty days, so only
+        one runs at a time: the scheduled run, a sync job or a backfill. The
+        lock is reentrant, so the holder can call the sync methods below.
+        Pair with end_sync.
+        """
+        if wait_seconds > 0:
+            acquired = self._sync_lock.acquire(timeout=wait_seconds)
+        else:
+            acquired = self._sync_lock.acquire(blocking=False)
+        if acquired:
+            self._sync_depth += 1
+            self.is_running = True
+        return acquired
+
+    def end_sync(self):
+        """Release the sync lock taken by begin_sync"""
+        self._sync_depth -= 1
+        if not self._sync_depth:
+            self.is_running = False
+        self._sync_lock.release()
 
-    def execute_daily_tasks(self, target_date: datetime = None) -> bool:
+    def execute_daily_tasks(self, target_date: datetime = None,
+                            on_athlete_result: Optional[Callable[[Dict], None]] = None) -> bool:
         """Execute the complete daily task workflow"""
-        if self.is_running:
-            logger.warning("Daily tasks already running, skipping execution")
+        if not self.begin_sync():
+            logger.warning("Another sync is running, skipping daily tasks")
             return False
 
-        self.is_running = True
-
         try:
             if target_date is None:
                 target_date = datetime.now()
@@ -49,7 +84,8 @@ class DailyTaskScheduler:
                     self._log_system_event("WARNING", "Training plan update failed, continuing with existing data")
 
                 # Step 2: Fetch and process Strava data for all athletes
-                strava_success = self._fetch_and_process_strava_data(target_date)
+                strava_success = self._fetch_and_process_strava_data(target_date, on_athlete_result)
+                self.strava_client.flush_usage()
                 if not strava_success:
                     self._log_system_event("ERROR", "Strava data fetch failed")
                     return False
@@ -81,7 +117,7 @@ class DailyTaskScheduler:
             logger.error(error_msg)
             return False
         finally:
-            self.is_running = False
+            self.end_sync()
 
     def _update_training_plan(self) -> bool:
         """Update training plan from Excel file"""
@@ -109,6 +145,7 @@ class DailyTaskScheduler:
                 return False
 
             # Ensure athletes exist in database
+            created_athletes = 0
             for athlete_name in athletes_in_plan:
                 try:
                     athlete = Athlete.query.filter_by(name=athlete_name).first()
@@ -116,6 +153,7 @@ class DailyTaskScheduler:
                         # Create new athlete record
                         athlete = Athlete(name=athlete_name, is_active=True)
                         db.session.add(athlete)
+                        created_athletes += 1
                         logger.info(f"Created new athlete record: {athlete_name}")
                 except Exception as e:
                     logger.error(f"Failed to create athlete {athlete_name}: {e}")
@@ -123,6 +161,8 @@ class DailyTaskScheduler:
 
             # Commit athlete changes first
             try:
+                if created_athletes:
+                    bump_data_version(ATHLETES)
                 db.session.commit()
             except Exception as e:
                 logger.error(f"Failed to commit athlete changes: {e}")
@@ -145,63 +185,83 @@ class DailyTaskScheduler:
             return False
 
     def _update_planned_workouts(self, training_df) -> bool:
-        """Update planned workouts from training plan data with strict duplicate prevention"""
+        """Update planned workouts from training plan data with one bulk upsert.
+
+        Athlete names are resolved once and the existing workouts of the
+        plan's date span are loaded in one query, so inserts, updates and
+        unchanged rows are told apart in memory. Rows for the same athlete
+        and day later in the plan win.
+        """
         try:
-            updated_count = 0
-            created_count = 0
+            # Lowest id wins for duplicate names, as with filter_by(name=...).first()
+            athlete_ids = {name: athlete_id for athlete_id, name in
+                           db.session.query(Athlete.id, Athlete.name).order_by(Athlete.id.desc()).all()}
 
-            for _, row in training_df.iterrows():
+            plan = {}
+            missing_athletes = set()
+            for row in training_df.to_dict('records'):
                 try:
-                    # Get athlete by name
-                    athlete = Athlete.query.filter_by(name=row['AthleteName']).first()
-                    if not athlete:
-                        logger.warning(f"Athlete not found: {row['AthleteName']}")
+                    athlete_id = athlete_ids.get(row['AthleteName'])
+                    if not athlete_id:
+                        missing_athletes.add(row['AthleteName'])
                         continue
 
                     # Convert date to ensure consistent format
                     workout_date = row['Date'].date() if hasattr(row['Date'], 'date') else row['Date']
+                    pace = row.get('PlannedPaceMinPerKM')
 
-                    # Check for existing workout with multiple conditions
-                    existing_workout = PlannedWorkout.query.filter(
-                        PlannedWorkout.athlete_id == athlete.id,
-                        db.func.date(PlannedWorkout.workout_date) == workout_date
-                    ).first()
-
-                    if existing_workout:
-                        # Only update if values are different
-                        if (existing_workout.planned_distance_km != row.get('PlannedDistanceKM', 0) or
-                            existing_workout.planned_pace_min_per_km != row.get('PlannedPaceMinPerKM') or
-                            existing_workout.workout_type != row.get('WorkoutType', 'General')):
-
-                            existing_workout.planned_distance_km = row.get('PlannedDistanceKM', 0)
-                            existing_workout.planned_pace_min_per_km = row.get('PlannedPaceMinPerKM')
-                            existing_workout.workout_type = row.get('WorkoutType', 'General')
-                            existing_workout.notes = row.get('Notes', '')
-                            updated_count += 1
-                            logger.debug(f"Updated planned workout for {athlete.name} on {workout_date}")
-                    else:
-                        # Create new workout only if it doesn't exist
-                        try:
-                            workout = PlannedWorkout(
-                                athlete_id=athlete.id,
-                                workout_date=datetime.combine(workout_date, datetime.min.time()) if isinstance(workout_date, date) else workout_date,
-                                planned_distance_km=row.get('PlannedDistanceKM', 0),
-                                planned_pace_min_per_km=row.get('PlannedPaceMinPerKM'),
-                                workout_type=row.get('WorkoutType', 'General'),
-                                notes=row.get('Notes', '')
-                            )
-                            db.session.add(workout)
-                            created_count += 1
-                            logger.debug(f"Created new planned workout for {athlete.name} on {workout_date}")
-                        except Exception as e:
-                            logger.warning(f"Duplicate workout prevented for {athlete.name} on {workout_date}: {e}")
-                            continue
+                    plan[(athlete_id, workout_date)] = {
+                        'planned_distance_km': float(row.get('PlannedDistanceKM', 0) or 0),
+                        'planned_pace_min_per_km': float(pace) if pace is not None else None,
+                        'workout_type': row.get('WorkoutType', 'General'),
+                        'notes': row.get('Notes', '')
+                    }
 
                 except Exception as e:
                     logger.error(f"Failed to process workout for {row.get('AthleteName', 'Unknown')}: {e}")
                     continue
 
-            # Commit changes
+            for name in sorted(missing_athletes, key=str):
+                logger.warning(f"Athlete not found: {name}")
+
+            if not plan:
+                logger.info("Successfully processed planned workouts: 0 created, 0 updated")
+                return True
+
+            days = [workout_date for _, workout_date in plan]
+            existing = {
+                (athlete_id, workout_date.date()): (distance, pace, workout_type)
+                for athlete_id, workout_date, distance, pace, workout_type in db.session.query(
+                    PlannedWorkout.athlete_id, PlannedWorkout.workout_date, PlannedWorkout.planned_distance_km,
+                    PlannedWorkout.planned_pace_min_per_km, PlannedWorkout.workout_type
+                ).filter(
+                    PlannedWorkout.athlete_id.in_({athlete_id for athlete_id, _ in plan}),
+                    PlannedWorkout.workout_date >= day_start(min(days)),
+                    PlannedWorkout.workout_date <= day_start(max(days))
+                ).all()
+            }
+
+            rows = []
+            created_count = 0
+            updated_count = 0
+            for (athlete_id, workout_date), values in plan.items():
+                current = existing.get((athlete_id, workout_date))
+                if current is None:
+                    created_count += 1
+                elif current != (values['planned_distance_km'], values['planned_pace_min_per_km'],
+                                 values['workout_type']):
+                    # Only update if values are different
+                    updated_count += 1
+                else:
+                    continue
+                rows.append({'athlete_id': athlete_id, 'workout_date': day_start(workout_date),
+                             'created_at': datetime.utcnow(), **values})
+
+            upsert_rows(PlannedWorkout, rows, index_elements=['athlete_id', 'workout_date'],
+                        update_columns=['planned_distance_km', 'planned_pace_min_per_km', 'workout_type', 'notes'])
+
+            # Commit changes together with the summary days they invalidate
+            mark_dirty(((row['athlete_id'], row['workout_date']) for row in rows), 'plan')
             db.session.commit()
             logger.info(f"Successfully processed planned workouts: {created_count} created, {updated_count} updated")
             return True
@@ -211,160 +271,258 @@ class DailyTaskScheduler:
             db.session.rollback()
             return False
 
-    def _fetch_and_process_strava_data(self, target_date: datetime) -> bool:
-        """Fetch and process Strava data for all athletes"""
-        try:
-            athletes = Athlete.query.filter_by(is_active=True).all()
+    def _fetch_and_process_strava_data(self, target_date: datetime,
+                                       on_athlete_result: Optional[Callable[[Dict], None]] = None) -> bool:
+        """Fetch new Strava data for all athletes since their sync cursor and process it"""
+        results = self._fetch_and_process_strava_incremental(target_date, on_athlete_result=on_athlete_result)
+        if results['error']:
+            return False
+        return results['successful_athletes'] > 0 or results['total_athletes'] == 0
 
-            if not athletes:
-                logger.warning("No active athletes found")
-                return True  # Not an error, just no data to process
+    def _sync_window_start(self, athlete: 'Athlete', target_date: Optional[datetime] = None) -> datetime:
+        """Start of the incremental fetch window for an athlete.
 
-            successful_athletes = 0
+        Resumes from the athlete's sync cursor minus a configurable overlap for
+        late uploads, and always reaches back far enough to cover target_date.
+        """
+        if athlete.last_synced_activity_at:
+            window_start = athlete.last_synced_activity_at - timedelta(hours=Config.STRAVA_SYNC_OVERLAP_HOURS)
+        else:
+            window_start = datetime.now() - timedelta(days=Config.STRAVA_INITIAL_SYNC_DAYS)
 
-            for athlete in athletes:
-                try:
-                    if not athlete.refresh_token:
-                        logger.warning(f"No refresh token for athlete {athlete.name}")
-                        continue
+        window_start = window_start.replace(hour=0, minute=0, second=0, microsecond=0)
+        if target_date is not None:
+            target_start = datetime.combine(
+                target_date.date() if isinstance(target_date, datetime) else target_date,
+                datetime.min.time()
+            )
+            window_start = min(window_start, target_start)
 
-                    # Refresh access token
-                    token_data = self.strava_client.refresh_access_token(athlete.refresh_token)
-                    if not token_data:
-                        logger.error(f"Failed to refresh token for athlete {athlete.name}")
-                        continue
+        return window_start
 
-                    # Update athlete token data
-                    athlete.access_token = token_data['access_token']
-                    athlete.token_expires_at = datetime.fromtimestamp(token_data['expires_at'])
-                    if 'refresh_token' in token_data:
-                        athlete.refresh_token = token_data['refresh_token']
+    def _fetch_and_process_strava_incremental(self, target_date: Optional[datetime] = None,
+                                              athletes: Optional[List['Athlete']] = None,
+                                              on_athlete_result: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """Fetch only activities newer than each athlete's sync cursor.
 
-                    # Commit token updates immediately
-                    db.session.commit()
+        Summaries are recomputed for the days that received new activities,
+        plus target_date (today by default) for athletes that have no summary
+        for it yet.
+        """
+        if target_date is None:
+            target_date = datetime.now()
+        target_day = target_date.date() if isinstance(target_date, datetime) else target_date
 
-                    # Fetch activities for target date (last 2 days only)
-                    current_date = datetime.now().date()
-                    target_date_only = target_date.date() if isinstance(target_date, datetime) else target_date
+        try:
+            if athletes is None:
+                athletes = Athlete.query.filter_by(is_active=True).all()
+        except Exception as e:
+            logger.error(f"Failed to load athletes for sync: {e}")
+            return self._empty_sync_results(error=str(e))
+
+        windows = {athlete.id: (self._sync_window_start(athlete, target_date), None) for athlete in athletes}
+        return self._run_sync(athletes, windows, required_summary_days=[target_day],
+                              on_athlete_result=on_athlete_result)
+
+    def _fetch_and_process_strava_range(self, start_date: datetime, end_date: datetime,
+                                        athletes: Optional[List['Athlete']] = None,
+                                        on_athlete_result: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """Fetch a whole date window with one paginated call per athlete.
+
+        Activities are bucketed by local date in memory and every day of the
+        window gets its summary recomputed, so a multi-day sync costs roughly
+        one Strava call per athlete instead of one per athlete per day.
+        """
+        start_day = start_date.date() if isinstance(start_date, datetime) else start_date
+        end_day = end_date.date() if isinstance(end_date, datetime) else end_date
+        days = [start_day + timedelta(days=offset) for offset in range((end_day - start_day).days + 1)]
 
-                    # Only sync if target date is within last 2 days
-                    if target_date_only < current_date - timedelta(days=2):
-                        logger.info(f"Skipping sync for {target_date_only} - beyond 2-day limit")
-                        continue
+        try:
+            if athletes is None:
+                athletes = Athlete.query.filter_by(is_active=True).all()
+        except Exception as e:
+            logger.error(f"Failed to load athletes for sync: {e}")
+            return self._empty_sync_results(days, error=str(e))
+
+        window_start = datetime.combine(start_day, datetime.min.time())
+        window_end = datetime.combine(end_day, datetime.min.time()) + timedelta(days=1)
+        windows = {athlete.id: (window_start, window_end) for athlete in athletes}
+
+        return self._run_sync(athletes, windows, summary_days=days, on_athlete_result=on_athlete_result)
+
+    @staticmethod
+    def _empty_sync_results(days: Optional[List[date]] = None, error: Optional[str] = None) -> Dict:
+        return {
+            'total_athletes': 0,
+            'successful_athletes': 0,
+            'daily_counts': {day: 0 for day in (days or [])},
+            'athlete_results': [],
+            'error': error
+        }
+
+    def _run_sync(self, athletes: List['Athlete'], windows: Dict, summary_days: Optional[List[date]] = None,
+                  required_summary_days: Optional[List[date]] = None,
+                  on_athlete_result: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """Fetch each athlete's window concurrently and persist the results on this thread.
+
+        Days that received new activities are marked dirty, as are all of
+        summary_days when given (a forced range recompute) and any of
+        required_summary_days an athlete has no summary for. Only the marked
+        days are recomputed at the end. on_athlete_result is called with each
+        athlete's result once it is saved or has failed.
+        """
+        results = self._empty_sync_results(summary_days)
+        results['total_athletes'] = len(athletes)
+
+        if not athletes:
+            logger.warning("No active athletes found")
+            return results
 
-                    start_of_day = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
-                    end_of_day = start_of_day + timedelta(days=1)
+        try:
+            athletes_by_id = {athlete.id: athlete for athlete in athletes}
+            synced_ids = []
 
-                    activities = self.strava_client.get_athlete_activities(
-                        athlete.access_token, start_of_day, end_of_day
-                    )
+            # Network I/O runs concurrently; this thread is the single DB writer
+            for result in self.sync_engine.fetch_athletes(athletes, windows=windows):
+                athlete = athletes_by_id[result['athlete_id']]
+                athlete_result = {'athlete_id': athlete.id, 'athlete_name': athlete.name,
+                                  'activities': 0, 'new_activities': 0, 'complete': result['complete'],
+                                  'requests': result['requests'], 'error': result['error'], 'daily_counts': {}}
+                results['athlete_results'].append(athlete_result)
 
-                    if not activities:
-                        logger.info(f"No activities found for athlete {athlete.name} on {target_date.strftime('%Y-%m-%d')}")
-                        successful_athletes += 1
+                try:
+                    if result['error']:
+                        logger.error(f"Failed to sync athlete {athlete.name}: {result['error']}")
                         continue
 
-                    # Process and save activities
-                    saved_activities = 0
-                    for activity_data in activities:
-                        try:
-                            processed_activity = self.strava_client.process_activity_data(activity_data)
-                            if processed_activity:
-                                if self._save_activity(athlete.id, processed_activity):
-                                    saved_activities += 1
-                        except Exception as e:
-                            logger.error(f"Failed to process activity for athlete {athlete.name}: {e}")
-                            continue
-
-                    logger.info(f"Processed {saved_activities} activities for athlete {athlete.name}")
-
-                    # Process daily performance
-                    try:
-                        performance_summary = self.data_processor.process_athlete_daily_performance(
-                            athlete.id, target_date
-                        )
-
-                        if performance_summary:
-                            self.data_processor.save_daily_summary(performance_summary)
-                    except Exception as e:
-                        logger.error(f"Failed to process daily performance for athlete {athlete.name}: {e}")
-
-                    successful_athletes += 1
+                    # Persist the token only if the worker had to refresh it; it is
+                    # committed on its own so a failed ingest cannot lose a rotated token
+                    if result['token_data']:
+                        self.token_manager.apply_token_data(athlete, result['token_data'])
+                        db.session.commit()
+
+                    # Count activities per local date
+                    for processed_activity in result['activities']:
+                        activity_day = processed_activity['start_date'].date()
+                        results['daily_counts'][activity_day] = results['daily_counts'].get(activity_day, 0) + 1
+                        athlete_result['daily_counts'][activity_day] = athlete_result['daily_counts'].get(activity_day, 0) + 1
+
+                    # New activities, their dirty days and the sync cursor go in one transaction per athlete
+                    new_activities = self._save_activities(athlete.id, result['activities'])
+                    self._advance_sync_cursor(athlete, result['activities'], result['complete'])
+                    db.session.commit()
+
+                    athlete_result['activities'] = len(result['activities'])
+                    athlete_result['new_activities'] = new_activities
+                    logger.info(f"Processed {len(result['activities'])} activities for athlete {athlete.name} "
+                                f"({new_activities} new)")
+
+                    synced_ids.append(athlete.id)
+                    results['successful_athletes'] += 1
 
                 except Exception as e:
                     logger.error(f"Failed to process athlete {athlete.name}: {e}")
+                    athlete_result['error'] = str(e)
                     db.session.rollback()
                     continue
 
-            logger.info(f"Successfully processed {successful_athletes}/{len(athletes)} athletes")
-            return successful_athletes > 0
+                finally:
+                    if on_athlete_result:
+                        on_athlete_result(athlete_result)
+
+            # Recompute only the dirty days, in one grouped query and one upsert
+            if summary_days is not None:
+                mark_dirty(((athlete_id, day) for athlete_id in synced_ids for day in summary_days), 'range sync')
+            for day in required_summary_days or []:
+                mark_unsummarized(day, list(athletes_by_id))
+            db.session.commit()
+            recompute_dirty(self.data_processor)
+
+            logger.info(f"Successfully processed {results['successful_athletes']}/{len(athletes)} athletes")
+            return results
 
         except Exception as e:
             logger.error(f"Failed to fetch and process Strava data: {e}")
             db.session.rollback()
-            return False
-
-    def _save_activity(self, athlete_id: int, activity_data: dict) -> bool:
-        """Save activity to database with comprehensive duplicate prevention"""
-        if not activity_data or not activity_data.get('strava_activity_id'):
-            logger.warning("Invalid activity data provided")
-            return False
-
-        try:
-            # Check for duplicates by Strava ID first (most reliable)
-            existing_by_strava_id = Activity.query.filter_by(
-                strava_activity_id=activity_data['strava_activity_id']
-            ).first()
-
-            if existing_by_strava_id:
-                logger.debug(f"Activity {activity_data['strava_activity_id']} already exists (by Strava ID)")
-                return True
+            results['error'] = str(e)
+            return results
+
+    def _advance_sync_cursor(self, athlete: 'Athlete', activities: List[Dict], complete: bool):
+        """Move the athlete's sync cursor to the newest activity seen (never backwards); caller commits.
+
+        A fetch cut short by the rate limit or an error leaves the cursor where
+        it was, so the next sync fetches the unseen part of the window again.
+        """
+        if not complete:
+            logger.info(f"Fetch for athlete {athlete.name} was incomplete; keeping sync cursor "
+                        f"at {athlete.last_synced_activity_at}")
+            return
+
+        newest = None
+        for activity in activities:
+            start_date = activity.get('start_date')
+            if start_date is None:
+                continue
+            start_date = start_date.replace(tzinfo=None)
+            if newest is None or start_date > newest[0]:
+                newest = (start_date, activity.get('strava_activity_id'))
+
+        if newest and (not athlete.last_synced_activity_at or newest[0] > athlete.last_synced_activity_at):
+            athlete.last_synced_activity_at = newest[0]
+            athlete.last_synced_activity_id = newest[1]
+
+    def _save_activities(self, athlete_id: int, activities: List[Dict]) -> int:
+        """Bulk-insert an athlete's new activities in the current transaction (caller commits).
+
+        Known activities are filtered out with a single preload query, matching
+        by Strava ID or by start time and name (re-uploads); the rest go in as
+        a multi-row INSERT ... ON CONFLICT DO NOTHING, and their days are
+        marked for a summary recompute. Returns rows inserted.
+        """
+        rows = {}
+        for activity_data in activities:
+            if not activity_data or not activity_data.get('strava_activity_id') or not activity_data.get('start_date'):
+                logger.warning("Invalid activity data provided")
+                continue
+
+            rows[activity_data['strava_activity_id']] = {
+                'strava_activity_id': activity_data['strava_activity_id'],
+                'athlete_id': athlete_id,
+                'name': activity_data.get('name') or 'Unknown Activity',
+                'activity_type': activity_data.get('activity_type') or 'Unknown',
+                'start_date': activity_data['start_date'].replace(tzinfo=None),
+                'activity_date': activity_data['start_date'].date(),
+                'distance_km': activity_data.get('distance_km', 0.0),
+                'moving_time_seconds': activity_data.get('moving_time_seconds', 0),
+                'pace_min_per_km': activity_data.get('pace_min_per_km', 0.0),
+                'average_speed': activity_data.get('average_speed'),
+                'average_heartrate': activity_data.get('average_heartrate'),
+                'max_heartrate': activity_data.get('max_heartrate'),
+                'total_elevation_gain': activity_data.get('total_elevation_gain')
+            }
+
+        if not rows:
+            return 0
 
-            # Secondary check: athlete + date + name combination
-            if activity_data.get('start_date') and activity_data.get('name'):
-                existing_by_combination = Activity.query.filter_by(
-                    athlete_id=athlete_id,
-                    start_date=activity_data['start_date'],
-                    name=activity_data['name']
-                ).first()
-
-                if existing_by_combination:
-                    logger.debug(f"Similar activity already exists for athlete {athlete_id} on {activity_data['start_date']}")
-                    return True
-
-            # Create new activity with validation
-            activity = Activity(
-                strava_activity_id=activity_data['strava_activity_id'],
-                athlete_id=athlete_id,
-                name=activity_data.get('name', 'Unknown Activity'),
-                activity_type=activity_data.get('activity_type', 'Unknown'),
-                start_date=activity_data.get('start_date'),
-                distance_km=activity_data.get('distance_km', 0.0),
-                moving_time_seconds=activity_data.get('moving_time_seconds', 0),
-                pace_min_per_km=activity_data.get('pace_min_per_km', 0.0)
+        activity_dates = [row['activity_date'] for row in rows.values()]
+        existing = db.session.query(Activity.strava_activity_id, Activity.start_date, Activity.name).filter(
+            or_(
+                Activity.strava_activity_id.in_(list(rows)),
+                and_(Activity.athlete_id == athlete_id,
+                     Activity.activity_date >= min(activity_dates),
+                     Activity.activity_date <= max(activity_dates))
             )
+        ).all()
+        known_ids = {activity.strava_activity_id for activity in existing}
+        known_keys = {(activity.start_date, activity.name) for activity in existing}
 
-            db.session.add(activity)
-            db.session.commit()
-
-            logger.info(f"Saved activity {activity_data['strava_activity_id']} for athlete {athlete_id}")
-            return True
+        new_rows = [row for strava_id, row in rows.items()
+                    if strava_id not in known_ids and (row['start_date'], row['name']) not in known_keys]
 
-        except IntegrityError as e:
-            # Handle database constraint violations (duplicate keys)
-            db.session.rollback()
-            logger.info(f"Activity {activity_data['strava_activity_id']} already exists (integrity constraint)")
-            return True
-        except SQLAlchemyError as e:
-            # Handle other database errors
-            db.session.rollback()
-            logger.error(f"Database error saving activity {activity_data.get('strava_activity_id')}: {e}")
-            return False
-        except Exception as e:
-            # Handle any other errors
-            db.session.rollback()
-            logger.error(f"Unexpected error saving activity {activity_data.get('strava_activity_id')}: {e}")
-            return False
+        inserted = insert_ignore_duplicates(Activity, new_rows, index_elements=['strava_activity_id'])
+        mark_dirty(((athlete_id, row['activity_date']) for row in new_rows), 'activity')
+        logger.debug(f"Inserted {inserted} of {len(rows)} activities for athlete {athlete_id}")
+        return inserted
 
     def _log_system_event(self, log_type: str, message: str, details: str = None):
         """Log system events to database with error handling"""
@@ -376,6 +534,7 @@ class DailyTaskScheduler:
                 details=details
             )
             db.session.add(system_log)
+            bump_data_version(SYNC)
             db.session.commit()
 
         except Exception as e:
@@ -391,6 +550,12 @@ class DailyTaskScheduler:
             # Schedule only once per day at 9 AM to respect Strava rate limits
             schedule.every().day.at("09:00").do(self._safe_execute_daily_tasks)
 
+            # Keep stored access tokens warm so syncs rarely need to refresh inline
+            schedule.every(Config.STRAVA_TOKEN_REFRESH_INTERVAL_MINUTES).minutes.do(self._safe_refresh_expiring_tokens)
+
+            # Resume paused historical backfills once the rate limit window allows
+            schedule.every(Config.BACKFILL_POLL_MINUTES).minutes.do(self._safe_run_backfill)
+
             logger.info("Scheduled daily Strava sync at 9:00 AM")
 
             # Keep the scheduler running
@@ -406,13 +571,54 @@ class DailyTaskScheduler:
             logger.error(f"Failed to start scheduler: {e}")
 
     def _safe_execute_daily_tasks(self):
-        """Wrapper for execute_daily_tasks with additional error handling"""
+        """Wrapper for execute_daily_tasks with additional error handling.
+
+        A sync job or backfill still running at the scheduled time is waited
+        for rather than overlapped, so the daily run is delayed, not dropped.
+        """
+        if not self.begin_sync(wait_seconds=Config.SYNC_JOB_STALE_MINUTES * 60):
+            logger.error("Another sync is still running, skipping the scheduled daily tasks")
+            return False
         try:
             return self.execute_daily_tasks()
         except Exception as e:
             logger.error(f"Unexpected error in scheduled task execution: {e}")
-            self.is_running = False  # Reset the running flag
             return False
+        finally:
+            self.end_sync()
+
+    def _safe_refresh_expiring_tokens(self):
+        """Refresh soon-to-expire Strava tokens in a background batch"""
+        try:
+            with app.app_context():
+                return self.token_manager.refresh_expiring_tokens()
+        except Exception as e:
+            logger.error(f"Unexpected error refreshing expiring tokens: {e}")
+            return 0
+
+    def _safe_run_backfill(self):
+        """Process pending backfill chunks with additional error handling"""
+        try:
+            with app.app_context():
+                return self.backfill_manager.run_pending()
+        except Exception as e:
+            logger.error(f"Unexpected error running backfill: {e}")
+            return None
+
+    def start_backfill(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                       athlete_ids: Optional[List[int]] = None) -> List[int]:
+        """Queue backfill jobs (default: whole season so far) and start processing them in the background"""
+        start_date = start_date or tracking_start_date()
+        end_date = end_date or datetime.now()
+
+        jobs = self.backfill_manager.create_jobs(start_date, end_date, athlete_ids)
+        job_ids = [job.id for job in jobs]
+
+        if job_ids:
+            backfill_thread = Thread(target=self._safe_run_backfill, daemon=True)
+            backfill_thread.start()
+            logger.info(f"Started background backfill for jobs {job_ids}")
+        return job_ids
 
     def start_scheduler_thread(self):
         """Start the scheduler in a separate thread"""
@@ -424,28 +630,52 @@ class DailyTaskScheduler:
             logger.error(f"Failed to start scheduler thread: {e}")
 
     def manual_execution(self, target_date: Optional[datetime] = None) -> bool:
-        """Manually execute tasks for last 2 days only to respect rate limits"""
+        """Manually execute tasks, fetching only what is new since each athlete's sync cursor"""
         if target_date is None:
-            # Default: sync only last 2 days (today and yesterday)
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=1)  # Only yesterday and today
-            logger.info(f"Manual execution for last 2 days: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
-            return self.execute_date_range_sync(start_date, end_date)
-        else:
-            # For specific date, only allow if within last 2 days
-            current_date = datetime.now().date()
-            target_date_only = target_date.date() if isinstance(target_date, datetime) else target_date
+            logger.info("Manual execution: incremental sync since each athlete's sync cursor")
+            return self.execute_incremental_sync()
 
-            if target_date_only < current_date - timedelta(days=2):
-                logger.warning(f"Target date {target_date_only} is beyond 2-day limit. Only last 2 days allowed.")
-                return False
+        logger.info(f"Manual execution for specific date: {target_date.strftime('%Y-%m-%d')}")
+        return self.execute_daily_tasks(target_date)
+
+    def execute_incremental_sync(self, on_athlete_result: Optional[Callable[[Dict], None]] = None) -> bool:
+        """Update the plan, fetch new activities for all athletes and rebuild the dashboard"""
+        if not self.begin_sync():
+            logger.warning("Another sync is running, skipping incremental sync")
+            return False
+
+        try:
+            with app.app_context():
+                plan_updated = self._update_training_plan()
+                if not plan_updated:
+                    logger.warning("Training plan update failed, but continuing with sync")
+
+                results = self._fetch_and_process_strava_incremental(on_athlete_result=on_athlete_result)
+                self.strava_client.flush_usage()
+
+                self.dashboard_builder.build_daily_dashboard(datetime.now())
+
+                message = (f"Incremental sync completed: {results['successful_athletes']}/"
+                           f"{results['total_athletes']} athletes")
+                logger.info(message)
+                self._log_system_event("SUCCESS", message)
 
-            logger.info(f"Manual execution for specific date: {target_date.strftime('%Y-%m-%d')}")
-            return self.execute_daily_tasks(target_date)
+                return not results['error'] and (results['successful_athletes'] > 0 or results['total_athletes'] == 0)
+
+        except Exception as e:
+            error_msg = f"Incremental sync failed: {e}"
+            self._log_system_event("ERROR", error_msg)
+            logger.error(error_msg)
+            return False
+        finally:
+            self.end_sync()
 
     def execute_date_range_sync(self, start_date: datetime, end_date: datetime) -> bool:
         """Execute sync for a range of dates from May 19th to current date"""
         logger.info(f"Starting date range sync from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
+        if not self.begin_sync():
+            logger.warning("Another sync is running, skipping date range sync")
+            return False
 
         try:
             with app.app_context():
@@ -454,27 +684,12 @@ class DailyTaskScheduler:
                 if not plan_updated:
                     logger.warning("Training plan update failed, but continuing with sync")
 
-                # Step 2: Process each date in the range
-                current_date = start_date
-                successful_days = 0
+                # Step 2: Fetch the whole range once per athlete and summarize each day
                 total_days = (end_date.date() - start_date.date()).days + 1
+                results = self._fetch_and_process_strava_range(start_date, end_date)
+                successful_days = total_days if results['successful_athletes'] > 0 else 0
 
-                while current_date.date() <= end_date.date():
-                    try:
-                        logger.info(f"Processing date: {current_date.strftime('%Y-%m-%d')}")
-
-                        # Fetch and process Strava data for this date
-                        success = self._fetch_and_process_strava_data(current_date)
-                        if success:
-                            successful_days += 1
-
-                        # Move to next day
-                        current_date += timedelta(days=1)
-
-                    except Exception as e:
-                        logger.error(f"Failed to process date {current_date.strftime('%Y-%m-%d')}: {e}")
-                        current_date += timedelta(days=1)
-                        continue
+                self.strava_client.flush_usage()
 
                 # Step 3: Generate dashboard for the end date
                 dashboard_data = self.dashboard_builder.build_daily_dashboard(end_date)
@@ -491,6 +706,8 @@ class DailyTaskScheduler:
             self._log_system_event("ERROR", error_msg)
             logger.error(error_msg)
             return False
+        finally:
+            self.end_sync()
 
     def sync_athlete_activities(self, athlete: 'Athlete', target_date: datetime) -> int:
         """Sync activities for a specific athlete on a specific date"""
@@ -499,61 +716,62 @@ class DailyTaskScheduler:
                 logger.warning(f"No refresh token for athlete {athlete.name}")
                 return 0
 
-            # Refresh access token
-            token_data = self.strava_client.refresh_access_token(athlete.refresh_token)
-            if not token_data:
+            # Reuse the stored access token unless it is close to expiry
+            access_token = self.token_manager.get_valid_token(athlete)
+            if not access_token:
                 logger.error(f"Failed to refresh token for athlete {athlete.name}")
                 return 0
 
-            # Update athlete token data
-            athlete.access_token = token_data['access_token']
-            athlete.token_expires_at = datetime.fromtimestamp(token_data['expires_at'])
-            if 'refresh_token' in token_data:
-                athlete.refresh_token = token_data['refresh_token']
-
-            # Commit token updates immediately
-            db.session.commit()
-
             # Fetch activities for target date
             start_of_day = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
             end_of_day = start_of_day + timedelta(days=1)
 
             activities = self.strava_client.get_athlete_activities(
-                athlete.access_token, start_of_day, end_of_day
+                access_token, start_of_day, end_of_day
             )
 
             if not activities:
                 logger.info(f"No activities found for athlete {athlete.name} on {target_date.strftime('%Y-%m-%d')}")
                 return 0
 
-            # Process and save activities
-            saved_activities = 0
+            # Process and save activities in one transaction
+            processed_activities = []
             for activity_data in activities:
-                try:
-                    processed_activity = self.strava_client.process_activity_data(activity_data)
-                    if processed_activity:
-                        if self._save_activity(athlete.id, processed_activity):
-                            saved_activities += 1
-                except Exception as e:
-                    logger.error(f"Failed to process activity for athlete {athlete.name}: {e}")
-                    continue
+                processed_activity = self.strava_client.process_activity_data(activity_data)
+                if processed_activity:
+                    processed_activities.append(processed_activity)
+
+            saved_activities = self._save_activities(athlete.id, processed_activities)
+            db.session.commit()
 
-            logger.info(f"Processed {saved_activities} activities for athlete {athlete.name}")
-            return saved_activities
+            logger.info(f"Processed {len(processed_activities)} activities for athlete {athlete.name} "
+                        f"({saved_activities} new)")
+            return len(processed_activities)
 
         except Exception as e:
             logger.error(f"Failed to sync activities for athlete {athlete.name}: {e}")
+            db.session.rollback()
             return 0
 
+    def sync_date_range(self, start_date: datetime, end_date: datetime,
+                        athletes: Optional[List['Athlete']] = None,
+                        on_athlete_result: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """Sync all active (or the given) athletes for a date range with one fetch per athlete"""
+        if not self.begin_sync():
+            logger.warning("Another sync is running, skipping date range sync")
+            return self._empty_sync_results(error="Another sync is running")
+
+        try:
+            results = self._fetch_and_process_strava_range(start_date, end_date, athletes, on_athlete_result)
+            self.strava_client.flush_usage()
+            return results
+        finally:
+            self.end_sync()
+
     def process_daily_performance(self, athlete_id: int, target_date: datetime) -> bool:
         """Process daily performance for a specific athlete and date"""
         try:
-            performance_summary = self.data_processor.process_athlete_daily_performance(
-                athlete_id, target_date
-            )
-            if performance_summary:
-                return self.data_processor.save_daily_summary(performance_summary)
-            return False
+            return self.data_processor.process_daily_summaries(target_date, target_date, [athlete_id]) > 0
         except Exception as e:
             logger.error(f"Failed to process daily performance for athlete {athlete_id}: {e}")
             return False
@@ -567,6 +785,7 @@ class DailyTaskScheduler:
                     'database_connection': False,
                     'active_athletes': 0,
                     'recent_activities': 0,
+                    'dirty_summary_days': 0,
                     'last_successful_run': None
                 }
 
@@ -586,6 +805,12 @@ class DailyTaskScheduler:
                 except Exception as e:
                     logger.error(f"Failed to count recent activities: {e}")
 
+                # Summaries still waiting for a recompute
+                try:
+                    health_status['dirty_summary_days'] = pending_count()
+                except Exception as e:
+                    logger.error(f"Failed to count dirty summary days: {e}")
+
                 # Check last successful run
                 try:
                     last_success = SystemLog.query.filter_by(
@@ -604,31 +829,19 @@ class DailyTaskScheduler:
             return {'error': str(e)}
 
     def run_daily_tasks(self, target_date=None):
-        """Run daily scheduled tasks with rate limiting - only sync last 2 days"""
+        """Run daily scheduled tasks, fetching only activities newer than each athlete's sync cursor"""
         try:
-            # Check API rate limits before proceeding
-            #if not self._check_api_limits():
-            #    logger.warning("API rate limits exceeded, skipping scheduled sync")
-            #    return False
-
             # Use target date or default to current date
             if target_date is None:
                 target_date = datetime.now()
 
-            # Only sync last 2 days (today and yesterday) to respect Strava rate limits
-            yesterday = target_date - timedelta(days=1)
-            dates_to_sync = [yesterday, target_date]
-
-            for current_date in dates_to_sync:
-                if not self._fetch_and_process_strava_data(current_date):
-                    logger.error(f"Failed to process {current_date.strftime('%Y-%m-%d')}")
-                else:
-                    logger.info(f"Successfully processed {current_date.strftime('%Y-%m-%d')}")
-
-            # Update last sync time
-            #self._update_api_usage()
+            results = self._fetch_and_process_strava_incremental(target_date)
+            self.strava_client.flush_usage()
 
-            logger.info(f"Daily tasks completed successfully for last 2 days: {yesterday.strftime('%Y-%m-%d')} and {target_date.strftime('%Y-%m-%d')}")
+            if results['error'] or (results['total_athletes'] and not results['successful_athletes']):
+                logger.error(f"Failed to process incremental sync for {target_date.strftime('%Y-%m-%d')}")
+            else:
+                logger.info(f"Daily tasks completed successfully for {target_date.strftime('%Y-%m-%d')}")
             return True
 
         except Exception as e:
@@ -644,6 +857,8 @@ def init_scheduler():
     try:
         # Start the scheduler thread
         daily_scheduler.start_scheduler_thread()
+        # Run sync jobs left queued by a previous process
+        daily_scheduler.sync_job_manager.start_workers()
         logger.info("Daily task scheduler initialized")
 
     except Exception as e:
@@ -661,6 +876,26 @@ def sync_athlete_activities(athlete, target_date: datetime) -> int:
     """Module-level function to sync athlete activities"""
     return daily_scheduler.sync_athlete_activities(athlete, target_date)
 
+def sync_date_range(start_date: datetime, end_date: datetime, athletes=None) -> dict:
+    """Module-level function to sync all (or the given) athletes for a date range"""
+    return daily_scheduler.sync_date_range(start_date, end_date, athletes)
+
+def start_backfill(start_date=None, end_date=None, athlete_ids=None) -> list:
+    """Module-level function to queue a resumable historical backfill"""
+    return daily_scheduler.start_backfill(start_date, end_date, athlete_ids)
+
+def get_backfill_status(job_ids=None) -> dict:
+    """Module-level function to get backfill progress and ETA"""
+    return daily_scheduler.backfill_manager.get_status(job_ids)
+
+def queue_sync_job(job_type: str, sync_type=None, athlete_id=None, start_date=None, end_date=None) -> int:
+    """Module-level function to queue a background sync job; returns its id"""
+    return daily_scheduler.sync_job_manager.enqueue(job_type, sync_type, athlete_id, start_date, end_date).id
+
+def get_sync_job_status(job_id: int) -> Optional[dict]:
+    """Module-level function to get a sync job's progress (None if it does not exist)"""
+    return daily_scheduler.sync_job_manager.get_status(job_id)
+
 def process_daily_performance(athlete_id: int, target_date: datetime) -> bool:
     """Module-level function to process daily performance"""
     return daily_scheduler.process_daily_performance(athlete_id, target_date)
\ No newline at end of file
@@ -2,6 +2,80 @@
 
 // Global variables
 var chartInstances = chartInstances || {};
+var apiResponseCache = apiResponseCache || new Map();
+
+/**
+ * fetch() for GET API calls that revalidates instead of re-downloading.
+ * Sends the ETag / Last-Modified of the previous response for the URL; on
+ * 304 the stored body is returned as a normal 200 response.
+ */
+function conditionalFetch(url, options = {}) {
+    const method = (options.method || 'GET').toUpperCase();
+    if (method !== 'GET') {
+        return fetch(url, options);
+    }
+
+    const cached = apiResponseCache.get(url);
+    const headers = new Headers(options.headers || {});
+    if (cached && cached.etag) {
+        headers.set('If-None-Match', cached.etag);
+    }
+    if (cached && cached.lastModified) {
+        headers.set('If-Modified-Since', cached.lastModified);
+    }
+
+    return fetch(url, { ...options, headers }).then(response => {
+        if (response.status === 304 && cached) {
+            return new Response(cached.body, {
+                status: 200,
+                headers: { 'Content-Type': cached.contentType }
+            });
+        }
+        if (response.ok && (response.headers.get('ETag') || response.headers.get('Last-Modified'))) {
+            return response.clone().text().then(body => {
+                apiResponseCache.set(url, {
+                    etag: response.headers.get('ETag'),
+                    lastModified: response.headers.get('Last-Modified'),
+                    contentType: response.headers.get('Content-Type') || 'application/json',
+                    body: body
+                });
+                return response;
+            });
+        }
+        return response;
+    });
+}
+
+/**
+ * Follow a queued sync job until it finishes.
+ * Takes the reply of a sync endpoint; replies without a job_id resolve as they are.
+ * Resolves with the final /api/jobs/<id> status, whose success and message
+ * mirror a synchronous reply. onProgress receives every intermediate status.
+ */
+function waitForSyncJob(data, onProgress = null, intervalMs = 2000) {
+    if (!data || !data.job_id) {
+        return Promise.resolve(data);
+    }
+
+    return new Promise((resolve, reject) => {
+        const poll = () => {
+            fetch(`/api/jobs/${data.job_id}`)
+                .then(response => response.json())
+                .then(job => {
+                    if (job.status === 'completed' || job.status === 'failed' || job.status === undefined) {
+                        resolve(job);
+                        return;
+                    }
+                    if (onProgress) {
+                        onProgress(job);
+                    }
+                    setTimeout(poll, intervalMs);
+                })
+                .catch(reject);
+        };
+        poll();
+    });
+}
 
 // Initialize dashboard when DOM is loaded
 document.addEventListener('DOMContentLoaded', function() {
@@ -322,6 +396,10 @@ function runManualStravaSync(targetDate = null) {
         body: JSON.stringify(requestData)
     })
     .then(response => response.json())
+    .then(data => waitForSyncJob(data, job => {
+        button.innerHTML = `<i data-feather="loader" class="me-1"></i> ${job.message}...`;
+        feather.replace();
+    }))
     .then(data => {
         if (data.success) {
             showAlert(`${data.message} Dashboard updated with latest activities.`, 'success');
@@ -368,6 +446,7 @@ function runManualTask(targetDate = null) {
         body: JSON.stringify(payload)
     })
     .then(response => response.json())
+    .then(data => waitForSyncJob(data))
     .then(data => {
         if (data.success) {
             showAlert('Manual sync completed successfully!', 'success');
@@ -541,7 +620,7 @@ function setupAutoRefresh(intervalMinutes = 30) {
             const currentDate = document.getElementById('dateSelector')?.value || 
                                new Date().toISOString().split('T')[0];
 
-            fetch(`/api/dashboard-data/${currentDate}`)
+            conditionalFetch(`/api/dashboard-data/${currentDate}`)
                 .then(response => response.json())
                 .then(data => {
                     if (data && !data.error) {
@@ -729,7 +808,7 @@ function initializeProgressFilters() {
 }
 
 function loadAthleteProgressData() {
-    fetch('/api/athlete-progress-data')
+    conditionalFetch('/api/athlete-progress-data')
         .then(response => {
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
@@ -862,7 +941,7 @@ function filterTrainingSummaryByAthlete() {
         params.append('athlete_id', athleteId);
     }
     
-    fetch(`/api/training-summary/${period}?${params.toString()}`)
+    conditionalFetch(`/api/training-summary/${period}?${params.toString()}`)
         .then(response => response.json())
         .then(data => {
             if (data.success) {
@@ -914,7 +993,7 @@ function updateChartsForAthlete(athleteId) {
         params.append('athlete_id', athleteId);
     }
     
-    fetch(`/api/athlete-performance-charts?${params.toString()}`)
+    conditionalFetch(`/api/athlete-performance-charts?${params.toString()}`)
         .then(response => response.json())
         .then(data => {
             if (data.success) {
@@ -938,7 +1017,7 @@ function updateSummaryWithAthleteFilter(athleteId) {
         params.append('athlete_id', athleteId);
     }
     
-    fetch(`/api/training-summary/${summaryPeriod}?${params.toString()}`)
+    conditionalFetch(`/api/training-summary/${summaryPeriod}?${params.toString()}`)
         .then(response => response.json())
         .then(data => {
             if (data.success) {
@@ -1287,7 +1366,7 @@ function createPerformanceCharts() {
 
 async function updatePerformanceCharts() {
     try {
-        const response = await fetch('/api/athlete-performance-charts');
+        const response = await conditionalFetch('/api/athlete-performance-charts');
         const data = await response.json();
 
         if (data.success) {
@@ -1407,6 +1486,7 @@ function runQuickSync() {
         }
     })
     .then(response => response.json())
+    .then(data => waitForSyncJob(data))
     .then(data => {
         if (data.success) {
             showAlert('success', data.message);
@@ -1455,7 +1535,7 @@ function updateSummaryData(period) {
     }
 
     // Fetch new data
-    fetch(`/api/training-summary/${period}`)
+    conditionalFetch(`/api/training-summary/${period}`)
         .then(response => response.json())
         .then(data => {
             if (data.success) {
@@ -1489,7 +1569,7 @@ function updateChartsTimeframe() {
     }
     params.append('timeframe', timeframe);
     
-    fetch(`/api/athlete-performance-charts?${params.toString()}`)
+    conditionalFetch(`/api/athlete-performance-charts?${params.toString()}`)
         .then(response => response.json())
         .then(data => {
             if (data.success) {
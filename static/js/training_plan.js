@@ -26,7 +26,7 @@ function initFileUpload() {
 
 async function loadAthletesList() {
     try {
-        const response = await fetch('/api/athletes-list');
+        const response = await conditionalFetch('/api/athletes-list');
         const data = await response.json();
 
         if (data.success) {
@@ -60,7 +60,7 @@ async function loadTrainingPlanData() {
     if (loadingDiv) loadingDiv.style.display = 'block';
 
     try {
-        const response = await fetch('/api/training-plan-data');
+        const response = await conditionalFetch('/api/training-plan-data');
         const data = await response.json();
 
         if (data.success) {
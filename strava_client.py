@@ -1,86 +1,142 @@
 import os
+import time
+import random
 import requests
 import logging
+import threading
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from config import Config
+from rate_limiter import get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
+# Process-wide pooled session shared by the scheduler and all Flask workers
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def _build_http_session() -> requests.Session:
+    """Build a keep-alive session with a sized connection pool and connect retries"""
+    # Only retry failures to establish a connection; reads and HTTP statuses are
+    # never retried here, so token exchanges cannot be submitted twice.
+    retry = Retry(
+        total=None,
+        connect=Config.STRAVA_HTTP_CONNECT_RETRIES,
+        read=0,
+        status=0,
+        other=0,
+        redirect=5,
+        backoff_factor=Config.STRAVA_HTTP_RETRY_BACKOFF,
+        allowed_methods=None,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=Config.STRAVA_HTTP_POOL_CONNECTIONS,
+        pool_maxsize=Config.STRAVA_HTTP_POOL_MAXSIZE,
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """Get the shared pooled HTTP session, creating it on first use"""
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                _http_session = _build_http_session()
+                logger.info("Created pooled Strava HTTP session")
+    return _http_session
+
 class StravaClient:
     """Client for interacting with Strava API"""
 
-    BASE_URL = "https://www.strava.com/api/v3"
-    TOKEN_URL = "https://www.strava.com/oauth/token"
+    BASE_URL = Config.STRAVA_API_BASE_URL.rstrip('/')
+    TOKEN_URL = Config.STRAVA_TOKEN_URL
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
 
     def __init__(self):
         self.client_id = Config.STRAVA_CLIENT_ID
         self.client_secret = Config.STRAVA_CLIENT_SECRET
-        self.requests_made_15min = 0
-        self.requests_made_daily = 0
-        self.last_request_time = None
+        self.session = get_http_session()
+        self.timeout = (Config.STRAVA_HTTP_CONNECT_TIMEOUT, Config.STRAVA_HTTP_READ_TIMEOUT)
+        self.rate_limiter = get_rate_limiter()
 
     def _check_rate_limits(self) -> bool:
-        """Check if we can make a request without exceeding rate limits"""
-        from models import StravaApiUsage
-        from app import db
-        
-        try:
-            today = datetime.now().date()
-            usage = db.session.query(StravaApiUsage).filter_by(date=today).first()
-            
-            if not usage:
-                usage = StravaApiUsage(date=today, requests_15min=0, requests_daily=0)
-                db.session.add(usage)
-                db.session.commit()
-            
-            # Check 15-minute limit
-            if usage.last_request_time and usage.last_request_time > datetime.now() - timedelta(minutes=15):
-                if usage.requests_15min >= Config.STRAVA_RATE_LIMIT_15MIN:
-                    logger.warning("Strava 15-minute rate limit would be exceeded")
-                    return False
-            else:
-                # Reset 15-minute counter
-                usage.requests_15min = 0
-            
-            # Check daily limit
-            if usage.requests_daily >= Config.STRAVA_RATE_LIMIT_DAILY:
-                logger.warning("Strava daily rate limit would be exceeded")
-                return False
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error checking rate limits: {e}")
-            return True  # Allow request if we can't check limits
-    
+        """Reserve a request slot in the shared in-memory rate limiter"""
+        return self.rate_limiter.try_acquire()
+
     def _record_request(self):
         """Record that we made a request"""
-        from models import StravaApiUsage
-        from app import db
-        
-        try:
-            today = datetime.now().date()
-            usage = db.session.query(StravaApiUsage).filter_by(date=today).first()
-            
-            if not usage:
-                usage = StravaApiUsage(date=today)
-                db.session.add(usage)
-            
-            # Reset 15-minute counter if needed
-            if not usage.last_request_time or usage.last_request_time <= datetime.now() - timedelta(minutes=15):
-                usage.requests_15min = 1
-            else:
-                usage.requests_15min += 1
-            
-            usage.requests_daily += 1
-            usage.last_request_time = datetime.now()
-            usage.updated_at = datetime.now()
-            
-            db.session.commit()
-            
-        except Exception as e:
-            logger.error(f"Error recording request: {e}")
+        self.rate_limiter.record_request()
+
+    def _request(self, method: str, url: str, **kwargs) -> Optional[requests.Response]:
+        """Make a rate-limited API request, retrying 429/5xx with jittered exponential backoff.
+
+        Every response feeds Strava's rate limit headers back into the shared
+        limiter. Returns None if the limiter refuses the first attempt; if it
+        refuses a retry, the last error response is returned instead.
+        """
+        response = None
+        for attempt in range(Config.STRAVA_HTTP_MAX_RETRIES + 1):
+            if not self._check_rate_limits():
+                return response
+
+            try:
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except Exception:
+                self.rate_limiter.release()
+                raise
+
+            synced = self.rate_limiter.update_from_headers(response.headers)
+            self._record_request()
+
+            if response.status_code not in self.RETRY_STATUSES or attempt == Config.STRAVA_HTTP_MAX_RETRIES:
+                return response
+
+            if response.status_code == 429 and not synced:
+                self.rate_limiter.mark_throttled()
+
+            delay = self._retry_delay(response, attempt)
+            if delay is None:
+                logger.warning(f"Strava returned {response.status_code}; budget resets too late to retry inline")
+                return response
+
+            logger.warning(f"Strava returned {response.status_code}; retrying in {delay:.1f}s "
+                           f"(attempt {attempt + 1}/{Config.STRAVA_HTTP_MAX_RETRIES})")
+            time.sleep(delay)
+
+        return response
+
+    def _retry_delay(self, response: requests.Response, attempt: int) -> Optional[float]:
+        """Full-jitter exponential backoff; 429s also wait for the rate limit window (None if too long)"""
+        delay = random.uniform(0, Config.STRAVA_HTTP_RETRY_BACKOFF * (2 ** attempt))
+
+        if response.status_code == 429:
+            wait = self.rate_limiter.seconds_until_available()
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                wait = max(wait, float(retry_after))
+            delay += wait
+
+        if delay > Config.STRAVA_HTTP_MAX_BACKOFF:
+            return None
+        return delay
+
+    def get_rate_limit_status(self) -> Dict:
+        """Live Strava budget as last reported by Strava (or estimated locally)"""
+        return self.rate_limiter.snapshot()
+
+    def flush_usage(self):
+        """Checkpoint API usage to the database (call at the end of a sync run)"""
+        self.rate_limiter.checkpoint(force=True)
 
     def refresh_access_token(self, refresh_token: str) -> Optional[Dict]:
         """Refresh the access token using refresh token"""
@@ -91,9 +147,8 @@ class StravaClient:
                 'refresh_token': refresh_token,
                 'grant_type': 'refresh_token'
             }
-            print(payload)
 
-            response = requests.post(self.TOKEN_URL, data=payload)
+            response = self.session.post(self.TOKEN_URL, data=payload, timeout=self.timeout)
             response.raise_for_status()
 
             token_data = response.json()
@@ -104,60 +159,79 @@ class StravaClient:
             logger.error(f"Failed to refresh Strava token: {e}")
             return None
 
-    def get_athlete_activities(self, access_token: str, start_date: datetime, end_date: datetime) -> List[Dict]:
-        """Fetch athlete activities for a date range with rate limiting"""
+    def get_athlete_activities(self, access_token: str, start_date: datetime,
+                               end_date: Optional[datetime] = None) -> List[Dict]:
+        """Fetch athlete activities for a date range with rate limiting (open-ended if end_date is None)"""
+        return self.fetch_athlete_activities(access_token, start_date, end_date)['activities']
+
+    def fetch_athlete_activities(self, access_token: str, start_date: datetime,
+                                 end_date: Optional[datetime] = None) -> Dict:
+        """Fetch running activities and report whether every page was retrieved.
+
+        Returns {'activities': [...], 'complete': bool, 'requests': int}.
+        complete is False when the rate limit or a request error cut
+        pagination short, so callers can avoid checkpointing past data they
+        have not seen.
+        """
+        per_page = 200
+        all_activities = []
+        complete = False
+        requests_made = 0
+
         try:
-            if not self._check_rate_limits():
+            if not self.rate_limiter.has_capacity():
                 logger.warning("Skipping activity fetch due to rate limits")
-                return []
-            
+                return {'activities': [], 'complete': False, 'requests': 0}
+
             headers = {'Authorization': f'Bearer {access_token}'}
 
             # Convert dates to Unix timestamps
             after = int(start_date.timestamp())
-            before = int(end_date.timestamp())
+            before = int(end_date.timestamp()) if end_date else None
 
-            all_activities = []
             page = 1
             while True:
-                if not self._check_rate_limits():
-                    logger.warning("Rate limit reached during pagination")
-                    break
-                
                 params = {
                     'after': after,
-                    'before': before,
-                    'per_page': 200,
+                    'per_page': per_page,
                     'page': page
                 }
+                if before is not None:
+                    params['before'] = before
 
-                response = requests.get(
+                response = self._request(
+                    'GET',
                     f"{self.BASE_URL}/athlete/activities",
                     headers=headers,
                     params=params
                 )
-                self._record_request()
+                if response is None:
+                    logger.warning("Rate limit reached during pagination")
+                    break
+                requests_made += 1
                 response.raise_for_status()
 
                 activities = response.json()
-                if not activities:
-                    break
-
                 all_activities.extend(activities)
-                page += 1
 
-            # Filter for running activities only
-            running_activities = [
-                activity for activity in all_activities
-                if activity.get('type', '').lower() in ['run', 'virtualrun', 'trail_run']
-            ]
+                # A short page is the last one; skip the extra empty-page request
+                if len(activities) < per_page:
+                    complete = True
+                    break
 
-            logger.info(f"Fetched {len(running_activities)} running activities")
-            return running_activities
+                page += 1
 
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to fetch Strava activities: {e}")
-            return []
+
+        # Filter for running activities only
+        running_activities = [
+            activity for activity in all_activities
+            if activity.get('type', '').lower() in ['run', 'virtualrun', 'trail_run']
+        ]
+
+        logger.info(f"Fetched {len(running_activities)} running activities")
+        return {'activities': running_activities, 'complete': complete, 'requests': requests_made}
 
     def process_activity_data(self, activity: Dict) -> Dict:
         """Process raw Strava activity data into our format"""
@@ -198,7 +272,7 @@ class StravaClient:
         redirect_uri = quote(Config.STRAVA_REDIRECT_URI, safe='')
 
         auth_url = (
-            f"https://www.strava.com/oauth/authorize"
+            f"{Config.STRAVA_AUTHORIZE_URL}"
             f"?client_id={self.client_id}"
             f"&response_type=code"
             f"&redirect_uri={redirect_uri}"
@@ -217,7 +291,7 @@ class StravaClient:
                 'grant_type': 'authorization_code'
             }
 
-            response = requests.post(self.TOKEN_URL, data=payload)
+            response = self.session.post(self.TOKEN_URL, data=payload, timeout=self.timeout)
             response.raise_for_status()
 
             token_data = response.json()
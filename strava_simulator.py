@@ -0,0 +1,411 @@
+"""Local stand-in for the Strava API for offline load and throughput testing.
+
+Run it with `python strava_simulator.py` and point the app at it:
+
+    STRAVA_API_BASE_URL=http://127.0.0.1:5055/api/v3
+    STRAVA_TOKEN_URL=http://127.0.0.1:5055/oauth/token
+    STRAVA_AUTHORIZE_URL=http://127.0.0.1:5055/oauth/authorize
+
+Behaviour is controlled with the STRAVA_SIM_* environment variables below.
+Refresh tokens are `sim-refresh-<athlete id>`; /sim/athletes lists them.
+"""
+import os
+import time
+import random
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+from flask import Flask, jsonify, request, redirect
+
+logger = logging.getLogger(__name__)
+
+
+class SimulatorConfig:
+    """Settings for the Strava simulator"""
+
+    HOST = os.getenv("STRAVA_SIM_HOST", "127.0.0.1")
+    PORT = int(os.getenv("STRAVA_SIM_PORT", 5055))
+
+    # Synthetic data
+    SEED = int(os.getenv("STRAVA_SIM_SEED", 42))  # Same seed, same athletes and activities
+    ATHLETES = int(os.getenv("STRAVA_SIM_ATHLETES", 2000))
+    HISTORY_DAYS = int(os.getenv("STRAVA_SIM_HISTORY_DAYS", 180))  # Days of history per athlete
+    RUNS_PER_WEEK = float(os.getenv("STRAVA_SIM_RUNS_PER_WEEK", 4.5))
+
+    # Latency and injected faults
+    LATENCY_MS = float(os.getenv("STRAVA_SIM_LATENCY_MS", 80))  # Mean response latency
+    LATENCY_JITTER_MS = float(os.getenv("STRAVA_SIM_LATENCY_JITTER_MS", 30))  # Std deviation of latency
+    ERROR_RATE = float(os.getenv("STRAVA_SIM_ERROR_RATE", 0.0))  # Fraction answered with a 5xx
+    THROTTLE_RATE = float(os.getenv("STRAVA_SIM_THROTTLE_RATE", 0.0))  # Fraction answered with a spurious 429
+
+    # Strava-style fixed windows (quarter hour and UTC day)
+    RATE_LIMIT_15MIN = int(os.getenv("STRAVA_SIM_RATE_LIMIT_15MIN", 200))
+    RATE_LIMIT_DAILY = int(os.getenv("STRAVA_SIM_RATE_LIMIT_DAILY", 2000))
+    READ_RATE_LIMIT_15MIN = int(os.getenv("STRAVA_SIM_READ_RATE_LIMIT_15MIN", 100))
+    READ_RATE_LIMIT_DAILY = int(os.getenv("STRAVA_SIM_READ_RATE_LIMIT_DAILY", 1000))
+
+    TOKEN_TTL_SECONDS = int(os.getenv("STRAVA_SIM_TOKEN_TTL_SECONDS", 6 * 3600))
+
+
+FIRST_NAMES = ['Asha', 'Ben', 'Chen', 'Divya', 'Elena', 'Farid', 'Grace', 'Hiro', 'Isha', 'Jonas',
+               'Kavya', 'Liam', 'Maya', 'Nikhil', 'Olga', 'Priya', 'Quinn', 'Ravi', 'Sara', 'Tomas']
+LAST_NAMES = ['Anand', 'Brown', 'Costa', 'Das', 'Evans', 'Fischer', 'Gupta', 'Haas', 'Iyer', 'Jensen',
+              'Kumar', 'Lopez', 'Menon', 'Nair', 'Okafor', 'Patel', 'Rao', 'Singh', 'Tanaka', 'Weber']
+UTC_OFFSETS_MINUTES = [330, 330, 330, 0, 60, -300, 480]
+ACTIVITY_TYPES = [('Run', 0.8), ('VirtualRun', 0.05), ('Ride', 0.1), ('Walk', 0.05)]
+RUN_NAMES = ['Easy Run', 'Tempo Run', 'Long Run', 'Recovery Jog', 'Intervals', 'Morning Run', 'Evening Run']
+
+
+class SyntheticStrava:
+    """Deterministic generator of athletes and their activity history"""
+
+    def __init__(self, seed: int, athletes: int, history_days: int, runs_per_week: float,
+                 end_time: Optional[datetime] = None):
+        self.seed = seed
+        self.athlete_count = athletes
+        self.history_days = history_days
+        self.runs_per_week = runs_per_week
+        self.end_time = end_time or datetime.now(timezone.utc)
+
+    def has_athlete(self, athlete_id: int) -> bool:
+        return 1 <= athlete_id <= self.athlete_count
+
+    def athlete(self, athlete_id: int) -> Dict:
+        rng = random.Random(f"{self.seed}:athlete:{athlete_id}")
+        return {
+            'id': athlete_id,
+            'firstname': rng.choice(FIRST_NAMES),
+            'lastname': f"{rng.choice(LAST_NAMES)} {athlete_id}",
+        }
+
+    @staticmethod
+    def refresh_token(athlete_id: int) -> str:
+        return f"sim-refresh-{athlete_id}"
+
+    def activities(self, athlete_id: int) -> List[Dict]:
+        """All activities of an athlete, oldest first"""
+        return _generate_activities(self.seed, athlete_id, self.history_days, self.runs_per_week,
+                                    int(self.end_time.timestamp()))
+
+
+@lru_cache(maxsize=8192)
+def _generate_activities(seed: int, athlete_id: int, history_days: int, runs_per_week: float,
+                         end_timestamp: int) -> List[Dict]:
+    rng = random.Random(f"{seed}:activities:{athlete_id}")
+    end_time = datetime.fromtimestamp(end_timestamp, timezone.utc)
+    utc_offset = timedelta(minutes=rng.choice(UTC_OFFSETS_MINUTES))
+    base_pace = rng.uniform(4.3, 7.2)  # min/km
+    base_distance = rng.uniform(5, 14)  # km
+    base_heartrate = rng.uniform(135, 160)
+
+    types, weights = zip(*ACTIVITY_TYPES)
+    first_day = (end_time + utc_offset).date() - timedelta(days=history_days - 1)
+
+    activities = []
+    for offset in range(history_days):
+        day = first_day + timedelta(days=offset)
+        sessions = 2 if rng.random() < 0.05 else 1
+        for _ in range(sessions):
+            if rng.random() >= runs_per_week / 7:
+                continue
+
+            activity_type = rng.choices(types, weights)[0]
+            long_run = day.weekday() == 6 and activity_type == 'Run'
+            distance_km = max(1.0, rng.gauss(base_distance * (2.0 if long_run else 1.0), 2.0))
+            if activity_type == 'Ride':
+                distance_km *= 3
+            pace = max(3.0, rng.gauss(base_pace * (1.05 if long_run else 1.0), 0.35))
+            if activity_type == 'Walk':
+                pace *= 1.9
+            moving_time = int(distance_km * pace * (0.33 if activity_type == 'Ride' else 1.0) * 60)
+
+            local_start = datetime.combine(day, datetime.min.time()) + timedelta(
+                hours=rng.randint(5, 19), minutes=rng.randint(0, 59))
+            start_utc = (local_start - utc_offset).replace(tzinfo=timezone.utc)
+            if start_utc > end_time:
+                continue
+
+            average_speed = distance_km * 1000 / moving_time if moving_time else 0
+            activities.append({
+                'id': athlete_id * 10000 + len(activities),
+                'name': rng.choice(RUN_NAMES) if 'Run' in activity_type else activity_type,
+                'type': activity_type,
+                'sport_type': activity_type,
+                'start_date': start_utc.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'start_date_local': local_start.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'utc_offset': utc_offset.total_seconds(),
+                'distance': round(distance_km * 1000, 1),
+                'moving_time': moving_time,
+                'elapsed_time': int(moving_time * rng.uniform(1.0, 1.15)),
+                'total_elevation_gain': round(max(0.0, rng.gauss(distance_km * 8, 20)), 1),
+                'average_speed': round(average_speed, 3),
+                'max_speed': round(average_speed * rng.uniform(1.2, 1.6), 3),
+                'has_heartrate': True,
+                'average_heartrate': round(rng.gauss(base_heartrate, 6), 1),
+                'max_heartrate': round(rng.gauss(base_heartrate + 25, 5), 1),
+                '_start_timestamp': int(start_utc.timestamp()),
+            })
+
+    return activities
+
+
+class FixedWindowCounter:
+    """Counts requests in Strava's quarter-hour and UTC-day windows"""
+
+    def __init__(self, limit_15min: int, limit_daily: int):
+        self.limits = (limit_15min, limit_daily)
+        self.short_window = None
+        self.daily_window = None
+        self.short_count = 0
+        self.daily_count = 0
+
+    def hit(self, now: float) -> bool:
+        """Count a request; returns False if it exceeded either window"""
+        short_window = int(now // 900)
+        daily_window = int(now // 86400)
+        if short_window != self.short_window:
+            self.short_window, self.short_count = short_window, 0
+        if daily_window != self.daily_window:
+            self.daily_window, self.daily_count = daily_window, 0
+
+        # Strava counts throttled requests too
+        self.short_count += 1
+        self.daily_count += 1
+        return self.short_count <= self.limits[0] and self.daily_count <= self.limits[1]
+
+    def headers(self, prefix: str) -> Dict[str, str]:
+        return {
+            f'{prefix}-Limit': f'{self.limits[0]},{self.limits[1]}',
+            f'{prefix}-Usage': f'{self.short_count},{self.daily_count}',
+        }
+
+
+class StravaSimulator:
+    """State shared by the simulator routes: data, tokens, rate limits and stats"""
+
+    def __init__(self, settings: Dict):
+        self.settings = settings
+        self.data = SyntheticStrava(settings['SEED'], settings['ATHLETES'],
+                                    settings['HISTORY_DAYS'], settings['RUNS_PER_WEEK'])
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.faults = random.Random(self.settings['SEED'])
+            self.overall = FixedWindowCounter(self.settings['RATE_LIMIT_15MIN'], self.settings['RATE_LIMIT_DAILY'])
+            self.read = FixedWindowCounter(self.settings['READ_RATE_LIMIT_15MIN'],
+                                           self.settings['READ_RATE_LIMIT_DAILY'])
+            self.stats = {'requests': 0, 'by_status': {}, 'by_endpoint': {}, 'activities_served': 0}
+            self.next_oauth_athlete = 1
+
+    def simulate_latency(self):
+        latency_ms = random.gauss(self.settings['LATENCY_MS'], self.settings['LATENCY_JITTER_MS'])
+        if latency_ms > 0:
+            time.sleep(latency_ms / 1000)
+
+    def injected_fault(self, allow_throttle: bool = True) -> Optional[int]:
+        with self._lock:
+            roll = self.faults.random()
+            if allow_throttle and roll < self.settings['THROTTLE_RATE']:
+                return 429
+            if roll < self.settings['THROTTLE_RATE'] + self.settings['ERROR_RATE']:
+                return self.faults.choice([500, 502, 503])
+        return None
+
+    def count_read(self) -> Tuple[bool, Dict[str, str]]:
+        """Count one read request against both scopes and return the rate limit headers"""
+        now = time.time()
+        with self._lock:
+            overall_ok = self.overall.hit(now)
+            read_ok = self.read.hit(now)
+            headers = {**self.overall.headers('X-RateLimit'), **self.read.headers('X-ReadRateLimit')}
+        return overall_ok and read_ok, headers
+
+    def record(self, endpoint: str, status: int, activities: int = 0):
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['by_status'][str(status)] = self.stats['by_status'].get(str(status), 0) + 1
+            self.stats['by_endpoint'][endpoint] = self.stats['by_endpoint'].get(endpoint, 0) + 1
+            self.stats['activities_served'] += activities
+
+    def issue_token(self, athlete_id: int, include_athlete: bool) -> Dict:
+        expires_at = int(time.time()) + self.settings['TOKEN_TTL_SECONDS']
+        token_data = {
+            'token_type': 'Bearer',
+            # Self-describing token so restarts of the simulator keep it valid
+            'access_token': f"sim-access-{athlete_id}-{expires_at}",
+            'expires_at': expires_at,
+            'expires_in': self.settings['TOKEN_TTL_SECONDS'],
+            'refresh_token': self.data.refresh_token(athlete_id),
+        }
+        if include_athlete:
+            token_data['athlete'] = self.data.athlete(athlete_id)
+        return token_data
+
+    def athlete_for_access_token(self, header: str) -> Optional[int]:
+        if not header.startswith('Bearer sim-access-'):
+            return None
+        try:
+            athlete_id, expires_at = (int(part) for part in header[len('Bearer sim-access-'):].split('-'))
+        except ValueError:
+            return None
+        if expires_at < time.time() or not self.data.has_athlete(athlete_id):
+            return None
+        return athlete_id
+
+
+def _parse_id(value: str, prefix: str) -> Optional[int]:
+    if not value or not value.startswith(prefix):
+        return None
+    try:
+        return int(value[len(prefix):])
+    except ValueError:
+        return None
+
+
+def _error(status: int, message: str, headers: Optional[Dict] = None):
+    response = jsonify({'message': message, 'errors': []})
+    response.status_code = status
+    response.headers.update(headers or {})
+    return response
+
+
+def create_simulator_app(**overrides) -> Flask:
+    """Build the simulator app; keyword overrides take SimulatorConfig names in any case"""
+    settings = {name: getattr(SimulatorConfig, name) for name in dir(SimulatorConfig) if name.isupper()}
+    settings.update({name.upper(): value for name, value in overrides.items()})
+
+    sim_app = Flask(__name__)
+    simulator = StravaSimulator(settings)
+    sim_app.config['SIMULATOR'] = simulator
+
+    @sim_app.route('/oauth/authorize')
+    def oauth_authorize():
+        """Skip the consent screen and hand back a code for the next (or requested) athlete"""
+        redirect_uri = request.args.get('redirect_uri')
+        if not redirect_uri:
+            return _error(400, 'redirect_uri is required')
+
+        athlete_id = request.args.get('athlete_id', type=int)
+        if athlete_id is None:
+            with simulator._lock:
+                athlete_id = simulator.next_oauth_athlete
+                simulator.next_oauth_athlete = athlete_id % settings['ATHLETES'] + 1
+
+        params = {'code': f"sim-code-{athlete_id}", 'scope': request.args.get('scope', 'read')}
+        if request.args.get('state'):
+            params['state'] = request.args['state']
+        return redirect(f"{redirect_uri}?{urlencode(params)}")
+
+    @sim_app.route('/oauth/token', methods=['POST'])
+    def oauth_token():
+        simulator.simulate_latency()
+        fault = simulator.injected_fault(allow_throttle=False)
+        if fault:
+            simulator.record('token', fault)
+            return _error(fault, 'Simulated server error')
+
+        grant_type = request.form.get('grant_type')
+        if grant_type == 'authorization_code':
+            athlete_id = _parse_id(request.form.get('code'), 'sim-code-')
+        elif grant_type == 'refresh_token':
+            athlete_id = _parse_id(request.form.get('refresh_token'), 'sim-refresh-')
+        else:
+            athlete_id = None
+
+        if athlete_id is None or not simulator.data.has_athlete(athlete_id):
+            simulator.record('token', 400)
+            return _error(400, 'Bad Request')
+
+        simulator.record('token', 200)
+        return jsonify(simulator.issue_token(athlete_id, include_athlete=grant_type == 'authorization_code'))
+
+    @sim_app.route('/api/v3/athlete/activities')
+    def athlete_activities():
+        simulator.simulate_latency()
+
+        athlete_id = simulator.athlete_for_access_token(request.headers.get('Authorization', ''))
+        if athlete_id is None:
+            simulator.record('activities', 401)
+            return _error(401, 'Authorization Error')
+
+        allowed, rate_headers = simulator.count_read()
+        if not allowed:
+            simulator.record('activities', 429)
+            return _error(429, 'Rate Limit Exceeded', rate_headers)
+
+        fault = simulator.injected_fault()
+        if fault:
+            simulator.record('activities', fault)
+            return _error(fault, 'Simulated fault', rate_headers)
+
+        after = request.args.get('after', type=int)
+        before = request.args.get('before', type=int)
+        page = max(1, request.args.get('page', 1, type=int))
+        per_page = min(200, max(1, request.args.get('per_page', 30, type=int)))
+
+        activities = [
+            activity for activity in simulator.data.activities(athlete_id)
+            if (after is None or activity['_start_timestamp'] > after)
+            and (before is None or activity['_start_timestamp'] < before)
+        ]
+        # Like Strava: oldest first when paging forward from `after`, newest first otherwise
+        if after is None:
+            activities.reverse()
+
+        page_items = activities[(page - 1) * per_page:page * per_page]
+        body = [{key: value for key, value in activity.items() if not key.startswith('_')}
+                for activity in page_items]
+
+        simulator.record('activities', 200, len(body))
+        response = jsonify(body)
+        response.headers.update(rate_headers)
+        return response
+
+    @sim_app.route('/sim/athletes')
+    def sim_athletes():
+        """List synthetic athletes with their refresh tokens for seeding a database"""
+        offset = request.args.get('offset', 0, type=int)
+        limit = request.args.get('limit', 100, type=int)
+        athlete_ids = range(offset + 1, min(settings['ATHLETES'], offset + limit) + 1)
+        return jsonify([
+            {**simulator.data.athlete(athlete_id), 'refresh_token': simulator.data.refresh_token(athlete_id)}
+            for athlete_id in athlete_ids
+        ])
+
+    @sim_app.route('/sim/stats')
+    def sim_stats():
+        with simulator._lock:
+            return jsonify({
+                **simulator.stats,
+                'usage': {'overall': [simulator.overall.short_count, simulator.overall.daily_count],
+                          'read': [simulator.read.short_count, simulator.read.daily_count]},
+                'settings': settings
+            })
+
+    @sim_app.route('/sim/reset', methods=['POST'])
+    def sim_reset():
+        """Clear stats, rate limit windows and the fault sequence"""
+        simulator.reset()
+        return jsonify({'success': True})
+
+    return sim_app
+
+
+def serve_in_thread(host: str = '127.0.0.1', port: int = 0, **overrides):
+    """Start a threaded simulator in the background; returns the server (see server.port)"""
+    from werkzeug.serving import make_server
+
+    server = make_server(host, port, create_simulator_app(**overrides), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True, name='strava-simulator').start()
+    logger.info(f"Strava simulator listening on http://{host}:{server.port}")
+    return server
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    create_simulator_app().run(host=SimulatorConfig.HOST, port=SimulatorConfig.PORT, threaded=True)
@@ -0,0 +1,109 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from config import Config
+from strava_client import StravaClient
+from token_manager import TokenManager
+
+logger = logging.getLogger(__name__)
+
+
+class StravaSyncEngine:
+    """Concurrent Strava fetcher for many athletes.
+
+    Worker threads only do network I/O (token refresh and activity pages) and
+    never touch the database. Results are yielded back to the calling thread,
+    which acts as the single writer for tokens, activities and summaries.
+    All workers draw from the process-wide Strava rate limiter, so throughput
+    is bounded by the API budget rather than by the number of athletes.
+    """
+
+    def __init__(self, strava_client: Optional[StravaClient] = None, max_workers: Optional[int] = None):
+        self.strava_client = strava_client or StravaClient()
+        self.token_manager = TokenManager(self.strava_client)
+        self.max_workers = max_workers or Config.STRAVA_SYNC_MAX_WORKERS
+
+    @staticmethod
+    def snapshot_athlete(athlete) -> Dict:
+        """Copy the fields a worker needs so ORM objects never cross threads"""
+        return {
+            'athlete_id': athlete.id,
+            'name': athlete.name,
+            'refresh_token': athlete.refresh_token,
+            'access_token': athlete.access_token,
+            'token_expires_at': athlete.token_expires_at
+        }
+
+    def fetch_athletes(self, athletes: List, start_date: Optional[datetime] = None,
+                       end_date: Optional[datetime] = None,
+                       windows: Optional[Dict[int, Tuple[datetime, Optional[datetime]]]] = None) -> Iterator[Dict]:
+        """Fetch activities for all athletes concurrently, yielding each result as it completes.
+
+        Every athlete uses start_date/end_date unless windows maps its id to its
+        own (start, end) pair; an end of None fetches everything after start.
+        """
+        snapshots = [self.snapshot_athlete(athlete) for athlete in athletes]
+        if not snapshots:
+            return
+
+        workers = max(1, min(self.max_workers, len(snapshots)))
+        logger.info(f"Fetching Strava activities for {len(snapshots)} athletes with {workers} workers")
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='strava-sync') as executor:
+            futures = {}
+            for snapshot in snapshots:
+                window_start, window_end = (windows or {}).get(snapshot['athlete_id'], (start_date, end_date))
+                future = executor.submit(self._fetch_athlete, snapshot, window_start, window_end)
+                futures[future] = snapshot
+
+            for future in as_completed(futures):
+                snapshot = futures[future]
+                try:
+                    yield future.result()
+                except Exception as e:
+                    logger.error(f"Strava fetch failed for athlete {snapshot['name']}: {e}")
+                    yield self._result(snapshot, error=str(e))
+
+    def _fetch_athlete(self, snapshot: Dict, start_date: datetime, end_date: Optional[datetime]) -> Dict:
+        """Network-only work for one athlete: refresh the token and fetch processed activities"""
+        if not snapshot['refresh_token']:
+            return self._result(snapshot, error='No refresh token')
+
+        if not self.strava_client.rate_limiter.has_capacity():
+            return self._result(snapshot, error='Rate limit budget exhausted')
+
+        # Stored tokens are reused until they near expiry; token_data is only
+        # returned when a refresh happened and needs persisting by the writer
+        access_token, token_data = self.token_manager.resolve_token(
+            snapshot['refresh_token'], snapshot['access_token'], snapshot['token_expires_at']
+        )
+        if not access_token:
+            return self._result(snapshot, error='Failed to refresh token')
+
+        fetch = self.strava_client.fetch_athlete_activities(
+            access_token, start_date, end_date
+        )
+
+        activities = []
+        for activity_data in fetch['activities']:
+            processed_activity = self.strava_client.process_activity_data(activity_data)
+            if processed_activity:
+                activities.append(processed_activity)
+
+        return self._result(snapshot, token_data=token_data, activities=activities,
+                            complete=fetch['complete'], requests=fetch['requests'])
+
+    @staticmethod
+    def _result(snapshot: Dict, token_data: Optional[Dict] = None,
+                activities: Optional[List[Dict]] = None, error: Optional[str] = None,
+                complete: bool = False, requests: int = 0) -> Dict:
+        return {
+            'athlete_id': snapshot['athlete_id'],
+            'name': snapshot['name'],
+            'token_data': token_data,
+            'activities': activities or [],
+            'complete': complete,
+            'requests': requests,
+            'error': error
+        }
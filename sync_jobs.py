@@ -0,0 +1,356 @@
+import json
+import logging
+import threading
+from datetime import datetime, timedelta, date
+from typing import Dict, List, Optional
+from sqlalchemy import or_, and_, exists
+from sqlalchemy.orm import aliased
+from config import Config
+from app import app, db
+from models import Athlete, SyncJob, SystemLog
+from athlete_cache import athlete_name, active_athlete_ids
+from response_cache import bump_data_version, SYNC
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('pending', 'running')
+JOB_TYPES = ('incremental', 'single_day', 'range')
+
+
+def _as_date(value) -> Optional[date]:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def log_sync_operation(sync_type, start_date, end_date, athlete_id, success, details):
+    """Log sync operation to system logs"""
+    try:
+        athlete_label = "All Athletes"
+        if athlete_id:
+            athlete_label = athlete_name(int(athlete_id), f"Athlete {athlete_id}")
+
+        log_type = "SYNC_SUCCESS" if success else "SYNC_FAILED"
+        message = f"Sync {sync_type} - {athlete_label} ({start_date} to {end_date})"
+        details_str = "; ".join(details) if details else ""
+
+        system_log = SystemLog(
+            log_date=datetime.now(),
+            log_type=log_type,
+            message=message,
+            details=details_str
+        )
+
+        db.session.add(system_log)
+        bump_data_version(SYNC)
+        db.session.commit()
+
+    except Exception as e:
+        logger.error(f"Failed to log sync operation: {e}")
+        db.session.rollback()
+
+
+class SyncJobManager:
+    """Runs syncs requested from the web UI on a background worker pool.
+
+    The sync endpoints queue a SyncJob and return its id at once. Workers
+    claim pending jobs with a conditional update, so each job runs exactly
+    once even with several processes, and record per-athlete progress as
+    each athlete is saved. A job that stops reporting progress for
+    SYNC_JOB_STALE_MINUTES (its worker died) is claimed again.
+
+    Jobs run one at a time: none is claimed while another job is running in
+    any process, or while this process's scheduled run or backfill holds
+    the sync lock. Until then it stays pending.
+    """
+
+    def __init__(self, task_scheduler):
+        self.task_scheduler = task_scheduler
+        self._wakeup = threading.Event()
+        self._workers: List[threading.Thread] = []
+        self._workers_lock = threading.Lock()
+
+    def enqueue(self, job_type: str, sync_type: Optional[str] = None, athlete_id: Optional[int] = None,
+                start_date=None, end_date=None) -> SyncJob:
+        """Queue a sync job, or return an identical one that is already queued or running"""
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"Unknown sync job type: {job_type}")
+        start_day = _as_date(start_date)
+        end_day = _as_date(end_date)
+        if start_day and end_day and end_day < start_day:
+            raise ValueError("End date must not be before start date")
+
+        try:
+            job = SyncJob.query.filter(
+                SyncJob.status.in_(ACTIVE_STATUSES),
+                SyncJob.job_type == job_type,
+                SyncJob.sync_type == sync_type,
+                SyncJob.athlete_id == athlete_id,
+                SyncJob.start_date == start_day,
+                SyncJob.end_date == end_day
+            ).order_by(SyncJob.id).first()
+
+            if job:
+                logger.info(f"Sync job {job.id} ({job_type}) is already {job.status}, reusing it")
+            else:
+                job = SyncJob(
+                    job_type=job_type,
+                    sync_type=sync_type,
+                    athlete_id=athlete_id,
+                    start_date=start_day,
+                    end_date=end_day,
+                    status='pending',
+                    athletes_total=1 if athlete_id else len(active_athlete_ids()),
+                    athletes_done=0,
+                    activities_saved=0,
+                    requests_used=0
+                )
+                db.session.add(job)
+                db.session.commit()
+                logger.info(f"Queued sync job {job.id} ({job_type})")
+
+        except Exception as e:
+            logger.error(f"Failed to queue sync job: {e}")
+            db.session.rollback()
+            raise
+
+        self.start_workers()
+        self._wakeup.set()
+        return job
+
+    def start_workers(self):
+        """Start this process's worker threads if they are not running yet"""
+        with self._workers_lock:
+            self._workers = [worker for worker in self._workers if worker.is_alive()]
+            for index in range(len(self._workers), max(Config.SYNC_JOB_WORKERS, 1)):
+                worker = threading.Thread(target=self._worker_loop, name=f"sync-job-worker-{index + 1}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def _worker_loop(self):
+        while True:
+            try:
+                with app.app_context():
+                    ran = self.run_next()
+            except Exception as e:
+                logger.error(f"Sync job worker failed: {e}")
+                ran = False
+
+            if not ran:
+                self._wakeup.wait(Config.SYNC_JOB_POLL_SECONDS)
+                self._wakeup.clear()
+
+    @staticmethod
+    def _stale_cutoff() -> datetime:
+        return datetime.utcnow() - timedelta(minutes=Config.SYNC_JOB_STALE_MINUTES)
+
+    def _runnable_filter(self):
+        return or_(
+            SyncJob.status == 'pending',
+            and_(SyncJob.status == 'running', SyncJob.updated_at < self._stale_cutoff())
+        )
+
+    def _job_running(self):
+        """Condition that some job is running and still reporting progress"""
+        other = aliased(SyncJob)
+        return exists().where(other.status == 'running', other.updated_at >= self._stale_cutoff())
+
+    def _claim_next(self) -> Optional[int]:
+        """Claim the oldest runnable job; None if there is none or another worker got it first"""
+        candidate = db.session.query(SyncJob.id).filter(self._runnable_filter()).order_by(
+            SyncJob.created_at, SyncJob.id
+        ).first()
+        if not candidate:
+            return None
+
+        # Checked in the same statement, so two workers cannot both start a job
+        now = datetime.utcnow()
+        rows = SyncJob.query.filter(SyncJob.id == candidate.id, self._runnable_filter(), ~self._job_running()).update(
+            {'status': 'running', 'started_at': now, 'updated_at': now, 'athletes_done': 0,
+             'activities_saved': 0, 'requests_used': 0, 'progress': None, 'error': None},
+            synchronize_session=False
+        )
+        db.session.commit()
+        return candidate.id if rows else None
+
+    def run_next(self) -> bool:
+        """Run one queued job; returns False when the queue is empty or another sync is running"""
+        if not self.task_scheduler.begin_sync():
+            return False
+
+        try:
+            try:
+                job_id = self._claim_next()
+            except Exception as e:
+                logger.error(f"Failed to claim sync job: {e}")
+                db.session.rollback()
+                return False
+
+            if job_id is None:
+                # Lost a race for a job that another worker claimed; look again unless a job is running
+                return db.session.query(SyncJob.id).filter(
+                    self._runnable_filter(), ~self._job_running()
+                ).first() is not None
+
+            self._run_job(job_id)
+            return True
+
+        finally:
+            self.task_scheduler.end_sync()
+
+    def _update_job(self, job_id: int, **values):
+        """Update a job row in the current session and commit"""
+        values['updated_at'] = datetime.utcnow()
+        try:
+            SyncJob.query.filter(SyncJob.id == job_id).update(values, synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            logger.error(f"Failed to update sync job {job_id}: {e}")
+            db.session.rollback()
+
+    def _run_job(self, job_id: int):
+        job = db.session.get(SyncJob, job_id)
+        job_type, sync_type, athlete_id = job.job_type, job.sync_type, job.athlete_id
+        start_day, end_day = job.start_date, job.end_date
+        progress = []
+
+        # Scheduler methods open their own app context (and session), so the
+        # job row is only ever changed by id through the current session
+        def on_athlete_result(result: Dict):
+            progress.append({
+                'athlete_id': result['athlete_id'],
+                'athlete_name': result['athlete_name'],
+                'activities': result['activities'],
+                'new_activities': result['new_activities'],
+                'requests': result['requests'],
+                'complete': result['complete'],
+                'error': result['error'],
+                'days': {day.isoformat(): count for day, count in sorted(result.get('daily_counts', {}).items())}
+            })
+            self._update_job(
+                job_id,
+                athletes_done=len(progress),
+                activities_saved=sum(item['new_activities'] for item in progress),
+                requests_used=sum(item['requests'] or 0 for item in progress),
+                progress=json.dumps(progress)
+            )
+
+        logger.info(f"Running sync job {job_id} ({job_type})")
+        try:
+            if job_type == 'incremental':
+                success = self.task_scheduler.execute_incremental_sync(on_athlete_result)
+                message = (f"Incremental sync completed: {self._synced_count(progress)}/{len(progress)} athletes"
+                           if success else "Sync failed: incremental sync did not complete")
+
+            elif job_type == 'single_day':
+                target_date = datetime.combine(start_day, datetime.min.time())
+                success = self.task_scheduler.execute_daily_tasks(target_date, on_athlete_result)
+                message = (f"Manual task execution completed for {start_day.strftime('%Y-%m-%d')}" if success
+                           else f"Sync failed: manual task execution for {start_day.strftime('%Y-%m-%d')} did not complete")
+
+            else:
+                success, message = self._run_range(job_id, sync_type, athlete_id, start_day, end_day,
+                                                   progress, on_athlete_result)
+
+        except Exception as e:
+            logger.error(f"Sync job {job_id} failed: {e}")
+            db.session.rollback()
+            success, message = False, f"Sync failed: {e}"
+
+        if success:
+            self._update_job(job_id, status='completed', message=message, completed_at=datetime.utcnow())
+        else:
+            errors = [f"{item['athlete_name']}: {item['error']}" for item in progress if item['error']]
+            self._update_job(job_id, status='failed', message=message, error="; ".join(errors) or message,
+                             completed_at=datetime.utcnow())
+        logger.info(f"Sync job {job_id} {'completed' if success else 'failed'}: {message}")
+
+    @staticmethod
+    def _synced_count(progress: List[Dict]) -> int:
+        return sum(1 for item in progress if not item['error'])
+
+    def _run_range(self, job_id: int, sync_type: str, athlete_id: Optional[int], start_day: date, end_day: date,
+                   progress: List[Dict], on_athlete_result):
+        if athlete_id:
+            athletes = Athlete.query.filter(Athlete.id == athlete_id).all()
+            if not athletes:
+                return False, "Sync failed: athlete not found"
+        else:
+            athletes = Athlete.query.filter_by(is_active=True).all()
+        self._update_job(job_id, athletes_total=len(athletes))
+
+        start_date = datetime.combine(start_day, datetime.min.time())
+        end_date = datetime.combine(end_day, datetime.min.time())
+        results = self.task_scheduler.sync_date_range(start_date, end_date, athletes, on_athlete_result)
+
+        details = self.job_details(sync_type, start_day, end_day, progress)
+        success = not results['error']
+        log_sync_operation(sync_type, start_day.isoformat(), end_day.isoformat(), athlete_id, success,
+                           details if success else [results['error']])
+        if not success:
+            return False, f"Sync failed: {results['error']}"
+        return True, f"Sync completed successfully for {sync_type} from {start_day} to {end_day}"
+
+    @staticmethod
+    def job_details(sync_type: Optional[str], start_day: Optional[date], end_day: Optional[date],
+                    progress: List[Dict]) -> List[str]:
+        """Per-day result lines: per athlete for individual syncs, totals across athletes otherwise"""
+        if not start_day or not end_day:
+            return [f"{item['athlete_name']}: {item['error'] or str(item['new_activities']) + ' new activities'}"
+                    for item in progress]
+
+        days = [(start_day + timedelta(days=offset)).isoformat() for offset in range((end_day - start_day).days + 1)]
+        if sync_type == 'individual':
+            return [
+                f"{item['athlete_name']} - {day}: "
+                + (f"Error - {item['error']}" if item['error'] else f"{item['days'].get(day, 0)} activities")
+                for item in progress for day in days
+            ]
+        return [f"All athletes - {day}: {sum(item['days'].get(day, 0) for item in progress)} total activities"
+                for day in days]
+
+    def job_status(self, job: SyncJob) -> Dict:
+        """Progress of one job: per-athlete results with per-day counts, API calls used and errors"""
+        progress = json.loads(job.progress) if job.progress else []
+        athletes_total = max(job.athletes_total or 0, len(progress))
+        if job.status == 'completed' or not athletes_total:
+            progress_percent = 100.0 if job.status == 'completed' else 0.0
+        else:
+            progress_percent = round((job.athletes_done or 0) / athletes_total * 100, 1)
+
+        if job.message:
+            message = job.message
+        elif job.status == 'running':
+            message = f"Synced {job.athletes_done or 0}/{athletes_total} athletes"
+        else:
+            message = "Waiting for a sync worker"
+
+        return {
+            'id': job.id,
+            'job_type': job.job_type,
+            'sync_type': job.sync_type,
+            'athlete_id': job.athlete_id,
+            'start_date': job.start_date.isoformat() if job.start_date else None,
+            'end_date': job.end_date.isoformat() if job.end_date else None,
+            'status': job.status,
+            'message': message,
+            'athletes_total': athletes_total,
+            'athletes_done': job.athletes_done or 0,
+            'progress_percent': progress_percent,
+            'activities_saved': job.activities_saved or 0,
+            'requests_used': job.requests_used or 0,
+            'athletes': progress,
+            'details': self.job_details(job.sync_type, job.start_date, job.end_date, progress),
+            'error': job.error,
+            'created_at': job.created_at.isoformat() if job.created_at else None,
+            'started_at': job.started_at.isoformat() if job.started_at else None,
+            'completed_at': job.completed_at.isoformat() if job.completed_at else None
+        }
+
+    def get_status(self, job_id: int) -> Optional[Dict]:
+        """Status of one job, or None if it does not exist"""
+        job = db.session.get(SyncJob, job_id)
+        if job is None:
+            return None
+        if job.status in ACTIVE_STATUSES:
+            # Pick up jobs left queued by a restarted process
+            self.start_workers()
+        return self.job_status(job)
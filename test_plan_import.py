@@ -0,0 +1,76 @@
+"""Training plan import against planned_workout tables with and without the unique day key.
+
+    python -m pytest test_plan_import.py
+
+Databases created before unique_athlete_workout_date was declared lack the
+key until migrate_activity_date.py runs; the import must still write rows.
+"""
+import os
+import tempfile
+from datetime import date
+
+import pandas as pd
+import pytest
+
+# Must be set before the app modules read Config
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='plan-import-'), 'test.db')}"
+
+from sqlalchemy import text
+from app import app, db
+from models import Athlete, PlannedWorkout
+from scheduler import DailyTaskScheduler
+import db_helpers
+
+# planned_workout as deployed databases created it, without the unique key
+LEGACY_PLANNED_WORKOUT = """
+    CREATE TABLE planned_workout (
+        id INTEGER NOT NULL,
+        athlete_id INTEGER NOT NULL,
+        workout_date DATETIME NOT NULL,
+        planned_distance_km FLOAT NOT NULL,
+        planned_pace_min_per_km FLOAT NOT NULL,
+        workout_type VARCHAR(100),
+        notes TEXT,
+        created_at DATETIME,
+        PRIMARY KEY (id),
+        FOREIGN KEY(athlete_id) REFERENCES athlete (id)
+    )
+"""
+
+
+def _plan(distance_km: float) -> pd.DataFrame:
+    return pd.DataFrame([
+        {'AthleteName': 'Plan Runner', 'Date': pd.Timestamp(2026, 10, 19), 'PlannedDistanceKM': distance_km,
+         'PlannedPaceMinPerKM': 6.0, 'WorkoutType': 'Easy', 'Notes': ''},
+        {'AthleteName': 'Plan Runner', 'Date': pd.Timestamp(2026, 10, 20), 'PlannedDistanceKM': 12.0,
+         'PlannedPaceMinPerKM': 5.5, 'WorkoutType': 'Tempo', 'Notes': ''}
+    ])
+
+
+@pytest.fixture(params=['unique_key', 'legacy'])
+def planned_workout_table(request):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        if request.param == 'legacy':
+            with db.engine.connect() as conn:
+                conn.execute(text('DROP TABLE planned_workout'))
+                conn.execute(text(LEGACY_PLANNED_WORKOUT))
+                conn.commit()
+        db_helpers._unique_key_cache.clear()
+        db.session.add(Athlete(name='Plan Runner', is_active=True))
+        db.session.commit()
+        yield request.param
+        db.session.remove()
+
+
+def test_import_creates_then_updates_planned_workouts(planned_workout_table):
+    with app.app_context():
+        task_scheduler = DailyTaskScheduler()
+
+        assert task_scheduler._update_planned_workouts(_plan(8.0))
+        assert task_scheduler._update_planned_workouts(_plan(10.0))
+
+        workouts = {workout.workout_date.date(): workout.planned_distance_km
+                    for workout in PlannedWorkout.query.all()}
+        assert workouts == {date(2026, 10, 19): 10.0, date(2026, 10, 20): 12.0}
@@ -0,0 +1,115 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from sqlalchemy import or_
+from config import Config
+from strava_client import StravaClient
+
+logger = logging.getLogger(__name__)
+
+
+class TokenManager:
+    """Reuses stored Strava access tokens and refreshes them only near expiry"""
+
+    def __init__(self, strava_client: Optional[StravaClient] = None):
+        self.strava_client = strava_client or StravaClient()
+
+    def is_token_fresh(self, access_token: Optional[str], expires_at: Optional[datetime]) -> bool:
+        """Check whether a stored access token is still valid beyond the safety margin"""
+        if not access_token or not expires_at:
+            return False
+        margin = timedelta(seconds=Config.STRAVA_TOKEN_EXPIRY_MARGIN_SECONDS)
+        return expires_at > datetime.now() + margin
+
+    def resolve_token(self, refresh_token: Optional[str], access_token: Optional[str],
+                      expires_at: Optional[datetime]) -> Tuple[Optional[str], Optional[Dict]]:
+        """Return a usable access token without touching the database.
+
+        Safe to call from worker threads. The second element is the new token
+        data when a refresh happened, so the caller can persist it.
+        """
+        if self.is_token_fresh(access_token, expires_at):
+            return access_token, None
+
+        if not refresh_token:
+            return None, None
+
+        token_data = self.strava_client.refresh_access_token(refresh_token)
+        if not token_data:
+            return None, None
+
+        return token_data['access_token'], token_data
+
+    def get_valid_token(self, athlete) -> Optional[str]:
+        """Return a valid access token for the athlete, refreshing and committing only if needed"""
+        from app import db
+
+        access_token, token_data = self.resolve_token(
+            athlete.refresh_token, athlete.access_token, athlete.token_expires_at
+        )
+
+        if token_data:
+            self.apply_token_data(athlete, token_data)
+            db.session.commit()
+            logger.info(f"Refreshed Strava token for athlete {athlete.name}")
+        elif access_token:
+            logger.debug(f"Reusing stored Strava token for athlete {athlete.name}")
+
+        return access_token
+
+    @staticmethod
+    def apply_token_data(athlete, token_data: Dict):
+        """Copy refreshed Strava token data onto the athlete record"""
+        athlete.access_token = token_data['access_token']
+        athlete.token_expires_at = datetime.fromtimestamp(token_data['expires_at'])
+        if 'refresh_token' in token_data:
+            athlete.refresh_token = token_data['refresh_token']
+
+    def refresh_expiring_tokens(self, within_minutes: Optional[int] = None) -> int:
+        """Proactively refresh tokens of active athletes that expire soon.
+
+        Refreshes run in parallel; all database updates are applied and
+        committed once on the calling thread.
+        """
+        from models import Athlete
+        from app import db
+
+        within_minutes = within_minutes or Config.STRAVA_TOKEN_PROACTIVE_REFRESH_MINUTES
+        cutoff = datetime.now() + timedelta(minutes=within_minutes)
+
+        try:
+            athletes = Athlete.query.filter(
+                Athlete.is_active == True,
+                Athlete.refresh_token.isnot(None),
+                or_(Athlete.token_expires_at.is_(None), Athlete.token_expires_at <= cutoff)
+            ).all()
+
+            if not athletes:
+                return 0
+
+            refresh_tokens = {athlete.id: athlete.refresh_token for athlete in athletes}
+            workers = max(1, min(Config.STRAVA_SYNC_MAX_WORKERS, len(athletes)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='strava-token') as executor:
+                results = dict(zip(
+                    refresh_tokens.keys(),
+                    executor.map(self.strava_client.refresh_access_token, refresh_tokens.values())
+                ))
+
+            refreshed = 0
+            for athlete in athletes:
+                token_data = results.get(athlete.id)
+                if token_data:
+                    self.apply_token_data(athlete, token_data)
+                    refreshed += 1
+                else:
+                    logger.warning(f"Proactive token refresh failed for athlete {athlete.name}")
+
+            db.session.commit()
+            logger.info(f"Proactively refreshed {refreshed}/{len(athletes)} expiring Strava tokens")
+            return refreshed
+
+        except Exception as e:
+            logger.error(f"Failed to refresh expiring tokens: {e}")
+            db.session.rollback()
+            return 0
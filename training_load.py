@@ -0,0 +1,207 @@
+import logging
+from datetime import datetime, date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import pandas as pd
+from sqlalchemy import func
+from app import db
+from models import Athlete, AthleteDayFact, TrainingLoad
+from db_helpers import upsert_rows
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+LOAD_COLUMNS = ['daily_load', 'acute_load', 'chronic_load', 'training_stress_balance',
+                'acute_chronic_ratio', 'updated_at']
+
+
+def load_alpha(days: int) -> float:
+    """EWMA smoothing factor for an N-day window (2 / (N + 1))"""
+    return 2.0 / (days + 1)
+
+
+def daily_load(distance_km: Optional[float], moving_time_seconds: Optional[int]) -> float:
+    """A day's training load in the configured metric: km, or moving minutes for 'time'"""
+    if Config.TRAINING_LOAD_METRIC == 'time':
+        return (moving_time_seconds or 0) / 60
+    return distance_km or 0.0
+
+
+def _load_values(load: float, acute: float, chronic: float) -> Dict:
+    # Stored unrounded: each day's step starts from the previous stored values
+    return {
+        'daily_load': load,
+        'acute_load': acute,
+        'chronic_load': chronic,
+        'training_stress_balance': chronic - acute,
+        'acute_chronic_ratio': acute / chronic if chronic > 0 else None
+    }
+
+
+def step_training_load(previous: Optional[Dict], load: float) -> Dict:
+    """O(1) update of one new day from the previous day's values (None starts from zero)"""
+    acute = previous['acute_load'] if previous else 0.0
+    chronic = previous['chronic_load'] if previous else 0.0
+    acute += load_alpha(Config.TRAINING_LOAD_ATL_DAYS) * (load - acute)
+    chronic += load_alpha(Config.TRAINING_LOAD_CTL_DAYS) * (load - chronic)
+    return _load_values(load, acute, chronic)
+
+
+def ewma_training_load(loads: List[float], previous: Optional[Dict] = None) -> List[Dict]:
+    """Vectorized ATL/CTL over consecutive daily loads, continuing from the previous day's values.
+
+    Gives the same values as applying step_training_load day by day.
+    """
+    if not loads:
+        return []
+
+    def ewma(days: int, seed: float) -> List[float]:
+        series = pd.Series([seed] + list(loads), dtype='float64')
+        return series.ewm(alpha=load_alpha(days), adjust=False).mean().iloc[1:].tolist()
+
+    acute = ewma(Config.TRAINING_LOAD_ATL_DAYS, previous['acute_load'] if previous else 0.0)
+    chronic = ewma(Config.TRAINING_LOAD_CTL_DAYS, previous['chronic_load'] if previous else 0.0)
+    return [_load_values(load, a, c) for load, a, c in zip(loads, acute, chronic)]
+
+
+def _daily_loads(athlete_id: int, start: date, end: date) -> List[float]:
+    """Load for every day from start to end; days without a fact row count as rest days"""
+    facts = dict(
+        (fact_date, daily_load(distance, moving_time))
+        for fact_date, distance, moving_time in db.session.query(
+            AthleteDayFact.fact_date, AthleteDayFact.distance_km, AthleteDayFact.moving_time_seconds
+        ).filter(
+            AthleteDayFact.athlete_id == athlete_id,
+            AthleteDayFact.fact_date >= start,
+            AthleteDayFact.fact_date <= end
+        ).all()
+    )
+    return [facts.get(start + timedelta(days=offset), 0.0) for offset in range((end - start).days + 1)]
+
+
+def _previous_values(athlete_id: int, day: date) -> Optional[Dict]:
+    row = db.session.query(TrainingLoad.acute_load, TrainingLoad.chronic_load).filter(
+        TrainingLoad.athlete_id == athlete_id,
+        TrainingLoad.load_date == day - timedelta(days=1)
+    ).first()
+    return {'acute_load': row.acute_load or 0.0, 'chronic_load': row.chronic_load or 0.0} if row else None
+
+
+def _compute_range(athlete_id: int, start: date, end: date, now: datetime) -> List[Dict]:
+    previous = _previous_values(athlete_id, start)
+    loads = _daily_loads(athlete_id, start, end)
+    if len(loads) == 1:
+        values = [step_training_load(previous, loads[0])]
+    else:
+        values = ewma_training_load(loads, previous)
+
+    return [{'athlete_id': athlete_id, 'load_date': start + timedelta(days=offset), 'updated_at': now, **day_values}
+            for offset, day_values in enumerate(values)]
+
+
+def update_training_load(pairs: Iterable[Tuple[int, date]]) -> int:
+    """Bring TrainingLoad up to date after the day facts of the given (athlete_id, day) pairs changed.
+
+    A new day after the last stored one is a single O(1) step. A change to
+    an earlier day recomputes from that day forward, since every later
+    value depends on it. Athletes without history are built from the
+    tracking start. Runs in the caller's transaction; returns rows written.
+    """
+    from backfill import tracking_start_date
+
+    today = datetime.now().date()
+    changed = {}
+    for athlete_id, day in pairs:
+        day = day.date() if isinstance(day, datetime) else day
+        if not athlete_id or not day or day > today:
+            continue
+        first, last = changed.get(athlete_id, (day, day))
+        changed[athlete_id] = (min(first, day), max(last, day))
+    if not changed:
+        return 0
+
+    last_stored = dict(db.session.query(
+        TrainingLoad.athlete_id, func.max(TrainingLoad.load_date)
+    ).filter(TrainingLoad.athlete_id.in_(list(changed))).group_by(TrainingLoad.athlete_id).all())
+
+    now = datetime.utcnow()
+    rows = []
+    for athlete_id, (first_changed, last_changed) in changed.items():
+        stored = last_stored.get(athlete_id)
+        if stored is None:
+            start = min(first_changed, tracking_start_date())
+            end = last_changed
+        else:
+            # Fill any gap since the last stored day, and carry edits through to it
+            start = min(first_changed, stored + timedelta(days=1))
+            end = max(last_changed, stored)
+        rows.extend(_compute_range(athlete_id, start, end, now))
+
+    return upsert_rows(TrainingLoad, rows, index_elements=['athlete_id', 'load_date'], update_columns=LOAD_COLUMNS)
+
+
+def rebuild_training_load(athlete_ids: Optional[List[int]] = None) -> int:
+    """Recompute every athlete's full history from the tracking start (or earliest fact) to today; commits"""
+    from backfill import tracking_start_date
+
+    try:
+        query = db.session.query(Athlete.id)
+        if athlete_ids is not None:
+            query = query.filter(Athlete.id.in_(athlete_ids))
+        athlete_ids = [athlete_id for athlete_id, in query.all()]
+        if not athlete_ids:
+            return 0
+
+        first_facts = dict(db.session.query(
+            AthleteDayFact.athlete_id, func.min(AthleteDayFact.fact_date)
+        ).filter(AthleteDayFact.athlete_id.in_(athlete_ids)).group_by(AthleteDayFact.athlete_id).all())
+
+        TrainingLoad.query.filter(TrainingLoad.athlete_id.in_(athlete_ids)).delete(synchronize_session=False)
+
+        today = datetime.now().date()
+        now = datetime.utcnow()
+        rows = []
+        for athlete_id in athlete_ids:
+            first_fact = first_facts.get(athlete_id)
+            start = min(first_fact, tracking_start_date()) if first_fact else tracking_start_date()
+            if start <= today:
+                rows.extend(_compute_range(athlete_id, start, today, now))
+
+        written = upsert_rows(TrainingLoad, rows, index_elements=['athlete_id', 'load_date'],
+                              update_columns=LOAD_COLUMNS)
+        db.session.commit()
+        logger.info(f"Rebuilt {written} training load days for {len(athlete_ids)} athletes")
+        return written
+
+    except Exception as e:
+        logger.error(f"Failed to rebuild training load: {e}")
+        db.session.rollback()
+        return 0
+
+
+def get_latest_training_load(athlete_ids: Optional[List[int]] = None) -> List[Dict]:
+    """Most recent training load of each active athlete, by athlete name"""
+    latest = db.session.query(
+        TrainingLoad.athlete_id, func.max(TrainingLoad.load_date).label('load_date')
+    ).group_by(TrainingLoad.athlete_id).subquery()
+
+    query = db.session.query(TrainingLoad, Athlete.name).join(
+        latest, (latest.c.athlete_id == TrainingLoad.athlete_id) & (latest.c.load_date == TrainingLoad.load_date)
+    ).join(Athlete, Athlete.id == TrainingLoad.athlete_id).filter(Athlete.is_active == True)
+    if athlete_ids is not None:
+        query = query.filter(TrainingLoad.athlete_id.in_(athlete_ids))
+
+    return [training_load_dict(row, athlete_name) for row, athlete_name in query.order_by(Athlete.name).all()]
+
+
+def training_load_dict(row: TrainingLoad, athlete_name: Optional[str] = None) -> Dict:
+    """JSON-friendly values of one TrainingLoad row"""
+    return {
+        'athlete_id': row.athlete_id,
+        'athlete_name': athlete_name,
+        'date': row.load_date.isoformat(),
+        'daily_load': round(row.daily_load or 0, 2),
+        'atl': round(row.acute_load or 0, 2),
+        'ctl': round(row.chronic_load or 0, 2),
+        'tsb': round(row.training_stress_balance or 0, 2),
+        'acwr': round(row.acute_chronic_ratio, 2) if row.acute_chronic_ratio is not None else None
+    }